@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Make the project root importable from the gunicorn master
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(root_dir)
+
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+timeout = 600
+
+# Load the application (and the embedding models) once in the master so that
+# forked workers share the model weights copy-on-write
+preload_app = True
+
+
+def on_starting(server):
+    from embedding_registry import preload_embeddings
+    preload_embeddings()
+
+
+def post_fork(server, worker):
+    # Inference is kept out of the master: running the model there starts
+    # torch's thread pool before the fork. Each worker fills its own cache.
+    from embedding_registry import embed_queries
+    from RAG_analyzer import ANALYSIS_QUERIES
+    try:
+        embed_queries(ANALYSIS_QUERIES)
+    except Exception as e:
+        worker.log.warning(f"Failed to warm query cache: {e}")
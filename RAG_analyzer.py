@@ -16,6 +16,26 @@ from github_getter import GitHubAnalyzer
 from briefing_analyzer import ComplianceAnalyzer
 from RAG_process import RepoRAGProcessor
 
+# Fixed retrieval queries used for every analysis; their embeddings are cached per model
+ANALYSIS_QUERIES = [
+    "¿Qué requisitos técnicos establece el briefing?",
+    "¿Qué componentes y funcionalidades tiene este repositorio?",
+    "¿Cómo se estructura y organiza el código en este repositorio?",
+    "¿Qué arquitectura y tecnologías se utilizan en este proyecto?",
+    "¿Qué frameworks, librerías y herramientas están configuradas en el proyecto?",
+    "¿Qué archivos de configuración de dependencias existen en el repositorio?"
+]
+
+# Index partitions searched by each query: the briefing question never competes with code chunks
+ANALYSIS_QUERY_PARTITIONS = [
+    ("briefing",),
+    ("code", "metadata"),
+    ("code",),
+    ("code", "metadata"),
+    ("code", "metadata"),
+    ("code", "metadata"),
+]
+
 class LLMClient:
     def __init__(
         self, 
@@ -124,6 +144,7 @@ class GitHubRAGAnalyzer:
         self.github_analyzer = GitHubAnalyzer()
         self.compliance_analyzer = ComplianceAnalyzer()
         self.rag_processor = RepoRAGProcessor(embedding_model_name=embedding_model)
+        self.rag_processor.warm_query_cache(ANALYSIS_QUERIES)
 
     def analyze_requirements_completion(self, repo_url: str, briefing_path: str) -> Dict[str, Any]:
         try:
@@ -154,26 +175,19 @@ class GitHubRAGAnalyzer:
                 raise ValueError("Failed to process briefing document")
             self.logger.info("Briefing processing completed successfully")
             
-            # Get repository statistics
-            repo_stats = self.github_analyzer.get_repo_stats(repo_url)
+            # Get repository statistics; dependencies come from the manifests
+            # already parsed from the clone instead of the GitHub API
+            repo_stats = self.github_analyzer.get_repo_stats(
+                repo_url, manifests=getattr(self.rag_processor, "manifest_index", None)
+            )
             detected_technologies = self.rag_processor.technologies if hasattr(self.rag_processor, 'technologies') else {}
 
-            # Get briefing content
-            analysis_queries = [
-                "¿Qué requisitos técnicos establece el briefing?",
-                "¿Qué componentes y funcionalidades tiene este repositorio?",
-                "¿Cómo se estructura y organiza el código en este repositorio?",
-                "¿Qué arquitectura y tecnologías se utilizan en este proyecto?",
-                "¿Qué frameworks, librerías y herramientas están configuradas en el proyecto?",
-                "¿Qué archivos de configuración de dependencias existen en el repositorio?"
-            ]
-
-            context_parts = []
-            for query in analysis_queries:
-                retrieved_context = self.rag_processor.get_formatted_context(query, k=5)
-                context_parts.append(f"Consulta: {query}\n{retrieved_context}")
-            
-            rag_context = "\n\n".join(context_parts)
+            # Get briefing content: one deduplicated, source-grouped context for all queries
+            retrieved_context = self.rag_processor.get_assembled_context(
+                ANALYSIS_QUERIES, k=5, query_partitions=ANALYSIS_QUERY_PARTITIONS
+            )
+            queries_list = "\n".join(f"- {query}" for query in ANALYSIS_QUERIES)
+            rag_context = f"Consultas:\n{queries_list}\n\n{retrieved_context}"
             
             prompt = f"""
             You are an AI/ML Technical Analyst with expertise in code quality assessment, AI-generated code detection, and technical debt evaluation. Your task is to critically analyze a GitHub repository from bootcamp students, considering multi-level objectives from the briefing (up to 4 levels: essential/medium/advanced/expert) and highlighting key elements for teacher review.
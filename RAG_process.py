@@ -1,102 +1,172 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Sequence, Set
 import os
 import logging
 import json
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import TextLoader, DirectoryLoader, PyPDFLoader
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from langchain_community.document_loaders import TextLoader, DirectoryLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema.document import Document
+import numpy as np
+from embedding_registry import DEFAULT_EMBEDDING_MODEL, get_embeddings, embed_queries
+from repo_scanner import FileEntry, scan_repository, filter_by_extension
+from ignore_rules import IgnoreMatcher, DEFAULT_EXCLUDE_PATTERNS
+from code_chunker import CodeChunker, Chunk
+from chunk_dedup import ChunkDeduplicator
+from file_selection import select_files, DEFAULT_BUDGET_BYTES, DEFAULT_MAX_FILES
+from token_budget import TokenCounter, TruncationStats, get_tokenizer_info, SPECIAL_TOKENS
+from vector_index import IndexParams
+from index_partitions import IndexPartition, PartitionBuilder, PARTITION_NAMES, partition_for, search_partitions
+from ingest_pipeline import Pipeline, batched
+from context_assembler import Candidate, DEFAULT_LAMBDA, assemble_documents, format_grouped_context
+from briefing_cache import BriefingCache, get_briefing_cache, file_digest, config_key
+from pdf_extractor import extract_pdf_pages
+from tech_detector import TechDetector
+from manifest_index import ManifestIndex
+from chunk_store import ChunkSpan, locate_chunks
+from content_sniffer import sniff_file, TEXT, DATA
+from large_file_reader import MAX_FILE_BYTES
+from file_splitter import init_worker, read_and_split
+from worker_pool import get_pool_context
+from embedding_scheduler import EmbeddingScheduler, SCHEDULE_WINDOW, estimate_tokens
+
+# Below this many files the pool start-up costs more than it saves
+PARALLEL_MIN_FILES = 16
+
+# Records kept from files the content sniffer classifies as data dumps
+DATA_SAMPLE_BYTES = 4096
+
+# Briefing splitter settings; also part of the briefing cache key
+BRIEFING_CHUNK_SIZE = 1000
+BRIEFING_CHUNK_OVERLAP = 150
+
 
 class RepoRAGProcessor:
-    def __init__(self, embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(self, embedding_model_name: str = DEFAULT_EMBEDDING_MODEL, max_workers: Optional[int] = None,
+                 exclude_patterns: Optional[List[str]] = None,
+                 file_budget_bytes: int = DEFAULT_BUDGET_BYTES, max_files: Optional[int] = DEFAULT_MAX_FILES,
+                 chunk_length: str = "tokens", index_params: Optional[IndexParams] = None,
+                 lexical_weight: float = 1.0, index_dir: Optional[str] = None,
+                 briefing_cache: Optional[BriefingCache] = None):
         """Initialize the RAG processor with a specified embedding model"""
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Per-repository processing budget used to pick which files to chunk
+        self.file_budget_bytes = file_budget_bytes
+        self.max_files = max_files
+        # Global .gitignore-style exclusions applied on top of the repo's own rules
+        self.exclude_patterns = list(DEFAULT_EXCLUDE_PATTERNS if exclude_patterns is None else exclude_patterns)
         
-        # Initialize embeddings
-        self.logger.info(f"Loading embedding model: {embedding_model_name}")
+        # Initialize embeddings (shared process-wide through the registry)
+        self.embedding_model_name = embedding_model_name
         try:
-            model_kwargs = {'device': 'cpu'}
-            encode_kwargs = {'normalize_embeddings': True, 'batch_size': 32}
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name=embedding_model_name,
-                model_kwargs=model_kwargs,
-                encode_kwargs=encode_kwargs
-            )
+            self.embeddings = get_embeddings(embedding_model_name)
         except Exception as e:
             self.logger.error(f"Failed to load embedding model: {e}")
             raise
             
-        # Configure text splitter for code and documentation
-        self.code_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=3000,
-            chunk_overlap=200,
-            separators=["\nclass ", "\ndef ", "\n\n", "\n", " ", ""]
-        )
+        # Chunk sizes are measured in the embedding model's own word pieces
+        # ("tokens") so chunks fit its sequence limit, or in characters ("chars")
+        tokenizer, self.max_seq_length = get_tokenizer_info(self.embeddings)
+        if chunk_length == "tokens" and tokenizer is None:
+            self.logger.warning("Embedding model exposes no tokenizer, sizing chunks by characters")
+            chunk_length = "chars"
+        self.chunk_length = chunk_length
+        self.token_counter = TokenCounter(tokenizer) if tokenizer is not None else None
+
+        if chunk_length == "tokens":
+            max_tokens = self.max_seq_length - SPECIAL_TOKENS
+            self.code_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=max_tokens,
+                chunk_overlap=16,
+                length_function=self.token_counter,
+                separators=["\nclass ", "\ndef ", "\n\n", "\n", " ", ""]
+            )
+            self.code_chunker = CodeChunker(self.code_splitter, max_chunk_size=max_tokens,
+                                            min_chunk_size=max_tokens // 4, length_function=self.token_counter)
+        else:
+            # Configure text splitter for code and documentation
+            self.code_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=3000,
+                chunk_overlap=200,
+                separators=["\nclass ", "\ndef ", "\n\n", "\n", " ", ""]
+            )
+            # Python files are split on function/class boundaries, everything
+            # else falls back to code_splitter
+            self.code_chunker = CodeChunker(self.code_splitter, max_chunk_size=3000)
         
         # Configure text splitter for briefing documents
         self.doc_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=150,
+            chunk_size=BRIEFING_CHUNK_SIZE,
+            chunk_overlap=BRIEFING_CHUNK_OVERLAP,
             separators=["\n## ", "\n### ", "\n\n", "\n", ". ", " ", ""]
         )
         
-        self.vector_store = None
+        # Thresholds for flat / HNSW / IVF-PQ selection and their search knobs
+        self.index_params = index_params or IndexParams()
+        # Code, briefing and metadata chunks live in separate indexes; each also
+        # keeps a BM25 index whose ranking is fused with the vector one
+        self.lexical_weight = lexical_weight
+        self.partitions: Dict[str, IndexPartition] = {}
+        # When set, repository partitions are streamed to disk here and served
+        # memory-mapped, so chunk text is not kept in memory once indexed
+        self.index_dir = index_dir
+        # Data dumps found by the content sniffer, indexed from a sample only
+        self.sampled_files: Set[str] = set()
+        # Parsed and embedded briefings keyed by PDF content hash
+        self.briefing_cache = briefing_cache or get_briefing_cache()
         
-    def _filter_relevant_files(self, repo_path: str) -> List[str]:
+    def _filter_relevant_files(self, repo_path: str, manifest: Optional[List[FileEntry]] = None) -> List[str]:
         """Filter out non-relevant files like binaries, images, etc."""
         self.logger.info(f"Starting to filter relevant files from {repo_path}")
         relevant_extensions = [
             '.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.html', '.css',
             '.md', '.rst', '.txt', '.json', '.yml', '.yaml', '.ipynb'
         ]
-        relevant_files = []
 
         MAX_FILE_SIZE = 5 * 1024 * 1024
-        
-        file_count = 0
-        for root, _, files in os.walk(repo_path):
-            # Skip common directories to ignore
-            if any(ignore_dir in root for ignore_dir in [
-                '.git', 'node_modules', '__pycache__', 'venv', 
-                'dist', 'build', 'out', '.next', '.sass-cache'
-            ]):
+
+        if manifest is None:
+            manifest = scan_repository(repo_path)
+
+        relevant_files = []
+        # Binary, minified and data-dump files hide behind text extensions; the
+        # head of each file decides whether it is skipped or only sampled
+        self.sampled_files = set()
+        self.sniff_report = {}
+        for entry in filter_by_extension(manifest, relevant_extensions):
+            if entry.size > MAX_FILE_SIZE:
+                self.logger.info(f"Skipping large file {entry.path} ({entry.size/1024/1024:.1f}MB)")
                 continue
-                
-            for file in files:
-                file_count += 1
-                if file_count % 100 == 0:
-                    self.logger.info(f"Scanned {file_count} files so far...")
-                    
-                file_path = os.path.join(root, file)
-                _, ext = os.path.splitext(file)
-                
-                if ext.lower() in relevant_extensions:
-                    try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > MAX_FILE_SIZE:
-                            self.logger.info(f"Skipping large file {file_path} ({file_size/1024/1024:.1f}MB)")
-                            continue
-                        relevant_files.append(file_path)
-                    except Exception:
-                        continue
+            kind = TEXT if entry.ext == '.ipynb' else sniff_file(entry.path, entry.ext, entry.size)
+            self.sniff_report[kind] = self.sniff_report.get(kind, 0) + 1
+            if kind == DATA:
+                self.sampled_files.add(entry.path)
+            elif kind != TEXT:
+                self.logger.info(f"Skipping {kind} file {entry.rel_path}")
+                continue
+            relevant_files.append(entry.path)
         
-        self.logger.info(f"Found {len(relevant_files)} relevant files out of {file_count} total files in repository")
+        self.logger.info(f"Found {len(relevant_files)} relevant files out of {len(manifest)} total files in repository")
+        self.logger.info(f"Content sniffing: {self.sniff_report}")
         return relevant_files
     
-    def _filter_files_by_extension(self, repo_path: str, extensions: List[str]) -> List[str]:
+    def _filter_files_by_extension(self, repo_path: str, extensions: List[str],
+                                   manifest: Optional[List[FileEntry]] = None) -> List[str]:
         """Filter files by extension"""
-        result_files = []
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                _, ext = os.path.splitext(file)
-                if ext.lower() in extensions:
-                    result_files.append(file_path)
-        return result_files
-
-    def _detect_technologies(self, repo_path: str) -> Dict[str, List[str]]:
-        """Detect technologies used in the repository by analyzing dependency files and imports"""
+        if manifest is None:
+            manifest = scan_repository(repo_path)
+        return [entry.path for entry in filter_by_extension(manifest, extensions)]
+
+    def _detect_technologies(self, repo_path: str, manifest: Optional[List[FileEntry]] = None,
+                             imports: Optional[Set[Tuple[str, str]]] = None) -> Dict[str, List[str]]:
+        """
+        Detect technologies used in the repository by analyzing dependency files and imports.
+
+        Args:
+            imports (set): (category, name) pairs already detected in the sources,
+                the Python files are scanned when None
+        """
         technologies = {
             "languages": [],
             "frameworks": [],
@@ -104,113 +174,132 @@ class RepoRAGProcessor:
             "tools": []
         }
         
-        # Check for common dependency files
-        dependency_files = {
-            "requirements.txt": "python",
-            "package.json": "javascript",
-            "pom.xml": "java",
-            "Gemfile": "ruby",
-            "build.gradle": "java",
-            "go.mod": "go",
-            "Cargo.toml": "rust"
-        }
-        
-        for root, _, files in os.walk(repo_path):
-            for file in files:
-                # Check dependency files
-                if file in dependency_files:
-                    file_path = os.path.join(root, file)
-                    tech_type = dependency_files[file]
-                    technologies["languages"].append(tech_type)
-                    
-                    # Parse specific dependency files
-                    if file == "requirements.txt":
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                for line in f:
-                                    if line.strip() and not line.startswith('#'):
-                                        lib = line.split('==')[0].split('>=')[0].strip()
-                                        if lib:
-                                            technologies["libraries"].append(lib)
-                        except Exception as e:
-                            self.logger.warning(f"Error parsing requirements.txt: {e}")
-                    
-                    elif file == "package.json":
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                data = json.load(f)
-                                # Add dependencies
-                                deps = data.get('dependencies', {})
-                                dev_deps = data.get('devDependencies', {})
-                                all_deps = list(deps.keys()) + list(dev_deps.keys())
-                                technologies["libraries"].extend(all_deps)
-                                # Check for popular frameworks
-                                if 'react' in deps or 'react-dom' in deps:
-                                    technologies["frameworks"].append("React")
-                                if 'vue' in deps:
-                                    technologies["frameworks"].append("Vue.js")
-                                if 'angular' in deps or '@angular/core' in deps:
-                                    technologies["frameworks"].append("Angular")
-                        except Exception as e:
-                            self.logger.warning(f"Error parsing package.json: {e}")
-
-        # Process Python imports
-        python_files = self._filter_files_by_extension(repo_path, ['.py'])
-        framework_imports = {
-            'flask': 'Flask',
-            'django': 'Django',
-            'fastapi': 'FastAPI',
-            'tensorflow': 'TensorFlow',
-            'torch': 'PyTorch',
-            'sklearn': 'scikit-learn',
-            'pandas': 'Pandas',
-            'numpy': 'NumPy'
-        }
-        
-        for file_path in python_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    for import_name, framework_name in framework_imports.items():
-                        if f"import {import_name}" in content or f"from {import_name}" in content:
-                            if framework_name in ['TensorFlow', 'PyTorch', 'scikit-learn']:
-                                technologies["frameworks"].append(framework_name)
-                            else:
-                                technologies["libraries"].append(framework_name)
-            except Exception:
-                continue
+        if manifest is None:
+            manifest = scan_repository(repo_path)
+
+        # Dependency manifests are parsed once; GitHubAnalyzer reuses this index
+        self.manifest_index = ManifestIndex.from_directory(repo_path, manifest)
+        for key, values in self.manifest_index.technologies().items():
+            technologies[key].extend(values)
+
+        # Imports are normally detected while the files are read for chunking;
+        # only direct calls scan the Python files here
+        if imports is None:
+            detector = TechDetector()
+            imports = set()
+            for file_path in self._filter_files_by_extension(repo_path, ['.py'], manifest):
+                try:
+                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        imports |= detector.detect(f.read())
+                except Exception:
+                    continue
+        for category, name in imports:
+            technologies[category].append(name)
 
         for key in technologies:
             technologies[key] = sorted(list(set(technologies[key])))
                 
         return technologies
         
+    def _read_and_split_files(self, file_paths: List[str], repo_path: str
+                              ) -> Iterator[Tuple[str, List[Chunk], Optional[str]]]:
+        """
+        Read and split files, in parallel when there are enough of them.
+        Yields (relative path, chunks, file text or None when the chunks are
+        not cut from the raw text, e.g. notebooks).
+
+        Results are yielded in the same order as file_paths regardless of which
+        worker finished first, so the resulting chunk order is deterministic.
+        Only a few files per worker are in flight at a time, so a slow consumer
+        holds the workers back instead of letting results pile up.
+
+        Technologies detected in the files read are collected in detected_imports.
+        """
+        self.detected_imports: Set[Tuple[str, str]] = set()
+        done = 0
+        workers = min(self.max_workers, len(file_paths))
+        if workers > 1 and len(file_paths) >= PARALLEL_MIN_FILES:
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=get_pool_context(),
+                                         initializer=init_worker,
+                                         initargs=(self.code_chunker,)) as executor:
+                    self.logger.info(f"Splitting {len(file_paths)} files with {workers} workers")
+                    pending = deque(executor.submit(read_and_split, path, repo_path, None, self._sample_bytes(path))
+                                    for path in file_paths[:workers * 4])
+                    while pending:
+                        result = pending.popleft().result()
+                        submitted = done + len(pending) + 1
+                        if submitted < len(file_paths):
+                            path = file_paths[submitted]
+                            pending.append(executor.submit(read_and_split, path, repo_path, None,
+                                                           self._sample_bytes(path)))
+                        done += 1
+                        yield from self._accept_split(result)
+            except Exception as e:
+                self.logger.warning(f"Parallel file processing failed, falling back to serial: {e}")
+
+        for path in file_paths[done:]:
+            yield from self._accept_split(read_and_split(path, repo_path, self.code_chunker,
+                                                          self._sample_bytes(path)))
+
+    def _sample_bytes(self, path: str) -> int:
+        return DATA_SAMPLE_BYTES if path in self.sampled_files else 0
+
+    def _accept_split(self, result: Tuple[str, List[Chunk], Optional[str], Set[Tuple[str, str]], Optional[str]]
+                      ) -> Iterator[Tuple[str, List[Chunk], Optional[str]]]:
+        relative_path, chunks, error, technologies, content = result
+        if error:
+            self.logger.warning(f"Failed to process file {relative_path}: {error}")
+            return
+        self.detected_imports.update(technologies)
+        yield relative_path, chunks, content
+
     def process_repository(self, repo_path: str) -> bool:
         """Process repository files and create vectors with better error handling"""
         try:
-            # Filter relevant files
+            # Scan the repository once; every later step reuses the manifest
             self.logger.info("Step 1: Filtering relevant files...")
-            relevant_files = self._filter_relevant_files(repo_path)
+            matcher = IgnoreMatcher.for_repository(repo_path, self.exclude_patterns)
+            manifest = scan_repository(repo_path, matcher=matcher)
+            relevant_files = self._filter_relevant_files(repo_path, manifest)
             
             if not relevant_files:
                 self.logger.error("No relevant files found in repository")
                 return False
                 
-            # Limit files for large repositories
-            MAX_FILES = 200
-            if len(relevant_files) > MAX_FILES:
-                self.logger.warning(f"Repository has {len(relevant_files)} files. Limiting to {MAX_FILES} for processing.")
-                # Prioritize README and key files first
-                priority_files = [f for f in relevant_files if 
-                                os.path.basename(f).lower() == 'readme.md' or
-                                'main' in os.path.basename(f).lower() or 
-                                'index' in os.path.basename(f).lower()]
-                other_files = [f for f in relevant_files if f not in priority_files]
-                relevant_files = priority_files + other_files[:MAX_FILES-len(priority_files)]
+            # Keep the most important files within the processing budget;
+            # sampled data files only cost their sample, large files their
+            # per-file budget
+            entries_by_path = {entry.path: entry for entry in manifest}
+            candidates = [entries_by_path[path] for path in relevant_files]
+            candidates = [entry._replace(size=min(entry.size, DATA_SAMPLE_BYTES)) if entry.path in self.sampled_files
+                          else entry for entry in candidates]
+            selected = select_files(
+                candidates, repo_path,
+                budget_bytes=self.file_budget_bytes, max_files=self.max_files, cost_cap=MAX_FILE_BYTES
+            )
+            if len(selected) < len(relevant_files):
+                self.logger.warning(f"Repository has {len(relevant_files)} files. Limiting to {len(selected)} for processing.")
+            relevant_files = [entry.path for entry in selected]
             
-            self.logger.info("Step 2: Detecting technologies...")
+            # Stream files through chunking, deduplication and embedding; each
+            # stage runs concurrently and bounded queues cap what is in flight
+            self.logger.info("Step 2: Streaming files through chunk, dedup and embed stages...")
+            self.dedup_report = None
+            self.truncation_report = None
+            self.detected_imports = set()
+            self.manifest_index = None
+            builders = None
             try:
-                technologies = self._detect_technologies(repo_path)
+                builders = self._stream_repository(relevant_files, repo_path)
+            except Exception as pipeline_error:
+                self.logger.error(f"Error creating vector store: {pipeline_error}")
+
+            # Imports were detected on the texts read by the pipeline
+            self.logger.info("Step 3: Detecting technologies...")
+            try:
+                technologies = self._detect_technologies(repo_path, manifest, self.detected_imports)
                 self.technologies = technologies
                 tech_summary = json.dumps(technologies, indent=2)
                 self.logger.info(f"Detected technologies: {tech_summary}")
@@ -224,87 +313,31 @@ class RepoRAGProcessor:
                 page_content=f"Repository Technologies:\n{tech_summary}",
                 metadata={"source": "technology_analysis", "type": "metadata"}
             )
-            
-            # Process each file with careful memory management
-            self.logger.info("Step 3: Processing files into document chunks...")
-            documents = [tech_doc]
-            total_files = len(relevant_files)
-        
-            # Process files in smaller batches to avoid memory issues
-            batch_size = 20
-            for batch_idx in range(0, total_files, batch_size):
-                batch_end = min(batch_idx + batch_size, total_files)
-                self.logger.info(f"Processing file batch {batch_idx+1}-{batch_end} of {total_files}...")
-                
-                for idx in range(batch_idx, batch_end):
-                    file_path = relevant_files[idx]
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            
-                            # Limit content size for very large files
-                            MAX_CONTENT_SIZE = 50000  # ~50KB limit
-                            if len(content) > MAX_CONTENT_SIZE:
-                                self.logger.info(f"Truncating large file: {os.path.basename(file_path)}")
-                                content = content[:MAX_CONTENT_SIZE] + "\n...[content truncated]..."
-                                
-                            relative_path = os.path.relpath(file_path, repo_path)
-                            
-                            # Create chunks
-                            file_docs = self.code_splitter.create_documents(
-                                texts=[content],
-                                metadatas=[{"source": relative_path, "type": "code"}]
-                            )
-                            documents.extend(file_docs)
-                    except Exception as e:
-                        self.logger.warning(f"Failed to process file {file_path}: {e}")
-            
-            self.logger.info(f"Successfully processed {len(documents)-1} files into {len(documents)} total chunks")
-            
-            if len(documents) <= 1:
-                self.logger.error("No documents processed from repository")
-                return False
-                
-            # Create vector store in smaller batches
-            try:
-                self.logger.info("Step 4: Creating vector store from documents...")
-                # Start with just the tech document to establish the vector store
-                self.vector_store = FAISS.from_documents(
-                    [documents[0]], 
-                    self.embeddings,
-                    distance_strategy='cosine'
-                )
-                
-                # Add remaining documents in small batches
-                remaining_docs = documents[1:]
-                batch_size = 50  # Smaller batches for vector creation
-                total_batches = (len(remaining_docs) + batch_size - 1) // batch_size
-                
-                for i in range(0, len(remaining_docs), batch_size):
-                    batch_end = min(i + batch_size, len(remaining_docs))
-                    current_batch = i // batch_size + 1
-                    self.logger.info(f"Adding vector batch {current_batch}/{total_batches} ({i+1}-{batch_end} of {len(remaining_docs)})")
-                    batch_docs = remaining_docs[i:batch_end]
-                    self.vector_store.add_documents(batch_docs)
-                
-                self.logger.info(f"Repository processing complete with {len(documents)} chunks")
-                return True
-                
-            except Exception as vector_error:
-                self.logger.error(f"Error creating vector store: {vector_error}")
+
+            if builders is None:
                 # Fallback to minimal document set (just metadata)
                 try:
                     self.logger.info("Attempting recovery with minimal document set...")
-                    self.vector_store = FAISS.from_documents(
-                        [documents[0]], 
-                        self.embeddings,
-                        distance_strategy='cosine'
-                    )
+                    self._build_partitions([tech_doc], replace=("code", "metadata"))
                     self.logger.info("Recovery successful with metadata only")
                     return True
                 except Exception as fallback_error:
                     self.logger.error(f"Fallback attempt also failed: {fallback_error}")
                     return False
+
+            if not len(builders["code"]):
+                self.logger.error("No documents processed from repository")
+                return False
+            builders["metadata"].add([tech_doc], np.asarray(self.embeddings.embed_documents([tech_doc.page_content]),
+                                                            dtype=np.float32))
+
+            self.logger.info("Step 4: Building partition indexes...")
+            for name in ("code", "metadata"):
+                self.partitions.pop(name, None)
+                self.partitions[name] = builders[name].finish()
+
+            self.logger.info(f"Repository processing complete with {len(builders['code']) + 1} chunks")
+            return True
                 
         except Exception as e:
             self.logger.error(f"Failed to process repository: {e}")
@@ -312,12 +345,101 @@ class RepoRAGProcessor:
             self.logger.error(f"Traceback: {traceback.format_exc()}")
             return False
             
+    def _partition_builder(self, name: str) -> PartitionBuilder:
+        directory = os.path.join(self.index_dir, name) if self.index_dir else None
+        return PartitionBuilder(name, self.embeddings, self.index_params, self.lexical_weight,
+                                directory, self.embedding_model_name)
+
+    def _stream_repository(self, file_paths: List[str], repo_path: str) -> Dict[str, PartitionBuilder]:
+        """
+        Run the ingestion pipeline: read/split (worker pool) -> chunk documents
+        and drop duplicates -> embed in length-bucketed batches -> add to
+        partition builders.
+
+        Sets dedup_report, truncation_report and pipeline_stats on the way.
+
+        Returns:
+            dict: Partition builders ready to finish, by partition name
+        """
+        deduplicator = ChunkDeduplicator()
+        truncation = (TruncationStats(self.token_counter, self.max_seq_length)
+                      if self.token_counter is not None else None)
+        scheduler = EmbeddingScheduler(self.embeddings, max_length=truncation.limit if truncation else None)
+        processed_files = 0
+
+        builders = {name: self._partition_builder(name) for name in ("code", "metadata")}
+        code = builders["code"]
+
+        def chunk_files(files):
+            nonlocal processed_files
+            for relative_path, chunks, content in files:
+                processed_files += 1
+                # Chunks found verbatim in the file become views on one stored copy of it
+                located = locate_chunks(content, [text for text, _ in chunks]) if content else [None] * len(chunks)
+                file_id = None
+                for (text, metadata), position in zip(chunks, located):
+                    doc = Document(page_content=text, metadata={"source": relative_path, "type": "code", **metadata})
+                    # Collapse copy-pasted files and vendored copies to one vector each
+                    if not deduplicator.add(doc):
+                        continue
+                    # Token lengths are measured once, for the report and the batch scheduler
+                    length = truncation.add(text) if truncation is not None else estimate_tokens(text)
+                    span = None
+                    if position is not None:
+                        if file_id is None:
+                            file_id = code.add_source(content)
+                        start, end, line = position
+                        span = ChunkSpan(file_id, start, end)
+                        if "start_line" not in doc.metadata:
+                            doc.metadata["start_line"] = line
+                            doc.metadata["end_line"] = line + text.count("\n")
+                    yield doc, span, length
+
+        def embed_batches(items):
+            # Each window is embedded shortest chunks first and handed on in file order
+            for window in batched(items, SCHEDULE_WINDOW):
+                docs, spans, lengths = zip(*window)
+                vectors = scheduler.embed([doc.page_content for doc in docs], lengths)
+                yield list(docs), list(spans), vectors
+
+        pipeline = Pipeline(self._read_and_split_files(file_paths, repo_path),
+                            [("chunk", chunk_files), ("embed", embed_batches)])
+        # Chunk texts are dropped once embedded; the builder keeps spans into the stored files
+        for docs, spans, vectors in pipeline:
+            code.add(docs, vectors, spans)
+        # Kept chunks reach the builder in keep order; copies found after a chunk
+        # was written to disk are recorded now
+        for position, metadata in deduplicator.duplicated():
+            code.update_metadata(position, metadata)
+
+        self.pipeline_stats = pipeline.report()
+        pipeline.log_report(self.logger)
+        self.logger.info(f"Successfully processed {processed_files} files into {len(builders['code'])} unique chunks")
+
+        self.dedup_report = deduplicator.report
+        deduplicator.log_report()
+        if truncation is not None:
+            # Report how much of each chunk falls past the model's sequence limit
+            self.truncation_report = truncation.to_dict()
+            self.logger.info(f"Chunk truncation report: {json.dumps(self.truncation_report)}")
+        return builders
+
     def process_briefing(self, briefing_path: str) -> bool:
-        """Process briefing document and add to vector store"""
+        """
+        Process briefing document and add to vector store.
+
+        The briefing partition is cached by the PDF's content hash, so
+        analysing the same briefing again attaches its stored chunks and
+        embeddings instead of parsing and embedding the PDF.
+        """
         try:
-            # Load PDF
-            loader = PyPDFLoader(briefing_path)
-            briefing_docs = loader.load()
+            digest = self._cached_briefing(briefing_path)
+            if "briefing" in self.partitions:
+                self._remove_briefing_file(briefing_path)
+                return True
+
+            # Load PDF, one document per page with headings marked up for the splitter
+            briefing_docs = extract_pdf_pages(briefing_path)
             
             # Split into chunks
             briefing_chunks = self.doc_splitter.split_documents(briefing_docs)
@@ -328,40 +450,164 @@ class RepoRAGProcessor:
             
             self.logger.info(f"Briefing processed with {len(briefing_chunks)} chunks")
             
-            # Add to existing store or create new one
-            if self.vector_store:
-                self.vector_store.add_documents(briefing_chunks)
-            else:
-                self.vector_store = FAISS.from_documents(briefing_chunks, self.embeddings)
+            # The briefing has its own partition, independent of the repository indexes
+            self._build_partitions(briefing_chunks, replace=("briefing",))
+
+            if digest and "briefing" in self.partitions:
+                try:
+                    self.briefing_cache.put_partition(digest, self._briefing_cache_key(),
+                                                      self.partitions["briefing"], self.embedding_model_name)
+                except Exception as e:
+                    self.logger.warning(f"Failed to cache briefing: {e}")
                 
-            try:
-                os.remove(briefing_path)
-                self.logger.info(f"Deleted briefing file: {briefing_path}")
-            except OSError as e:
-                self.logger.warning(f"Failed to delete briefing file: {e}")
-            
+            self._remove_briefing_file(briefing_path)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to process briefing: {e}")
             return False
+
+    def _briefing_cache_key(self) -> str:
+        """Everything a cached briefing partition depends on besides the PDF itself"""
+        return config_key("pymupdf", self.embedding_model_name, BRIEFING_CHUNK_SIZE, BRIEFING_CHUNK_OVERLAP,
+                          self.lexical_weight)
+
+    def _cached_briefing(self, briefing_path: str) -> Optional[str]:
+        """
+        Attach the cached briefing partition if this PDF was processed before.
+
+        Returns:
+            str: The PDF's content hash, or None when caching is unavailable
+        """
+        self.partitions.pop("briefing", None)
+        if self.briefing_cache is None:
+            return None
+        try:
+            digest = file_digest(briefing_path)
+        except OSError as e:
+            self.logger.warning(f"Cannot hash briefing {briefing_path}: {e}")
+            return None
+
+        partition = self.briefing_cache.get_partition(digest, self._briefing_cache_key(), self.embeddings,
+                                                      self.embedding_model_name)
+        if partition is not None:
+            self.partitions["briefing"] = partition
+            self.logger.info(f"Briefing loaded from cache with {len(partition)} chunks")
+        return digest
+
+    def _remove_briefing_file(self, briefing_path: str) -> None:
+        try:
+            os.remove(briefing_path)
+            self.logger.info(f"Deleted briefing file: {briefing_path}")
+        except OSError as e:
+            self.logger.warning(f"Failed to delete briefing file: {e}")
             
-    def retrieve_relevant_content(self, query: str, k: int = 8) -> List[Document]:
+    def _build_partitions(self, documents: List[Document], replace: Tuple[str, ...] = ()) -> None:
+        """
+        Build one partition per chunk type present in documents.
+
+        Partitions named in `replace` are dropped first, so reprocessing a
+        repository never leaves stale code chunks behind while other
+        partitions (e.g. the briefing) are kept.
+        """
+        for name in replace:
+            self.partitions.pop(name, None)
+
+        grouped: Dict[str, List[Document]] = {}
+        for doc in documents:
+            grouped.setdefault(partition_for(doc), []).append(doc)
+        for name, docs in grouped.items():
+            self.partitions[name] = IndexPartition(
+                name, self.embeddings, self.index_params, self.lexical_weight
+            ).build(docs)
+
+    def _search_candidates(self, queries: List[str], k: int,
+                           query_partitions: Optional[List[Optional[Sequence[str]]]] = None
+                           ) -> Tuple[np.ndarray, List[List[Candidate]]]:
+        """
+        Embed all queries in one pass (repeated queries come from the model's
+        query cache) and search every targeted partition with a single matrix
+        call, merging the partitions' hits into one ranking per query.
+
+        Args:
+            queries (list): Query strings
+            k (int): Candidates kept per query
+            query_partitions (list): Partition names per query, None for all
+
+        Returns:
+            tuple: (query vectors, candidates per query with their stored vectors)
+        """
+        vectors = np.asarray(
+            embed_queries(queries, self.embedding_model_name, embeddings=self.embeddings),
+            dtype=np.float32
+        )
+        return vectors, search_partitions(self.partitions, queries, vectors, k, query_partitions, self.lexical_weight)
+
+    def retrieve_relevant_content(self, query: str, k: int = 8,
+                                  partitions: Optional[Sequence[str]] = None) -> List[Document]:
         """Retrieve the most relevant content for a given query"""
-        if not self.vector_store:
+        return self.retrieve_relevant_content_batch([query], k, partitions)[0]
+
+    def retrieve_relevant_content_batch(self, queries: List[str], k: int = 8,
+                                        partitions: Optional[Sequence[str]] = None) -> List[List[Document]]:
+        """
+        Retrieve the most relevant content for several queries at once,
+        optionally restricted to some partitions ("code", "briefing", "metadata").
+        """
+        if not self.partitions:
             self.logger.error("Vector store not initialized")
+            return [[] for _ in queries]
+        if not queries:
             return []
-            
+
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
-            return docs
+            _, results = self._search_candidates(queries, k, [partitions] * len(queries))
+            return [[c.document for c in candidates] for candidates in results]
         except Exception as e:
             self.logger.error(f"Failed to retrieve content: {e}")
-            return []
+            return [[] for _ in queries]
 
-    def get_formatted_context(self, query: str, k: int = 8) -> str:
-        """Get formatted context string from relevant documents"""
-        docs = self.retrieve_relevant_content(query, k)
+    def save_indexes(self, directory: str) -> None:
+        """Persist every partition under directory/<partition name>"""
+        for name, partition in self.partitions.items():
+            partition.save(os.path.join(directory, name), self.embedding_model_name)
+
+    def open_indexes(self, directory: str, names: Optional[Sequence[str]] = None, use_mmap: bool = True) -> bool:
+        """
+        Serve previously saved partitions, memory-mapped read-only by default,
+        so several workers answering follow-up queries share the OS page cache
+        instead of each loading the indexes into its own heap.
+
+        Args:
+            directory (str): Directory passed to save_indexes
+            names (list): Partitions to open, all saved ones by default
+            use_mmap (bool): Map files instead of reading them into memory
+
+        Returns:
+            bool: True if at least one partition was opened
+        """
+        names = names or [name for name in PARTITION_NAMES if os.path.isdir(os.path.join(directory, name))]
+        opened = 0
+        for name in names:
+            try:
+                self.partitions[name] = IndexPartition.open(
+                    os.path.join(directory, name), self.embeddings, self.embedding_model_name, use_mmap
+                )
+                opened += 1
+            except Exception as e:
+                self.logger.error(f"Failed to open {name} partition from {directory}: {e}")
+        self.logger.info(f"Opened {opened} partitions from {directory}")
+        return opened > 0
+
+    def warm_query_cache(self, queries: List[str]) -> None:
+        """Embed fixed queries ahead of time so later retrievals skip the model"""
+        try:
+            embed_queries(queries, self.embedding_model_name, embeddings=self.embeddings)
+        except Exception as e:
+            self.logger.warning(f"Failed to warm query cache: {e}")
+
+    def _format_documents(self, docs: List[Document]) -> str:
+        """Render retrieved documents as labelled context blocks"""
         context_parts = []
         
         for doc in docs:
@@ -369,8 +615,43 @@ class RepoRAGProcessor:
             doc_type = doc.metadata.get("type", "unknown")
             
             if doc_type == "code":
+                if "start_line" in doc.metadata:
+                    source = f"{source} (lines {doc.metadata['start_line']}-{doc.metadata['end_line']})"
                 context_parts.append(f"--- FROM CODE FILE: {source} ---\n{doc.page_content}\n")
             else:
                 context_parts.append(f"--- FROM BRIEFING ---\n{doc.page_content}\n")
                 
-        return "\n".join(context_parts)
\ No newline at end of file
+        return "\n".join(context_parts)
+
+    def get_formatted_context(self, query: str, k: int = 8, partitions: Optional[Sequence[str]] = None) -> str:
+        """Get formatted context string from relevant documents"""
+        return self._format_documents(self.retrieve_relevant_content(query, k, partitions))
+
+    def get_formatted_context_batch(self, queries: List[str], k: int = 8,
+                                    partitions: Optional[Sequence[str]] = None) -> List[str]:
+        """Get one formatted context string per query using a single batched search"""
+        return [self._format_documents(docs) for docs in self.retrieve_relevant_content_batch(queries, k, partitions)]
+
+    def get_assembled_context(self, queries: List[str], k: int = 5, fetch_k: int = 20,
+                              lambda_mult: float = DEFAULT_LAMBDA, max_chunks: Optional[int] = None,
+                              query_partitions: Optional[List[Optional[Sequence[str]]]] = None) -> str:
+        """
+        Build one deduplicated context for several queries.
+
+        Each query retrieves fetch_k candidates from its partitions (all of
+        them by default); k are kept with MMR, never repeating a chunk chosen
+        for an earlier query, and the result is grouped by source file.
+        """
+        if not self.partitions:
+            self.logger.error("Vector store not initialized")
+            return ""
+        if not queries:
+            return ""
+
+        try:
+            _, candidates = self._search_candidates(queries, max(k, fetch_k), query_partitions)
+            documents, self.context_stats = assemble_documents(candidates, k, lambda_mult, max_chunks)
+            return format_grouped_context(documents)
+        except Exception as e:
+            self.logger.error(f"Failed to assemble context: {e}")
+            return ""
@@ -0,0 +1,99 @@
+"""
+Embedding throughput (chunks/second) of fixed-size batches in file order,
+as the ingestion pipeline used to embed, against the length-bucketed
+EmbeddingScheduler, on the chunks of a real repository.
+
+Usage:
+    python benchmarks/bench_embedding_batches.py --repo . --max-chunks 2000
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from code_chunker import CodeChunker
+from embedding_registry import DEFAULT_EMBEDDING_MODEL, get_embeddings
+from embedding_scheduler import EmbeddingScheduler, plan_batches, padded_tokens, BATCH_TOKEN_BUDGET
+from repo_scanner import scan_repository, filter_by_extension
+from token_budget import TokenCounter, get_tokenizer_info, SPECIAL_TOKENS
+
+EXTENSIONS = ['.py', '.js', '.ts', '.java', '.md', '.rst', '.txt', '.json', '.yml', '.yaml', '.toml', '.cfg']
+
+# The previous pipeline: 64 chunks per call, re-split by the model into batches of 32
+FIXED_CALL_SIZE = 64
+FIXED_BATCH_SIZE = 32
+
+
+def repository_chunks(repo_path, counter, max_tokens, max_chunks):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=max_tokens, chunk_overlap=16, length_function=counter,
+                                              separators=["\nclass ", "\ndef ", "\n\n", "\n", " ", ""])
+    chunker = CodeChunker(splitter, max_chunk_size=max_tokens, min_chunk_size=max_tokens // 4,
+                          length_function=counter)
+    texts = []
+    for entry in filter_by_extension(scan_repository(repo_path), EXTENSIONS):
+        try:
+            with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+                texts.extend(text for text, _ in chunker.split(f.read(), entry.path))
+        except OSError:
+            continue
+        if len(texts) >= max_chunks:
+            break
+    return texts[:max_chunks]
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(repo_path, model_name, max_chunks, token_budget, repeat):
+    embeddings = get_embeddings(model_name)
+    tokenizer, max_seq_length = get_tokenizer_info(embeddings)
+    counter = TokenCounter(tokenizer)
+    limit = max_seq_length - SPECIAL_TOKENS
+    texts = repository_chunks(repo_path, counter, limit, max_chunks)
+    lengths = [min(counter(text), limit) for text in texts]
+    print(f"{len(texts)} chunks from {repo_path}, {sum(lengths)} tokens, model {model_name}")
+
+    def fixed():
+        embeddings.encode_kwargs["batch_size"] = FIXED_BATCH_SIZE
+        for i in range(0, len(texts), FIXED_CALL_SIZE):
+            embeddings.embed_documents(texts[i:i + FIXED_CALL_SIZE])
+
+    scheduler = EmbeddingScheduler(embeddings, token_budget=token_budget)
+
+    def bucketed():
+        scheduler.embed(texts, lengths)
+
+    # sentence-transformers sorts each call's texts by length before cutting its batches
+    fixed_batches = []
+    for i in range(0, len(texts), FIXED_CALL_SIZE):
+        call = sorted(range(i, min(i + FIXED_CALL_SIZE, len(texts))), key=lengths.__getitem__)
+        fixed_batches.extend(call[j:j + FIXED_BATCH_SIZE] for j in range(0, len(call), FIXED_BATCH_SIZE))
+    variants = [
+        ("fixed", fixed, padded_tokens(lengths, fixed_batches)),
+        ("bucketed", bucketed, padded_tokens(lengths, plan_batches(lengths, token_budget))),
+    ]
+    print(f"{'batching':>9} {'seconds':>8} {'chunks/s':>9} {'padded tokens':>14} {'padding':>8}")
+    baseline = None
+    for name, func, padded in variants:
+        seconds = timed(func, repeat)
+        baseline = baseline or seconds
+        print(f"{name:>9} {seconds:>8.2f} {len(texts) / seconds:>9.1f} {padded:>14} "
+              f"{padded / sum(lengths) - 1:>7.0%}  x{baseline / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repo", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument("--max-chunks", type=int, default=2000)
+    parser.add_argument("--token-budget", type=int, default=BATCH_TOKEN_BUDGET)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+    run(args.repo, args.model, args.max_chunks, args.token_budget, args.repeat)
@@ -0,0 +1,67 @@
+"""
+Briefing PDF parsing time: langchain's PyPDFLoader (pypdf) against
+pdf_extractor.extract_pdf_pages (PyMuPDF) serial and with worker
+processes, on generated text-heavy PDFs with headings.
+
+Usage:
+    python benchmarks/bench_pdf_extract.py --pages 10 50 200 --workers 4
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import fitz
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_extractor import extract_pdf_pages
+
+PARAGRAPH = ("The service must expose a REST API for managing users and projects, persist data in "
+             "PostgreSQL, ship with automated tests and be deployable with Docker. ")
+
+
+def write_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Annex {number}: Requirements", fontsize=16)
+        page.insert_textbox(fitz.Rect(72, 100, 540, 760), PARAGRAPH * 12, fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(page_counts, workers, repeat):
+    PyPDFLoader = None
+    if importlib.util.find_spec("pypdf"):  # PyPDFLoader's backend, imported on load
+        from langchain_community.document_loaders import PyPDFLoader
+    else:
+        print("pypdf is not installed, skipping the PyPDFLoader baseline")
+
+    print(f"{'pages':>6} {'pypdf s':>8} {'pymupdf s':>10} {f'x{workers} s':>8} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in page_counts:
+            path = os.path.join(directory, f"brief_{pages}.pdf")
+            write_pdf(path, pages)
+            baseline = timed(lambda: PyPDFLoader(path).load(), repeat) if PyPDFLoader else float("nan")
+            serial = timed(lambda: extract_pdf_pages(path, max_workers=1), repeat)
+            parallel = timed(lambda: extract_pdf_pages(path, max_workers=workers), repeat)
+            print(f"{pages:>6} {baseline:>8.3f} {serial:>10.3f} {parallel:>8.3f} "
+                  f"{baseline / min(serial, parallel):>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.pages, args.workers, args.repeat)
@@ -0,0 +1,80 @@
+"""
+Recall@k, query latency and memory of the flat, HNSW and IVF-PQ indexes
+built by vector_index.create_index, with float32, fp16 and PQ storage and
+optional full-vector re-ranking, on synthetic clustered 384-dim unit
+vectors (the shape of all-MiniLM-L6-v2 embeddings).
+
+Usage:
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 --k 5
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+import numpy as np
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_index import IndexParams, create_index, index_memory_bytes
+
+# (index type, compression, rerank factor)
+VARIANTS = [
+    ("flat", None, 0),
+    ("flat", "fp16", 0),
+    ("flat", "pq", 0),
+    ("flat", "pq", 4),
+    ("hnsw", None, 0),
+    ("hnsw", "fp16", 0),
+    ("hnsw", "pq", 4),
+    ("ivfpq", None, 0),
+    ("ivfpq", None, 4),
+]
+
+
+def clustered_vectors(n, dim, clusters=200, seed=0):
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(clusters, dim).astype(np.float32)
+    vectors = centers[rng.randint(0, clusters, n)] + 0.2 * rng.randn(n, dim).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def run(sizes, dim, k, num_queries, params):
+    print(f"{'vectors':>9} {'index':>6} {'storage':>8} {'rerank':>6} {'build s':>8} "
+          f"{'recall@k':>9} {'query ms':>9} {'MB':>8}")
+    for n in sizes:
+        vectors = clustered_vectors(n, dim)
+        queries = clustered_vectors(num_queries, dim, seed=1)
+        truth = None
+        for index_type, compression, rerank in VARIANTS:
+            variant = replace(params, compression=compression, rerank_factor=rerank)
+            start = time.perf_counter()
+            index = create_index(vectors, index_type, variant)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for query in queries:
+                _, ids = index.search(query[None, :], k)
+            latency_ms = (time.perf_counter() - start) / num_queries * 1000
+
+            _, ids = index.search(queries, k)
+            if truth is None:
+                truth = ids
+            megabytes = index_memory_bytes(index) / 2 ** 20
+            print(f"{n:>9} {index_type:>6} {compression or ('pq' if index_type == 'ivfpq' else 'float32'):>8} {rerank:>6} {build:>8.2f} "
+                  f"{recall_at_k(ids, truth):>9.3f} {latency_ms:>9.3f} {megabytes:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--ef-search", type=int, default=IndexParams.hnsw_ef_search)
+    parser.add_argument("--nprobe", type=int, default=IndexParams.ivf_nprobe)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.k, args.queries,
+        IndexParams(hnsw_ef_search=args.ef_search, ivf_nprobe=args.nprobe))
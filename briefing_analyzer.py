@@ -1,17 +1,18 @@
-import fitz
 import logging
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from sklearn.metrics.pairwise import cosine_similarity
+from embedding_registry import get_embeddings
+from briefing_cache import get_briefing_cache, file_digest
+from pdf_extractor import extract_pdf_pages
 
 class ComplianceAnalyzer:
     def __init__(self):
         """Initialize ComplianceAnalyzer with logging configuration"""
         self.logger = logging.getLogger(__name__)
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        self.embeddings = get_embeddings("sentence-transformers/all-MiniLM-L6-v2")
         self.threshold = 0.7  # Minimum similarity for compliance
+        # Shared with the RAG processor: a briefing is parsed once per content hash
+        self.briefing_cache = get_briefing_cache()
 
     def extract_text_from_pdf(self, pdf_path):
         """
@@ -24,12 +25,30 @@ class ComplianceAnalyzer:
             str: Extracted text from PDF
         """
         text = ""
+        digest = None
         try:
-            doc = fitz.open(pdf_path)
-            text = " ".join([page.get_text() for page in doc])
+            digest = file_digest(pdf_path)
+            cached = self.briefing_cache.get_text(digest)
+            if cached is not None:
+                self.logger.info(f"Loaded cached text for {pdf_path}")
+                return cached
+        except OSError:
+            # Unreadable as a plain file; let the extractor report the problem
+            pass
+
+        try:
+            pages = extract_pdf_pages(pdf_path, structured=False)
+            text = " ".join(page.page_content for page in pages)
             self.logger.info(f"Successfully extracted text from {pdf_path}")
         except Exception as e:
             self.logger.error(f"Error extracting text from PDF: {e}")
+            return text
+
+        if digest:
+            try:
+                self.briefing_cache.put_text(digest, text)
+            except OSError as e:
+                self.logger.warning(f"Failed to cache briefing text: {e}")
         return text
 
     def check_compliance_with_briefing(self, repo_docs, briefing_text):
@@ -0,0 +1,140 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+from index_partitions import IndexPartition
+from index_store import META_FILE, replacing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "repo_analyzer", "briefings")
+MAX_ENTRIES = 32  # cached PDFs kept on disk, least recently used are removed first
+MAX_OPEN_PARTITIONS = 8  # opened briefing partitions kept per process
+
+TEXT_FILE = "text.txt"
+
+_caches: Dict[str, "BriefingCache"] = {}
+_lock = threading.Lock()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_key(*parts) -> str:
+    """Short stable key for the settings an artifact depends on (model, splitter, ...)"""
+    return hashlib.sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+
+
+class BriefingCache:
+    """
+    Parsed briefings keyed by the SHA-256 of the PDF bytes.
+
+    Each entry is a directory holding the extracted text and, per embedding
+    configuration, the saved briefing partition (chunks, embeddings and
+    BM25 arrays). Re-uploading the same PDF then skips parsing, splitting
+    and embedding: the partition is opened memory-mapped, or reused directly
+    when this process already opened it.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._partitions: "OrderedDict[Tuple[str, str], IndexPartition]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def _touch(self, digest: str) -> None:
+        try:
+            os.utime(self._entry(digest))
+        except OSError:
+            pass
+
+    def get_text(self, digest: str) -> Optional[str]:
+        path = os.path.join(self._entry(digest), TEXT_FILE)
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            return None
+        self._touch(digest)
+        return text
+
+    def put_text(self, digest: str, text: str) -> None:
+        entry = self._entry(digest)
+        os.makedirs(entry, exist_ok=True)
+        with replacing(os.path.join(entry, TEXT_FILE)) as tmp, open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self._prune()
+
+    def get_partition(self, digest: str, key: str, embeddings,
+                      embedding_model: Optional[str] = None) -> Optional[IndexPartition]:
+        """Cached briefing partition for the given configuration key, or None"""
+        with self._lock:
+            partition = self._partitions.get((digest, key))
+            if partition is not None:
+                self._partitions.move_to_end((digest, key))
+                return partition
+
+        directory = os.path.join(self._entry(digest), key)
+        # The meta file is written last, so its presence marks a complete entry
+        if not os.path.exists(os.path.join(directory, META_FILE)):
+            return None
+        try:
+            partition = IndexPartition.open(directory, embeddings, embedding_model)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable briefing cache entry {directory}: {e}")
+            return None
+        self._touch(digest)
+        self._remember(digest, key, partition)
+        return partition
+
+    def put_partition(self, digest: str, key: str, partition: IndexPartition,
+                      embedding_model: Optional[str] = None) -> None:
+        partition.save(os.path.join(self._entry(digest), key), embedding_model)
+        self._remember(digest, key, partition)
+        self._prune()
+
+    def _remember(self, digest: str, key: str, partition: IndexPartition) -> None:
+        with self._lock:
+            self._partitions[(digest, key)] = partition
+            self._partitions.move_to_end((digest, key))
+            while len(self._partitions) > MAX_OPEN_PARTITIONS:
+                self._partitions.popitem(last=False)
+
+    def _prune(self) -> None:
+        """Remove the least recently used entries beyond max_entries"""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.is_dir()]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            # Processes that still map these files keep valid pages after unlinking
+            shutil.rmtree(entry.path, ignore_errors=True)
+            logger.info(f"Evicted briefing cache entry {entry.name}")
+
+
+def get_briefing_cache(directory: Optional[str] = None) -> BriefingCache:
+    """
+    Process-wide cache for a directory, shared by the RAG processor and the
+    compliance analyzer. Defaults to $BRIEFING_CACHE_DIR or ~/.cache.
+    """
+    directory = directory or os.environ.get("BRIEFING_CACHE_DIR") or DEFAULT_CACHE_DIR
+    with _lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = BriefingCache(directory)
+        return cache
@@ -0,0 +1,162 @@
+import re
+import zlib
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Iterator, Tuple, Optional
+import numpy as np
+from langchain.schema.document import Document
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+
+@dataclass
+class DedupReport:
+    """Summary of what the deduplication stage removed"""
+    total_chunks: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    chars_removed: int = 0
+
+    @property
+    def kept_chunks(self) -> int:
+        return self.total_chunks - self.exact_duplicates - self.near_duplicates
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "total_chunks": self.total_chunks,
+            "kept_chunks": self.kept_chunks,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "chars_removed": self.chars_removed,
+        }
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, vectorised with numpy"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        # Coefficients below 2**31 keep a * x (x < 2**32) inside uint64
+        self.a = rng.randint(1, 2 ** 31, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 2 ** 31, size=num_perm).astype(np.uint64)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = _TOKEN_RE.findall(text.lower())
+        size = min(self.shingle_size, len(tokens)) or 1
+        grams = {" ".join(tokens[i:i + size]) for i in range(max(1, len(tokens) - size + 1))}
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        permuted = (np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+def _exact_key(text: str) -> str:
+    """Hash of the text with whitespace normalised, so reindented copies still match"""
+    normalised = " ".join(text.split())
+    return hashlib.blake2b(normalised.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ChunkDeduplicator:
+    """
+    Incremental form of deduplicate_chunks: chunks are offered one at a time
+    and only small per-chunk state (hash key, signature, metadata reference)
+    is kept, so it can sit in a streaming pipeline.
+
+    The "duplicate_sources" metadata of a kept chunk is updated as soon as a
+    copy is seen. Callers that persist kept chunks before the stream ends
+    write the final metadata of duplicated() once every chunk was offered.
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 16):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.report = DedupReport()
+        self._signatures: List[np.ndarray] = []
+        self._metadata: List[dict] = []
+        self._exact_index: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def add(self, doc: Document) -> bool:
+        """Return True if the chunk is new and should be kept"""
+        self.report.total_chunks += 1
+        text = doc.page_content
+
+        key = _exact_key(text)
+        match: Optional[int] = self._exact_index.get(key)
+        if match is not None:
+            self.report.exact_duplicates += 1
+        else:
+            signature = self.hasher.signature(text)
+            band_keys = [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                         for band in range(self.bands)]
+            candidates = {idx for band_key in band_keys for idx in self._buckets.get(band_key, ())}
+            for idx in sorted(candidates):
+                if float(np.mean(self._signatures[idx] == signature)) >= self.threshold:
+                    match = idx
+                    break
+
+            if match is not None:
+                self.report.near_duplicates += 1
+            else:
+                idx = len(self._metadata)
+                self._signatures.append(signature)
+                self._metadata.append(doc.metadata)
+                self._exact_index[key] = idx
+                for band_key in band_keys:
+                    self._buckets.setdefault(band_key, []).append(idx)
+                return True
+
+        self.report.chars_removed += len(text)
+        kept_metadata = self._metadata[match]
+        source = doc.metadata.get("source", "unknown")
+        sources = kept_metadata["duplicate_sources"].split(", ") if kept_metadata.get("duplicate_sources") else []
+        if source != kept_metadata.get("source") and source not in sources:
+            kept_metadata["duplicate_sources"] = ", ".join(sources + [source])
+        return False
+
+    def duplicated(self) -> Iterator[Tuple[int, dict]]:
+        """(keep order index, metadata) of every kept chunk that has copies"""
+        for idx, metadata in enumerate(self._metadata):
+            if metadata.get("duplicate_sources"):
+                yield idx, metadata
+
+    def log_report(self) -> None:
+        report = self.report
+        logger.info(f"Deduplication removed {report.exact_duplicates} exact and {report.near_duplicates} "
+                    f"near-duplicate chunks ({report.chars_removed} chars) out of {report.total_chunks}")
+
+
+def deduplicate_chunks(documents: List[Document], threshold: float = 0.85, num_perm: int = 128,
+                       bands: int = 16) -> Tuple[List[Document], DedupReport]:
+    """
+    Collapses exact and near-duplicate chunks to a single document.
+
+    Exact duplicates are found with a content hash. Near duplicates use
+    MinHash signatures with locality-sensitive hashing: candidates sharing a
+    band are confirmed by their estimated Jaccard similarity. The first
+    occurrence is kept and the sources of every collapsed copy are recorded
+    in its "duplicate_sources" metadata.
+
+    Args:
+        documents (list): Chunks to deduplicate, in order
+        threshold (float): Minimum estimated Jaccard similarity for near duplicates
+        num_perm (int): Number of MinHash permutations
+        bands (int): Number of LSH bands (must divide num_perm)
+
+    Returns:
+        tuple: (kept documents, DedupReport)
+    """
+    deduplicator = ChunkDeduplicator(threshold, num_perm, bands)
+    kept = [doc for doc in documents if deduplicator.add(doc)]
+    deduplicator.log_report()
+    return kept, deduplicator.report
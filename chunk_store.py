@@ -0,0 +1,133 @@
+import logging
+from typing import List, Dict, Any, Optional, NamedTuple, Iterator, Union
+from langchain_community.docstore.base import Docstore
+from langchain.schema.document import Document
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkSpan(NamedTuple):
+    """A chunk as a view on a stored source file: UTF-8 byte offsets within that file"""
+    file_id: int
+    start: int
+    end: int
+
+
+class SourceBuffer:
+    """
+    Append-only UTF-8 buffer holding each source file once.
+
+    Overlapping chunks of the same file are views on this buffer, so their
+    text is not duplicated in memory.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.offsets = [0]  # file i spans offsets[i]:offsets[i + 1]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+    def add(self, text: str) -> int:
+        """Store a file's text and return its id"""
+        self._buffer += text.encode('utf-8')
+        self.offsets.append(len(self._buffer))
+        return len(self.offsets) - 2
+
+    def file_bytes(self, file_id: int) -> bytes:
+        return bytes(self._buffer[self.offsets[file_id]:self.offsets[file_id + 1]])
+
+    def text(self, span: ChunkSpan) -> str:
+        base = self.offsets[span.file_id]
+        return self._buffer[base + span.start:base + span.end].decode('utf-8')
+
+
+def locate_chunks(content: str, texts: List[str]) -> List[Optional[tuple]]:
+    """
+    Find each chunk's position in the file it was split from.
+
+    Chunks come in file order, possibly overlapping the previous one, so
+    each search starts at the previous chunk's start. Chunks that are not
+    verbatim substrings (e.g. notebook cells with added headers) get None.
+
+    Returns:
+        list: (byte start, byte end, first line) per chunk, or None
+    """
+    located = []
+    char_cursor = byte_cursor = 0
+    line = 1
+    for text in texts:
+        position = content.find(text, char_cursor) if text else -1
+        if position == -1:
+            located.append(None)
+            continue
+        # Advance byte offset and line number incrementally from the last hit
+        segment = content[char_cursor:position]
+        byte_cursor += len(segment.encode('utf-8'))
+        line += segment.count('\n')
+        char_cursor = position
+        located.append((byte_cursor, byte_cursor + len(text.encode('utf-8')), line))
+    return located
+
+
+class ViewDocstore(Docstore):
+    """
+    In-memory docstore whose chunks are views on a SourceBuffer.
+
+    Only the metadata and three integers are kept per chunk; the Document is
+    built when a chunk is looked up, i.e. for retrieved chunks only. Chunks
+    without a span (added through add(), or not found verbatim in their
+    file) keep their own text.
+    """
+
+    def __init__(self, sources: Optional[SourceBuffer] = None):
+        self.sources = sources if sources is not None else SourceBuffer()
+        self._records: Dict[str, tuple] = {}  # id -> (span or text, metadata)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def add_chunk(self, doc_id: str, doc: Document, span: Optional[ChunkSpan] = None) -> None:
+        self._records[doc_id] = (span if span is not None else doc.page_content, doc.metadata)
+
+    def update_metadata(self, doc_id: str, metadata: Dict[str, Any]) -> None:
+        content, _ = self._records[doc_id]
+        self._records[doc_id] = (content, metadata)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        overlapping = set(texts).intersection(self._records)
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        for doc_id, doc in texts.items():
+            self.add_chunk(doc_id, doc)
+
+    def delete(self, ids: List) -> None:
+        missing = set(ids).difference(self._records)
+        if missing:
+            raise ValueError(f"Tried to delete ids that does not exist: {missing}")
+        for doc_id in ids:
+            self._records.pop(doc_id)
+
+    def record(self, doc_id: str) -> tuple:
+        return self._records[doc_id]
+
+    def search(self, search: str) -> Union[str, Document]:
+        record = self._records.get(search)
+        if record is None:
+            return f"ID {search} not found."
+        content, metadata = record
+        text = self.sources.text(content) if isinstance(content, ChunkSpan) else content
+        return Document(page_content=text, metadata=metadata)
+
+    def text_bytes(self) -> Dict[str, int]:
+        """Bytes held for chunk texts: shared sources vs. chunks stored inline"""
+        inline = sum(len(content.encode('utf-8')) for content, _ in self._records.values()
+                     if not isinstance(content, ChunkSpan))
+        return {"sources": self.sources.nbytes, "inline": inline}
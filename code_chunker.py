@@ -0,0 +1,170 @@
+import ast
+import os
+import logging
+from typing import List, Dict, Any, Tuple, NamedTuple, Callable
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+logger = logging.getLogger(__name__)
+
+Chunk = Tuple[str, Dict[str, Any]]
+
+
+class _Segment(NamedTuple):
+    start: int  # 1-based, inclusive
+    end: int    # 1-based, inclusive
+    names: Tuple[str, ...]
+
+
+def _line_range_metadata(names, start: int, end: int) -> Dict[str, Any]:
+    metadata = {"start_line": start, "end_line": end}
+    if names:
+        metadata["symbols"] = ", ".join(names)
+    return metadata
+
+
+class CodeChunker:
+    """
+    Splits source files into chunks aligned with code structure.
+
+    Python files are split with the `ast` module: one chunk per top-level
+    function or class, with small neighbours merged and oversized classes
+    split per method. Oversized functions, files that do not parse and every
+    other file type go through the character-based fallback splitter.
+    Every chunk carries its line range, and Python chunks the qualified names
+    of the definitions they contain. Sizes are measured with length_function,
+    characters by default or tokens when given a token_budget.TokenCounter.
+    """
+
+    def __init__(self, fallback_splitter: RecursiveCharacterTextSplitter,
+                 max_chunk_size: int = 3000, min_chunk_size: int = 500,
+                 length_function: Callable[[str], int] = len):
+        self.fallback_splitter = fallback_splitter
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.length_function = length_function
+
+    def split(self, content: str, file_path: str = "") -> List[Chunk]:
+        """
+        Split a file's content into (text, metadata) chunks.
+
+        Args:
+            content (str): Decoded file content
+            file_path (str): Path used to pick the strategy by extension
+
+        Returns:
+            list: (chunk text, metadata) tuples in file order
+        """
+        if os.path.splitext(file_path)[1].lower() == '.py':
+            try:
+                return self.split_python(content)
+            except (SyntaxError, ValueError) as e:
+                logger.debug(f"Falling back to text splitting for {file_path}: {e}")
+        return self.split_text(content)
+
+    def split_text(self, content: str, first_line: int = 1, names: Tuple[str, ...] = ()) -> List[Chunk]:
+        """Character-based split with line ranges recovered from chunk offsets"""
+        chunks = []
+        offset = 0
+        for text in self.fallback_splitter.split_text(content):
+            # Chunks come back in order, possibly overlapping the previous one
+            position = content.find(text, max(0, offset - len(text)))
+            if position == -1:
+                position = offset
+            start = first_line + content.count('\n', 0, position)
+            end = start + text.count('\n')
+            chunks.append((text, _line_range_metadata(names, start, end)))
+            offset = position + len(text)
+        return chunks
+
+    def split_python(self, content: str) -> List[Chunk]:
+        """Split Python source on top-level definitions"""
+        tree = ast.parse(content)
+        # Split on '\n' only so line numbers agree with the ast's
+        lines = content.split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        if not lines:
+            return []
+
+        segments = []
+        for segment in self._segments(tree.body, 1, len(lines), ()):
+            size = self._size(lines, segment)
+            if size > self.max_chunk_size and segment.names:
+                node = self._find_node(tree.body, segment.names[-1])
+                if isinstance(node, ast.ClassDef):
+                    segments.extend(self._segments(node.body, segment.start, segment.end, (node.name,)))
+                    continue
+            segments.append(segment)
+
+        chunks = []
+        for group in self._merge(lines, segments):
+            start, end = group[0].start, group[-1].end
+            names = tuple(dict.fromkeys(".".join(s.names) for s in group if s.names))
+            text = "\n".join(lines[start - 1:end])
+            if not text.strip():
+                continue
+            if self.length_function(text) > self.max_chunk_size:
+                chunks.extend(self.split_text(text, first_line=start, names=names))
+            else:
+                chunks.append((text, _line_range_metadata(names, start, end)))
+        return chunks
+
+    def _segments(self, body, first_line: int, last_line: int, scope: Tuple[str, ...]) -> List[_Segment]:
+        """
+        Partition [first_line, last_line] into contiguous segments: one per
+        function/class and one per run of other statements. Decorators and
+        blank lines before a definition stay with it.
+        """
+        segments = []
+        cursor = first_line
+        saw_statements = False
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                node_start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                if saw_statements and node_start > cursor:
+                    segments.append(_Segment(cursor, node_start - 1, scope))
+                    cursor = node_start
+                segments.append(_Segment(cursor, node.end_lineno, scope + (node.name,)))
+                cursor = node.end_lineno + 1
+                saw_statements = False
+            else:
+                saw_statements = True
+
+        if cursor <= last_line:
+            if saw_statements or not segments:
+                segments.append(_Segment(cursor, last_line, scope))
+            else:
+                last = segments.pop()
+                segments.append(_Segment(last.start, last_line, last.names))
+        return segments
+
+    @staticmethod
+    def _find_node(body, name: str):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name == name:
+                return node
+        return None
+
+    def _size(self, lines: List[str], segment: _Segment) -> int:
+        text = "\n".join(lines[segment.start - 1:segment.end])
+        return self.length_function(text) + 1
+
+    def _merge(self, lines: List[str], segments: List[_Segment]) -> List[List[_Segment]]:
+        """Greedily merge neighbouring segments while the current group is below min_chunk_size"""
+        groups = []
+        current, current_size = [], 0
+        for segment in segments:
+            size = self._size(lines, segment)
+            if current and (current_size >= self.min_chunk_size or current_size + size > self.max_chunk_size):
+                groups.append(current)
+                current, current_size = [], 0
+            current.append(segment)
+            current_size += size
+        if current:
+            # Fold a small trailing group into the previous one when it fits
+            if groups and current_size < self.min_chunk_size and \
+                    sum(self._size(lines, s) for s in groups[-1]) + current_size <= self.max_chunk_size:
+                groups[-1].extend(current)
+            else:
+                groups.append(current)
+        return groups
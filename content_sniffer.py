@@ -0,0 +1,99 @@
+import re
+import math
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 4096  # only the head of each file is inspected
+
+# Verdicts
+TEXT = "text"
+BINARY = "binary"
+MINIFIED = "minified"
+DATA = "data"
+
+MAX_NULL_RATIO = 0.01
+MAX_CONTROL_RATIO = 0.1
+MAX_TEXT_ENTROPY = 7.2  # bits per byte; code ~5, CJK UTF-8 ~6.5, compressed data ~8
+MINIFIED_LINE_LENGTH = 300  # average over the head; hand-written code rarely exceeds ~80
+MIN_DATA_LINES = 8
+DATA_MIN_BYTES = 32 * 1024  # smaller data files are cheap enough to index whole
+
+# Extensions whose long lines are normal (paragraphs) rather than minification
+PROSE_EXTENSIONS = {'.md', '.rst', '.txt'}
+# Extensions checked for tabular / record dumps
+DATA_EXTENSIONS = {'.json', '.txt', '.jsonl', '.csv', '.tsv'}
+
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in (9, 10, 12, 13))
+_JSON_RECORDS_RE = re.compile(rb"^\s*\[\s*\{")
+_DELIMITERS = (b",", b"\t", b";", b"|")
+
+
+def byte_entropy(data: bytes) -> float:
+    """Shannon entropy of a byte string, in bits per byte"""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(count / total * math.log2(count / total) for count in Counter(data).values())
+
+
+def _looks_tabular(lines) -> bool:
+    """Same number of a delimiter (at least 2) on every line: CSV/TSV rows"""
+    for delimiter in _DELIMITERS:
+        counts = {line.count(delimiter) for line in lines}
+        if len(counts) == 1 and counts.pop() >= 2:
+            return True
+    return False
+
+
+def classify_content(head: bytes, ext: str, size: int) -> str:
+    """
+    Classify a file from its first bytes.
+
+    Args:
+        head (bytes): Up to SNIFF_BYTES from the start of the file
+        ext (str): Lowercase extension including the dot
+        size (int): Full file size in bytes
+
+    Returns:
+        str: TEXT, BINARY (nulls, control bytes or high entropy), MINIFIED
+            (very long lines in code) or DATA (JSON records, JSON lines or
+            delimited rows, only for files of at least DATA_MIN_BYTES)
+    """
+    if not head:
+        return TEXT
+    if head.count(0) / len(head) > MAX_NULL_RATIO:
+        return BINARY
+    if sum(head.count(b) for b in _CONTROL_BYTES) / len(head) > MAX_CONTROL_RATIO:
+        return BINARY
+    if len(head) >= 512 and byte_entropy(head) > MAX_TEXT_ENTROPY:
+        return BINARY
+
+    lines = head.split(b"\n")
+    if ext in DATA_EXTENSIONS and size >= DATA_MIN_BYTES:
+        if _JSON_RECORDS_RE.match(head):
+            return DATA
+        # The last line of the head is usually cut short
+        complete = [line for line in lines[:-1] if line.strip()]
+        if len(complete) >= MIN_DATA_LINES:
+            if all(line.lstrip().startswith(b"{") for line in complete):
+                return DATA
+            if _looks_tabular(complete):
+                return DATA
+
+    # Checked after the data shapes: a record dump is often written on one line
+    if ext not in PROSE_EXTENSIONS and len(head) >= 1024 and len(head) / len(lines) > MINIFIED_LINE_LENGTH:
+        return MINIFIED
+    return TEXT
+
+
+def sniff_file(path: str, ext: str, size: int) -> str:
+    """Classify a file by reading its head; unreadable files count as TEXT and fail later"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError as e:
+        logger.debug(f"Cannot sniff {path}: {e}")
+        return TEXT
+    return classify_content(head, ext, size)
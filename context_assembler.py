@@ -0,0 +1,148 @@
+import logging
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+import numpy as np
+from langchain.schema.document import Document
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAMBDA = 0.5  # 1.0 ranks purely by relevance, 0.0 purely by novelty
+
+
+class Candidate(NamedTuple):
+    """A retrieved chunk together with its stored vector and relevance to the query"""
+    doc_id: str
+    document: Document
+    vector: np.ndarray
+    score: float
+
+
+def mmr_select(candidates: List[Candidate], k: int, lambda_mult: float = DEFAULT_LAMBDA,
+               selected_vectors: Optional[np.ndarray] = None) -> List[int]:
+    """
+    Maximal marginal relevance over a candidate list.
+
+    Each step picks the candidate maximising
+    lambda * relevance(c) - (1 - lambda) * max sim(c, already selected),
+    where the already selected set starts with `selected_vectors` (chunks
+    chosen for earlier queries), so redundancy is penalised across queries.
+    Relevance is the candidate's score: the cosine similarity for vector
+    hits, or the normalised fused score for hybrid retrieval.
+
+    Returns:
+        list: Indices into `candidates`, in selection order
+    """
+    if not candidates or k <= 0:
+        return []
+
+    vectors = np.vstack([c.vector for c in candidates]).astype(np.float32)
+    relevance = np.asarray([c.score for c in candidates], dtype=np.float32)
+
+    # Highest similarity of every candidate to anything selected so far
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    if selected_vectors is not None and len(selected_vectors):
+        redundancy = (vectors @ np.asarray(selected_vectors, dtype=np.float32).T).max(axis=1)
+
+    chosen: List[int] = []
+    available = np.ones(len(candidates), dtype=bool)
+    for _ in range(min(k, len(candidates))):
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * penalty
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        chosen.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, vectors @ vectors[best])
+    return chosen
+
+
+def assemble_documents(candidates_per_query: List[List[Candidate]], k: int = 5,
+                       lambda_mult: float = DEFAULT_LAMBDA,
+                       max_chunks: Optional[int] = None) -> Tuple[List[Document], Dict[str, Any]]:
+    """
+    Merges the candidates of several queries into one non-redundant set.
+
+    Queries are served in order; a chunk already taken for an earlier query
+    is never repeated, and MMR steers each query towards chunks that add
+    something new to what is already in the context.
+
+    Args:
+        candidates_per_query (list): Candidates retrieved for each query
+        k (int): Chunks selected per query
+        lambda_mult (float): MMR relevance/diversity trade-off
+        max_chunks (int): Optional cap on the total number of chunks
+
+    Returns:
+        tuple: (selected documents in selection order, statistics dict)
+    """
+    selected: List[Candidate] = []
+    selected_ids = set()
+    retrieved = 0
+
+    for candidates in candidates_per_query:
+        retrieved += len(candidates)
+        fresh, seen = [], set()
+        for candidate in candidates:
+            if candidate.doc_id not in selected_ids and candidate.doc_id not in seen:
+                fresh.append(candidate)
+                seen.add(candidate.doc_id)
+
+        selected_vectors = np.vstack([c.vector for c in selected]) if selected else None
+        for i in mmr_select(fresh, k, lambda_mult, selected_vectors):
+            selected.append(fresh[i])
+            selected_ids.add(fresh[i].doc_id)
+
+        if max_chunks is not None and len(selected) >= max_chunks:
+            selected = selected[:max_chunks]
+            break
+
+    unique = len({c.doc_id for candidates in candidates_per_query for c in candidates})
+    stats = {
+        "queries": len(candidates_per_query),
+        "retrieved": retrieved,
+        "unique_retrieved": unique,
+        "selected": len(selected),
+    }
+    logger.info(f"Context assembled: {stats}")
+    return [c.document for c in selected], stats
+
+
+def _position(doc: Document) -> Tuple[int, int]:
+    """Sort key inside a source: line range, notebook cell or PDF page"""
+    meta = doc.metadata
+    for key in ("start_line", "cell_start", "page"):
+        if isinstance(meta.get(key), int):
+            return 0, meta[key]
+    return 1, 0
+
+
+def group_by_source(documents: List[Document]) -> List[Tuple[str, List[Document]]]:
+    """
+    Groups documents by source, keeping sources in first-selected order and
+    the chunks of each source in file order.
+    """
+    groups: Dict[Tuple[str, str], List[Document]] = {}
+    for doc in documents:
+        key = (doc.metadata.get("type", "unknown"), doc.metadata.get("source", "unknown"))
+        groups.setdefault(key, []).append(doc)
+    return [(key, sorted(docs, key=_position)) for key, docs in groups.items()]
+
+
+def format_grouped_context(documents: List[Document]) -> str:
+    """Render documents as one labelled block per source file"""
+    parts = []
+    for (doc_type, source), docs in group_by_source(documents):
+        if doc_type == "code":
+            header = f"--- FROM CODE FILE: {source} ---"
+        elif doc_type == "briefing":
+            header = "--- FROM BRIEFING ---"
+        else:
+            header = f"--- FROM {doc_type.upper()}: {source} ---"
+
+        bodies = []
+        for doc in docs:
+            if "start_line" in doc.metadata:
+                bodies.append(f"(lines {doc.metadata['start_line']}-{doc.metadata['end_line']})\n{doc.page_content}")
+            else:
+                bodies.append(doc.page_content)
+        parts.append(header + "\n" + "\n...\n".join(bodies) + "\n")
+    return "\n".join(parts)
@@ -0,0 +1,119 @@
+import logging
+import threading
+from typing import Dict, Iterable, Tuple, List
+from langchain_huggingface import HuggingFaceEmbeddings
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+QUERY_CACHE_SIZE = 1024  # entries per model; ad-hoc queries beyond this are not cached
+
+logger = logging.getLogger(__name__)
+
+_models: Dict[Tuple[str, str], HuggingFaceEmbeddings] = {}
+_query_caches: Dict[Tuple[str, str], Dict[str, List[float]]] = {}
+_registry_lock = threading.Lock()
+_key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+
+def _key_lock(key: Tuple[str, str]) -> threading.Lock:
+    """Return the lock guarding the load of a single model"""
+    with _registry_lock:
+        if key not in _key_locks:
+            _key_locks[key] = threading.Lock()
+        return _key_locks[key]
+
+
+def get_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, device: str = "cpu") -> HuggingFaceEmbeddings:
+    """
+    Returns the process-wide embeddings instance for a model, loading it on first use.
+
+    Every caller gets the same object, so the weights are held once per process
+    no matter how many analyzers are created. Embeddings are always normalized,
+    which keeps L2 and cosine rankings equivalent for every consumer.
+
+    Args:
+        model_name (str): HuggingFace model name
+        device (str): Torch device the model runs on
+
+    Returns:
+        HuggingFaceEmbeddings: Shared embeddings instance
+    """
+    key = (model_name, device)
+    embeddings = _models.get(key)
+    if embeddings is not None:
+        return embeddings
+
+    # Only one thread loads a given model; others wait and reuse it
+    with _key_lock(key):
+        embeddings = _models.get(key)
+        if embeddings is None:
+            logger.info(f"Loading embedding model: {model_name} on {device}")
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={'device': device},
+                encode_kwargs={'normalize_embeddings': True, 'batch_size': 32}
+            )
+            _models[key] = embeddings
+    return embeddings
+
+
+def preload_embeddings(model_names: Iterable[str] = (DEFAULT_EMBEDDING_MODEL,), device: str = "cpu") -> None:
+    """
+    Loads models ahead of time, e.g. in the gunicorn master before workers fork,
+    so forked workers share the weights copy-on-write instead of loading their own.
+    """
+    for model_name in model_names:
+        try:
+            get_embeddings(model_name, device)
+        except Exception as e:
+            logger.error(f"Failed to preload embedding model {model_name}: {e}")
+
+
+def get_query_cache(model_name: str = DEFAULT_EMBEDDING_MODEL, device: str = "cpu") -> Dict[str, List[float]]:
+    """Return the process-wide query -> embedding cache of a model"""
+    key = (model_name, device)
+    with _registry_lock:
+        return _query_caches.setdefault(key, {})
+
+
+def embed_queries(queries: Iterable[str], model_name: str = DEFAULT_EMBEDDING_MODEL, device: str = "cpu",
+                  embeddings=None) -> List[List[float]]:
+    """
+    Embeds queries through the model's query cache.
+
+    Queries not seen before are embedded together in a single batch; repeated
+    queries (such as the fixed analysis queries) cost a dictionary lookup.
+
+    Args:
+        queries (iterable): Query strings
+        model_name (str): Model whose cache is used
+        device (str): Torch device the model runs on
+        embeddings: Embeddings instance to use instead of the shared one
+
+    Returns:
+        list: One embedding per query, in order
+    """
+    queries = list(queries)
+    cache = get_query_cache(model_name, device)
+    missing = list(dict.fromkeys(q for q in queries if q not in cache))
+    fresh = {}
+    if missing:
+        embeddings = embeddings or get_embeddings(model_name, device)
+        fresh = dict(zip(missing, embeddings.embed_documents(missing)))
+        for query, vector in fresh.items():
+            if len(cache) >= QUERY_CACHE_SIZE:
+                break
+            cache[query] = vector
+    return [cache[q] if q in cache else fresh[q] for q in queries]
+
+
+def loaded_models() -> Tuple[Tuple[str, str], ...]:
+    """Return the (model_name, device) keys currently held by the registry"""
+    return tuple(_models.keys())
+
+
+def clear_registry() -> None:
+    """Drop every cached model (mainly useful in tests)"""
+    with _registry_lock:
+        _models.clear()
+        _key_locks.clear()
+        _query_caches.clear()
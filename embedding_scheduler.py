@@ -0,0 +1,111 @@
+import logging
+from typing import Callable, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Padded tokens per model call: batch size x longest sequence in the batch
+BATCH_TOKEN_BUDGET = 16384
+# Upper bound on sequences per call, so batches of tiny chunks stay reasonable
+MAX_BATCH_SIZE = 256
+# Chunks sorted together in the streaming pipeline; a larger window sorts
+# better but holds more chunks before the first vectors come out
+SCHEDULE_WINDOW = 512
+
+# Rough characters per word piece, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def plan_batches(lengths: Sequence[int], token_budget: int = BATCH_TOKEN_BUDGET,
+                 max_batch_size: int = MAX_BATCH_SIZE) -> List[List[int]]:
+    """
+    Group sequences of similar length into batches under a padded token budget.
+
+    Indices are taken shortest first, so each new index is the longest of its
+    batch and sets the padded length; a batch is closed when adding it would
+    push batch size x its length over token_budget.
+
+    Args:
+        lengths (sequence): Token length of each sequence
+        token_budget (int): Maximum padded tokens per batch
+        max_batch_size (int): Maximum sequences per batch
+
+    Returns:
+        list: Batches of indices into lengths, shortest sequences first
+    """
+    batches, batch = [], []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if batch and ((len(batch) + 1) * max(lengths[i], 1) > token_budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def padded_tokens(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> int:
+    """Tokens the model processes for these batches, padding included"""
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches if batch)
+
+
+def with_batch_size(embeddings, batch_size: int):
+    """
+    Copy of embeddings that encodes up to batch_size texts per model call.
+
+    The copy shares the loaded model, so scheduled batches are not re-split
+    by the model's default batch size while other users of the shared
+    embeddings keep it. Embeddings without encode_kwargs are returned as is.
+    """
+    encode_kwargs = getattr(embeddings, "encode_kwargs", None)
+    if not isinstance(encode_kwargs, dict) or not hasattr(embeddings, "model_copy"):
+        return embeddings
+    return embeddings.model_copy(update={"encode_kwargs": {**encode_kwargs, "batch_size": batch_size}})
+
+
+class EmbeddingScheduler:
+    """
+    Embeds texts in length-bucketed batches and returns vectors in input order.
+
+    Chunks arrive in file order, so a fixed-size batch mixes short config
+    snippets with full-length code chunks and pads all of them to the longest.
+    Sorting by token length first keeps each batch's padding small, and
+    sizing batches by padded tokens rather than count keeps the work per
+    model call roughly constant.
+    """
+
+    def __init__(self, embeddings, length_function: Optional[Callable[[str], int]] = None,
+                 max_length: Optional[int] = None, token_budget: int = BATCH_TOKEN_BUDGET,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        self.embeddings = with_batch_size(embeddings, max_batch_size)
+        self.length_function = length_function or estimate_tokens
+        # The model truncates longer sequences, so they cost no more than this
+        self.max_length = max_length
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+
+    def embed(self, texts: Sequence[str], lengths: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Embed texts, reusing token lengths already measured by the caller.
+
+        Returns:
+            np.ndarray: float32 vectors, one row per text in input order
+        """
+        if lengths is None:
+            lengths = [self.length_function(text) for text in texts]
+        if self.max_length:
+            lengths = [min(length, self.max_length) for length in lengths]
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        batches = plan_batches(lengths, self.token_budget, self.max_batch_size)
+        for batch in batches:
+            for i, vector in zip(batch, self.embeddings.embed_documents([texts[i] for i in batch])):
+                vectors[i] = vector
+        if batches:
+            logger.debug(f"Embedded {len(texts)} texts in {len(batches)} batches, "
+                         f"{padded_tokens(lengths, batches)} padded tokens for {sum(lengths)} tokens")
+        return np.asarray(vectors, dtype=np.float32)
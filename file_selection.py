@@ -0,0 +1,200 @@
+import os
+import re
+import math
+import heapq
+import logging
+import subprocess
+from typing import List, Dict, Optional, Iterable
+from repo_scanner import FileEntry
+
+DEFAULT_BUDGET_BYTES = 3 * 1024 * 1024
+DEFAULT_MAX_FILES = 200
+BYTES_PER_TOKEN = 4  # rough average for code and English prose
+
+ENTRY_POINT_NAMES = {
+    'main.py', '__main__.py', 'app.py', 'manage.py', 'wsgi.py', 'asgi.py', 'server.py',
+    'run.py', 'cli.py', 'setup.py', 'train.py', 'predict.py', 'index.js', 'index.ts',
+    'main.js', 'main.ts', 'app.js', 'app.ts', 'server.js', 'index.jsx', 'index.tsx',
+    'app.jsx', 'app.tsx', 'main.java', 'application.java',
+}
+ENTRY_POINT_STEMS = {'main', 'index', 'app'}
+
+_PY_IMPORT_RE = re.compile(r"^\s*(?:from\s+(\.*[\w.]*)\s+import|import\s+([\w.]+))", re.MULTILINE)
+_JS_IMPORT_RE = re.compile(r"""(?:from\s+|require\(\s*|import\s+)['"](\.{1,2}/[^'"]+)['"]""")
+_TEST_RE = re.compile(r"(^|[/\\])(tests?|__tests__|spec)([/\\])|(^|[/\\])test_[^/\\]*$|_test\.\w+$|\.(test|spec)\.\w+$")
+
+IMPORT_SCAN_BYTES = 8192  # imports live at the top of the file
+
+logger = logging.getLogger(__name__)
+
+
+def is_test_file(rel_path: str) -> bool:
+    return bool(_TEST_RE.search(rel_path.lower()))
+
+
+def git_last_commit_times(repo_path: str, timeout: int = 30) -> Dict[str, float]:
+    """
+    Maps each path to the timestamp of the latest commit touching it.
+
+    Returns an empty dict when the repository has no git history available.
+    """
+    if not os.path.isdir(os.path.join(repo_path, '.git')):
+        return {}
+    try:
+        output = subprocess.run(
+            ['git', '-C', repo_path, 'log', '--format=%x00%ct', '--name-only', '--no-renames'],
+            capture_output=True, text=True, timeout=timeout, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Could not read git history for {repo_path}: {e}")
+        return {}
+
+    times: Dict[str, float] = {}
+    timestamp = 0.0
+    for line in output.splitlines():
+        if line.startswith('\x00'):
+            timestamp = float(line[1:])
+        elif line and line not in times:
+            # git log is newest first, so the first sighting is the latest commit
+            times[line.replace('/', os.sep)] = timestamp
+    return times
+
+
+def _import_in_degree(entries: List[FileEntry]) -> Dict[str, int]:
+    """Count how many other files import each Python/JS module in the repository"""
+    by_module: Dict[str, str] = {}
+    by_js_path: Dict[str, str] = {}
+    for entry in entries:
+        rel = entry.rel_path.replace(os.sep, '/')
+        stem, ext = os.path.splitext(rel)
+        if ext == '.py':
+            module = stem[:-len('/__init__')] if stem.endswith('/__init__') else stem
+            dotted = module.replace('/', '.')
+            # Register every suffix so both 'pkg.mod' and 'mod' resolve
+            parts = dotted.split('.')
+            for i in range(len(parts)):
+                by_module.setdefault('.'.join(parts[i:]), entry.rel_path)
+        elif ext in ('.js', '.jsx', '.ts', '.tsx'):
+            by_js_path[stem] = entry.rel_path
+            if stem.endswith('/index'):
+                by_js_path[stem[:-len('/index')]] = entry.rel_path
+
+    in_degree: Dict[str, int] = {}
+    for entry in entries:
+        if entry.ext not in ('.py', '.js', '.jsx', '.ts', '.tsx'):
+            continue
+        try:
+            with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+                head = f.read(IMPORT_SCAN_BYTES)
+        except OSError:
+            continue
+
+        targets = set()
+        if entry.ext == '.py':
+            for from_module, plain_module in _PY_IMPORT_RE.findall(head):
+                name = (from_module or plain_module).lstrip('.')
+                while name:
+                    if name in by_module:
+                        targets.add(by_module[name])
+                        break
+                    name = name.rpartition('.')[0]
+        else:
+            base = os.path.dirname(entry.rel_path.replace(os.sep, '/'))
+            for spec in _JS_IMPORT_RE.findall(head):
+                resolved = os.path.normpath(os.path.join(base, os.path.splitext(spec)[0])).replace(os.sep, '/')
+                if resolved in by_js_path:
+                    targets.add(by_js_path[resolved])
+
+        targets.discard(entry.rel_path)
+        for target in targets:
+            in_degree[target] = in_degree.get(target, 0) + 1
+    return in_degree
+
+
+def score_files(entries: List[FileEntry], commit_times: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Scores files by how much they are likely to matter to a reviewer.
+
+    Signals: README and entry points, import-graph in-degree, recency of the
+    last commit touching the file, size (very large files are penalised) and
+    tests versus source (tests count half).
+
+    Returns:
+        dict: rel_path -> score
+    """
+    in_degree = _import_in_degree(entries)
+    max_degree = max(in_degree.values(), default=0) or 1
+
+    commit_times = commit_times or {}
+    times = [commit_times.get(e.rel_path, e.mtime) for e in entries]
+    oldest, newest = (min(times), max(times)) if times else (0, 0)
+    span = (newest - oldest) or 1
+
+    scores = {}
+    for entry, timestamp in zip(entries, times):
+        name = entry.name.lower()
+        stem = os.path.splitext(name)[0]
+        score = 1.0
+        if stem == 'readme':
+            score += 4.0
+        elif name in ENTRY_POINT_NAMES or stem in ENTRY_POINT_STEMS:
+            score += 3.0
+        score += 3.0 * in_degree.get(entry.rel_path, 0) / max_degree
+        score += 1.0 * (timestamp - oldest) / span
+        if entry.size > 10 * 1024:
+            score -= 0.5 * math.log10(entry.size / (10 * 1024))
+        if entry.ext in ('.md', '.rst', '.txt') and stem != 'readme':
+            score -= 0.5
+        if is_test_file(entry.rel_path):
+            score *= 0.5
+        scores[entry.rel_path] = score
+    return scores
+
+
+def select_files(entries: Iterable[FileEntry], repo_path: str,
+                 budget_bytes: int = DEFAULT_BUDGET_BYTES, max_files: Optional[int] = DEFAULT_MAX_FILES,
+                 budget_tokens: Optional[int] = None, cost_cap: Optional[int] = None) -> List[FileEntry]:
+    """
+    Picks the most important files that fit within a total size budget.
+
+    Files are taken from a max-heap of scores; a file that does not fit in
+    the remaining budget is skipped so smaller, lower-scored files can still
+    use it.
+
+    Args:
+        entries (iterable): Candidate files
+        repo_path (str): Repository root (used for git history)
+        budget_bytes (int): Total bytes of content to select
+        max_files (int): Optional cap on the number of files
+        budget_tokens (int): Token budget; overrides budget_bytes when set
+        cost_cap (int): Maximum bytes counted per file (e.g. the read truncation limit)
+
+    Returns:
+        list: Selected entries, most important first
+    """
+    entries = list(entries)
+    if budget_tokens is not None:
+        budget_bytes = budget_tokens * BYTES_PER_TOKEN
+
+    def cost(entry: FileEntry) -> int:
+        return min(entry.size, cost_cap) if cost_cap else entry.size
+
+    if sum(cost(e) for e in entries) <= budget_bytes and (max_files is None or len(entries) <= max_files):
+        return entries
+
+    scores = score_files(entries, git_last_commit_times(repo_path))
+    heap = [(-scores[e.rel_path], e.rel_path, i) for i, e in enumerate(entries)]
+    heapq.heapify(heap)
+
+    selected = []
+    remaining = budget_bytes
+    while heap and remaining > 0 and (max_files is None or len(selected) < max_files):
+        _, _, i = heapq.heappop(heap)
+        entry = entries[i]
+        if cost(entry) <= remaining:
+            selected.append(entry)
+            remaining -= cost(entry)
+
+    logger.info(f"Selected {len(selected)} of {len(entries)} files "
+                f"({budget_bytes - remaining} of {budget_bytes} budget bytes)")
+    return selected
@@ -0,0 +1,63 @@
+import os
+from typing import List, Optional, Set, Tuple
+from code_chunker import CodeChunker, Chunk
+from notebook_extractor import extract_cells, split_notebook
+from tech_detector import detect_imports
+from large_file_reader import stream_split, STREAM_MIN_BYTES
+
+# Worker-process side of RepoRAGProcessor._read_and_split_files. Workers import
+# this module only, never RAG_process and the embedding stack behind it.
+
+_worker_chunker = None
+
+
+def init_worker(chunker: CodeChunker) -> None:
+    """Store the chunker once per worker process instead of once per task"""
+    global _worker_chunker
+    _worker_chunker = chunker
+
+
+def read_and_split(file_path: str, repo_path: str, chunker: Optional[CodeChunker] = None,
+                   sample_bytes: int = 0
+                   ) -> Tuple[str, List[Chunk], Optional[str], Set[Tuple[str, str]], Optional[str]]:
+    """
+    Read, decode and split a single file, detecting the technologies its
+    imports reveal on the same decoded text. With sample_bytes only the first
+    complete lines within that size are indexed (data dumps); files over
+    STREAM_MIN_BYTES are chunked segment by segment within a per-file budget.
+
+    Returns plain (text, metadata) tuples rather than Document objects so that
+    results coming back from worker processes stay cheap to pickle.
+
+    Returns:
+        tuple: (relative path, chunks, error message or None, (category, name) technologies,
+            the text the chunks were cut from or None)
+    """
+    chunker = chunker or _worker_chunker
+    relative_path = os.path.relpath(file_path, repo_path)
+
+    # Notebooks are reduced to their cells; outputs never reach the splitter
+    if file_path.lower().endswith('.ipynb'):
+        try:
+            cells = extract_cells(file_path)
+            chunks = split_notebook(cells, chunker.fallback_splitter, chunker.max_chunk_size, chunker.length_function)
+            return relative_path, chunks, None, set(), None
+        except Exception:
+            pass  # Not valid notebook JSON, index it as plain text
+
+    try:
+        size = os.path.getsize(file_path)
+        if not sample_bytes and size > STREAM_MIN_BYTES:
+            chunks, content = stream_split(file_path, chunker, size)
+        else:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read(sample_bytes) if sample_bytes else f.read()
+            if sample_bytes:
+                content = content[:content.rfind("\n") + 1] or content
+                content += f"\n...[data file sampled: first {len(content)} characters]..."
+            chunks = chunker.split(content, file_path)
+        technologies = detect_imports(content) if file_path.endswith('.py') else set()
+
+        return relative_path, chunks, None, technologies, content
+    except Exception as e:
+        return relative_path, [], str(e), set(), None
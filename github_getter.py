@@ -3,9 +3,9 @@ import os
 import logging
 from dotenv import load_dotenv
 import pandas as pd
-import json
 import matplotlib.pyplot as plt
 import seaborn as sns
+from manifest_index import ManifestIndex
 
 # Crear directorio de logs si no existe
 os.makedirs('logs', exist_ok=True)
@@ -67,13 +67,15 @@ class GitHubAnalyzer:
             repo_name = repo_name.split("/tree/")[0]
         return repo_name
 
-    def get_repo_stats(self, repo_url):
+    def get_repo_stats(self, repo_url, manifests=None):
         """
         Obtiene estadísticas completas del repositorio incluyendo ramas, commits,
         contribuidores y lenguajes de programación.
         
         Args:
             repo_url (str): URL del repositorio de GitHub
+            manifests (ManifestIndex): Dependencias ya indexadas de esta versión
+                del repositorio, evita volver a descargar y parsear los manifiestos
             
         Returns:
             dict: Estadísticas del repositorio con información detallada
@@ -232,7 +234,7 @@ class GitHubAnalyzer:
             
             # Detección de bibliotecas
             try:
-                libraries_data = self.detect_libraries(repo)
+                libraries_data = self.detect_libraries(repo, manifests)
                 self.logger.info(f"Detected {len(libraries_data)} libraries in the repository")
             except Exception as lib_error:
                 self.logger.error(f"Error detecting libraries: {str(lib_error)}", exc_info=True)
@@ -382,97 +384,23 @@ class GitHubAnalyzer:
         except Exception as e:
             self.logger.error(f"Error extracting text from repository: {e}")
             return []
-    def detect_libraries(self, repo):
+    def detect_libraries(self, repo, manifests=None):
         """
         Detecta las bibliotecas utilizadas en el repositorio basándose en archivos
-        de dependencias (requirements.txt, package.json, etc.).
+        de dependencias (requirements.txt, pyproject.toml, package.json, pom.xml, etc.).
         
         Args:
             repo: Objeto de repositorio de GitHub
+            manifests (ManifestIndex): Índice ya construido para esta versión del
+                repositorio (p. ej. por RepoRAGProcessor); si es None se consulta la API
             
         Returns:
             list: Lista de diccionarios con información de bibliotecas detectadas
         """
-        libraries_data = []
-        
         try:
-            # Buscar requirements.txt (Python)
-            try:
-                requirements = repo.get_contents("requirements.txt")
-                content = requirements.decoded_content.decode('utf-8')
-                self.logger.info(f"Found requirements.txt with {len(content)} bytes")
-                
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        package = line.split('#')[0].strip()
-                        package = package.split('==')[0].split('>=')[0].strip()
-                        if package:
-                            libraries_data.append({
-                                'name': package,
-                                'category': 'Python',
-                                'source': 'requirements.txt'
-                            })
-                self.logger.info(f"Found {len(libraries_data)} Python libraries in requirements.txt")
-            except Exception as e:
-                self.logger.debug(f"No requirements.txt found or error: {str(e)}")
-            
-            # Buscar package.json (JavaScript/Node.js)
-            try:
-                package_json = repo.get_contents("package.json")
-                content = json.loads(package_json.decoded_content.decode('utf-8'))
-                
-                # Procesar dependencias
-                if 'dependencies' in content:
-                    for package, _ in content['dependencies'].items():
-                        libraries_data.append({
-                            'name': package,
-                            'category': 'JavaScript',
-                            'source': 'package.json'
-                        })
-            
-                # Process dev dependencies
-                if 'devDependencies' in content:
-                    for package, _ in content['devDependencies'].items():
-                        libraries_data.append({
-                            'name': package,
-                            'category': 'JavaScript',
-                            'source': 'package.json (dev)'
-                        })
-            
-                self.logger.info(f"Found {len(libraries_data)} JavaScript libraries in package.json")        
-            except json.JSONDecodeError:
-                self.logger.debug("Error parsing package.json: Invalid JSON")
-            except Exception as e:
-                self.logger.debug(f"No package.json found or error parsing it: {e}")
-                
-            # Buscar pom.xml (Maven/Java)
-            try:
-                pom_xml = repo.get_contents("pom.xml")
-                from xml.etree import ElementTree
-                
-                content = pom_xml.decoded_content.decode('utf-8')
-                root = ElementTree.fromstring(content)
-                
-                # Buscar dependencias en pom.xml
-                ns = {'': 'http://maven.apache.org/POM/4.0.0'}
-                dependencies = root.findall('.//dependencies/dependency', ns)
-                
-                for dep in dependencies:
-                    group_id = dep.find('./groupId', ns)
-                    artifact_id = dep.find('./artifactId', ns)
-                    
-                    if group_id is not None and artifact_id is not None:
-                        libraries_data.append({
-                            'name': f"{group_id.text}:{artifact_id.text}",
-                            'category': 'Java',
-                            'source': 'pom.xml'
-                        })
-                    
-                self.logger.info(f"Found {len(libraries_data)} libraries in pom.xml")
-            except Exception as e:
-                self.logger.debug(f"No pom.xml found or error: {str(e)}")
-            
+            if manifests is None:
+                manifests = ManifestIndex.from_github(repo, self.logger)
+            libraries_data = manifests.libraries()
             return libraries_data
             
         except Exception as e:
@@ -0,0 +1,211 @@
+import os
+import re
+import logging
+from typing import Iterable, List, Optional, NamedTuple
+
+# Junk that students commit and that is never worth chunking or embedding.
+# Uses .gitignore syntax; can be replaced per processor.
+DEFAULT_EXCLUDE_PATTERNS = [
+    # Virtual environments and installed packages
+    'env/', '.env/', '.venv/', 'venv/', 'virtualenv/', 'site-packages/',
+    '.tox/', '.nox/', '.eggs/', '*.egg-info/',
+    # Tooling caches
+    '.ipynb_checkpoints/', '.pytest_cache/', '.mypy_cache/', '.idea/', '.vscode/',
+    # Minified and bundled assets
+    '*.min.js', '*.min.css', '*.bundle.js', '*.chunk.js', '*.map',
+    # Lock files
+    'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock', 'Pipfile.lock',
+    # Generated Django migrations (keep the package __init__)
+    '**/migrations/[0-9]*.py',
+    # Datasets
+    '/data/', '/datasets/',
+]
+
+LINGUIST_EXCLUDE_ATTRIBUTES = ('linguist-vendored', 'linguist-generated')
+
+logger = logging.getLogger(__name__)
+
+
+class IgnoreRule(NamedTuple):
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+    source: str
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore glob (without anchoring) into a regex fragment"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def compile_pattern(pattern: str, base: str = "") -> Optional[IgnoreRule]:
+    """
+    Compiles one .gitignore line into an IgnoreRule.
+
+    Args:
+        pattern (str): Raw line from a .gitignore-style file
+        base (str): Directory (relative to the repo root, '/'-separated) the
+            pattern was declared in; patterns only apply below it
+
+    Returns:
+        IgnoreRule or None for blank lines and comments
+    """
+    source = pattern
+    pattern = pattern.rstrip('\n').rstrip()
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith('\\'):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to its base directory
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    prefix = re.escape(base.strip('/') + '/') if base.strip('/') else ''
+    body = _glob_to_regex(pattern)
+    if anchored:
+        regex = f"^{prefix}{body}$"
+    else:
+        regex = f"^{prefix}(?:.*/)?{body}$"
+    return IgnoreRule(re.compile(regex), negate, dir_only, source)
+
+
+class IgnoreMatcher:
+    """
+    Path matcher combining .gitignore rules, .gitattributes linguist markers
+    and a global exclusion list.
+
+    Rules follow git's "last matching rule wins" semantics. All rules are also
+    folded into a single alternation so that the common case, a path matching
+    nothing, costs one regex search.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.rules: List[IgnoreRule] = []
+        self._any_rule = None
+        self._any_file_rule = None
+        self.add_patterns(patterns)
+
+    @classmethod
+    def for_repository(cls, repo_path: str, exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS) -> "IgnoreMatcher":
+        """Build a matcher from the global exclusions plus the repo's root .gitignore and .gitattributes"""
+        matcher = cls(exclude_patterns)
+        matcher.add_gitignore(os.path.join(repo_path, '.gitignore'))
+        matcher.add_gitattributes(os.path.join(repo_path, '.gitattributes'))
+        return matcher
+
+    def add_patterns(self, patterns: Iterable[str], base: str = "") -> None:
+        """Add .gitignore-style patterns declared in the directory `base`"""
+        for pattern in patterns:
+            rule = compile_pattern(pattern, base)
+            if rule:
+                self.rules.append(rule)
+        self._compile()
+
+    def add_gitignore(self, path: str, base: str = "") -> None:
+        """Load a .gitignore file if it exists"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                self.add_patterns(f.readlines(), base)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+
+    def add_gitattributes(self, path: str, base: str = "") -> None:
+        """Exclude paths marked linguist-vendored or linguist-generated in a .gitattributes file"""
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Could not read {path}: {e}")
+            return
+
+        patterns = []
+        for line in lines:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            path_pattern, attributes = parts[0], parts[1:]
+            for attribute in attributes:
+                name, _, value = attribute.partition('=')
+                unset = name.startswith('-') or name.startswith('!') or value.lower() == 'false'
+                if name.lstrip('-!') in LINGUIST_EXCLUDE_ATTRIBUTES:
+                    patterns.append(('!' if unset else '') + path_pattern)
+        self.add_patterns(patterns, base)
+
+    def _compile(self) -> None:
+        if not self.rules:
+            self._any_rule = self._any_file_rule = None
+            return
+        self._any_rule = re.compile('|'.join(f"(?:{r.regex.pattern})" for r in self.rules))
+        file_rules = [r for r in self.rules if not r.dir_only]
+        self._any_file_rule = re.compile(
+            '|'.join(f"(?:{r.regex.pattern})" for r in file_rules)
+        ) if file_rules else None
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Checks whether a path is excluded.
+
+        Args:
+            rel_path (str): Path relative to the repository root
+            is_dir (bool): Whether the path is a directory
+
+        Returns:
+            bool: True if the last matching rule excludes the path
+        """
+        rel_path = rel_path.replace(os.sep, '/')
+        fast = self._any_rule if is_dir else self._any_file_rule
+        if fast is None or not fast.match(rel_path):
+            return False
+
+        for rule in reversed(self.rules):
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.match(rel_path):
+                return not rule.negate
+        return False
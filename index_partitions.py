@@ -0,0 +1,358 @@
+import os
+import logging
+from typing import Any, List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from langchain.schema.document import Document
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from vector_index import IndexParams, build_vector_store, choose_index_type, create_index, index_type_of
+from lexical_index import BM25Index, reciprocal_rank_fusion, save_bm25, load_bm25, LEXICAL_META_FILE
+from context_assembler import Candidate
+from index_store import (PositionIdMap, MmapDocstore, ChunkWriter, write_chunks, write_index, read_index,
+                         write_meta, read_meta)
+from chunk_store import ChunkSpan, ViewDocstore
+
+logger = logging.getLogger(__name__)
+
+# Chunk "type" metadata -> partition; anything else (e.g. the technology summary) is metadata
+PARTITION_NAMES = ("code", "briefing", "metadata")
+
+# (doc_id, score) pairs, best first
+Ranking = List[Tuple[str, float]]
+
+
+def partition_for(doc: Document) -> str:
+    """Name of the partition a chunk belongs to"""
+    doc_type = doc.metadata.get("type")
+    return doc_type if doc_type in ("code", "briefing") else "metadata"
+
+
+class IndexPartition:
+    """
+    One independently built vector store plus its lexical index.
+
+    Partitions share the embedding model, so queries are embedded once by
+    the caller and the same vectors are searched in every partition.
+    """
+
+    def __init__(self, name: str, embeddings, index_params: Optional[IndexParams] = None,
+                 lexical_weight: float = 1.0):
+        self.name = name
+        self.embeddings = embeddings
+        self.index_params = index_params
+        self.lexical_weight = lexical_weight
+        self.vector_store = None
+        self.lexical_index = None
+        self._docstore_positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.vector_store.index.ntotal if self.vector_store else 0
+
+    def build(self, documents: List[Document], vectors: Optional[np.ndarray] = None) -> "IndexPartition":
+        """
+        Build the vector store and the lexical index over the same chunks and
+        ids, from precomputed vectors when given.
+        """
+        self.vector_store = build_vector_store(documents, self.embeddings, self.index_params, vectors)
+        self._docstore_positions = {}
+        if self.lexical_weight > 0:
+            self.lexical_index = BM25Index()
+            ids = [self.vector_store.index_to_docstore_id[i] for i in range(len(documents))]
+            self.lexical_index.add(ids, (doc.page_content for doc in documents))
+        logger.info(f"Built {self.name} partition with {len(documents)} chunks")
+        return self
+
+    def add(self, documents: List[Document]) -> None:
+        """Append chunks to an existing partition"""
+        if self.vector_store is None:
+            self.build(documents)
+            return
+        if isinstance(self.vector_store.docstore, MmapDocstore):
+            raise ValueError(f"The {self.name} partition was opened read-only")
+        ids = self.vector_store.add_documents(documents)
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, (doc.page_content for doc in documents))
+
+    def save(self, directory: str, embedding_model: Optional[str] = None) -> None:
+        """
+        Persist the partition so it can later be opened memory-mapped.
+
+        Chunks are renumbered so that each docstore id is its FAISS position,
+        which lets opened partitions resolve ids without any lookup table.
+        """
+        os.makedirs(directory, exist_ok=True)
+        id_map = self.vector_store.index_to_docstore_id
+        docstore = self.vector_store.docstore
+
+        write_index(directory, self.vector_store.index)
+        if isinstance(docstore, ViewDocstore):
+            # Keep chunks as views: sources are written once, records only hold spans
+            writer = ChunkWriter(directory)
+            for file_id in range(len(docstore.sources)):
+                writer.add_source(docstore.sources.file_bytes(file_id))
+            for i in range(len(id_map)):
+                writer.write_record(*docstore.record(id_map[i]))
+            writer.close()
+            count = len(id_map)
+        else:
+            documents = [docstore.search(id_map[i]) for i in range(len(id_map))]
+            write_chunks(directory, documents)
+            count = len(documents)
+        if self.lexical_index:
+            positions = {doc_id: i for i, doc_id in id_map.items()}
+            save_bm25(self.lexical_index, directory, [positions[doc_id] for doc_id in self.lexical_index.doc_ids])
+        write_meta(directory, {
+            "name": self.name,
+            "count": count,
+            "embedding_model": embedding_model,
+            "lexical_weight": self.lexical_weight,
+            "index_type": index_type_of(self.vector_store.index),
+        })
+        logger.info(f"Saved {self.name} partition with {count} chunks to {directory}")
+
+    @classmethod
+    def open(cls, directory: str, embeddings, embedding_model: Optional[str] = None,
+             use_mmap: bool = True) -> "IndexPartition":
+        """
+        Open a saved partition. With use_mmap the index, chunk texts and
+        lexical arrays are mapped read-only: opening costs the same whatever
+        the size, pages are loaded on first touch and shared by every
+        process serving the same files. Flat and HNSW indexes are only
+        mapped by faiss >= 1.11; older versions read them into the heap.
+        """
+        meta = read_meta(directory)
+        if embedding_model and meta.get("embedding_model") not in (None, embedding_model):
+            raise ValueError(
+                f"Partition {directory} was built with {meta['embedding_model']}, not {embedding_model}"
+            )
+
+        partition = cls(meta["name"], embeddings, lexical_weight=meta.get("lexical_weight", 1.0))
+        index = read_index(directory, use_mmap, meta.get("index_type"))
+        partition.vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=MmapDocstore(directory),
+            index_to_docstore_id=PositionIdMap(index.ntotal),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        if os.path.exists(os.path.join(directory, LEXICAL_META_FILE)):
+            partition.lexical_index = load_bm25(directory, partition.vector_store.index_to_docstore_id, use_mmap)
+        return partition
+
+    def _docstore_position(self, doc_id: str) -> int:
+        """FAISS position of a docstore id, needed to fetch vectors of lexical-only hits"""
+        if isinstance(self.vector_store.index_to_docstore_id, PositionIdMap):
+            return int(doc_id)
+        if len(self._docstore_positions) != len(self.vector_store.index_to_docstore_id):
+            self._docstore_positions = {v: i for i, v in self.vector_store.index_to_docstore_id.items()}
+        return self._docstore_positions[doc_id]
+
+    def rank(self, queries: Sequence[str], query_vectors: np.ndarray, k: int) -> List[Tuple[Ranking, Ranking]]:
+        """
+        Search several queries with a single matrix call.
+
+        Returns:
+            list: Per query, (vector hits with their similarity, BM25 hits
+                with their score) as (doc_id, score) pairs, best first; the
+                BM25 list is empty without a lexical index
+        """
+        if self.vector_store is None or not len(queries):
+            return [([], []) for _ in queries]
+
+        scores, indices = self.vector_store.index.search(np.asarray(query_vectors, dtype=np.float32), k)
+        id_map = self.vector_store.index_to_docstore_id
+        ranked = []
+        for query, score_row, index_row in zip(queries, scores, indices):
+            vector_hits = [(id_map[int(i)], float(score)) for score, i in zip(score_row, index_row) if i != -1]
+            lexical_hits = self.lexical_index.search(query, k) if self.lexical_index else []
+            ranked.append((vector_hits, lexical_hits))
+        return ranked
+
+    def candidates(self, ranked: Ranking) -> List[Candidate]:
+        """Fetch the documents and stored vectors of ranked (doc_id, score) pairs"""
+        candidates = []
+        for doc_id, score in ranked:
+            doc = self.vector_store.docstore.search(doc_id)
+            if isinstance(doc, Document):
+                vector = self.vector_store.index.reconstruct(self._docstore_position(doc_id))
+                candidates.append(Candidate(doc_id, doc, vector, score))
+        return candidates
+
+    def search(self, queries: Sequence[str], query_vectors: np.ndarray, k: int) -> List[List[Candidate]]:
+        """
+        Search several queries with a single matrix call.
+
+        When a lexical index is available each query also runs a BM25 search
+        and the two rankings are merged with reciprocal rank fusion, so exact
+        identifiers and file names are found even when embeddings miss them.
+
+        Returns:
+            list: Candidates per query with their stored vectors, best first
+        """
+        results = []
+        for vector_hits, lexical_hits in self.rank(queries, query_vectors, k):
+            ranked = vector_hits
+            if self.lexical_index:
+                ranked = reciprocal_rank_fusion(
+                    [[doc_id for doc_id, _ in vector_hits], [doc_id for doc_id, _ in lexical_hits]],
+                    weights=[1.0, self.lexical_weight]
+                )[:k]
+            results.append(self.candidates(ranked))
+        return results
+
+
+class PartitionBuilder:
+    """
+    Collects embedded chunks for one partition as they stream in.
+
+    Every chunk is tokenised for BM25 as it arrives and stored either in a
+    ViewDocstore (in memory) or, with a directory, in a chunk file on disk;
+    only its vector is kept until finish() builds the index. Source files
+    registered with add_source() are stored once and chunks given a span
+    are views on them, so overlapping chunks do not copy their text. On
+    disk, finish() opens the partition memory-mapped.
+    """
+
+    def __init__(self, name: str, embeddings, index_params: Optional[IndexParams] = None,
+                 lexical_weight: float = 1.0, directory: Optional[str] = None,
+                 embedding_model: Optional[str] = None):
+        self.name = name
+        self.embeddings = embeddings
+        self.index_params = index_params or IndexParams()
+        self.lexical_weight = lexical_weight
+        self.directory = directory
+        self.embedding_model = embedding_model
+        self.vectors: List[np.ndarray] = []
+        self.count = 0
+        self.writer = None
+        self.docstore = None
+        self.lexical_index = BM25Index() if lexical_weight > 0 else None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.writer = ChunkWriter(directory)
+        else:
+            self.docstore = ViewDocstore()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add_source(self, text: str) -> int:
+        """Store a source file once and return the file id used in chunk spans"""
+        return self.docstore.sources.add(text) if self.writer is None else self.writer.add_source(text)
+
+    def add(self, documents: List[Document], vectors: np.ndarray,
+            spans: Optional[Sequence[Optional[ChunkSpan]]] = None) -> None:
+        self.vectors.append(np.asarray(vectors, dtype=np.float32))
+        for doc, span in zip(documents, spans or [None] * len(documents)):
+            position = self.count
+            if self.writer is None:
+                self.docstore.add_chunk(str(position), doc, span)
+            else:
+                self.writer.write(doc, span)
+            if self.lexical_index is not None:
+                self.lexical_index.add([str(position)], [doc.page_content])
+            self.count += 1
+
+    def update_metadata(self, position: int, metadata: Dict[str, Any]) -> None:
+        """Replace the metadata of a chunk already added, e.g. once all its duplicates are known"""
+        if self.writer is None:
+            self.docstore.update_metadata(str(position), metadata)
+        else:
+            self.writer.update_metadata(position, metadata)
+
+    def finish(self) -> Optional[IndexPartition]:
+        """Build the partition, or return None if nothing was added"""
+        if not self.count:
+            if self.writer is not None:
+                self.writer.close()
+            return None
+        vectors = np.vstack(self.vectors)
+        self.vectors = []
+        index_type = choose_index_type(len(vectors), self.index_params)
+
+        if self.writer is None:
+            logger.info(f"Building {index_type} index for {len(vectors)} vectors")
+            partition = IndexPartition(self.name, self.embeddings, self.index_params, self.lexical_weight)
+            partition.vector_store = FAISS(
+                embedding_function=self.embeddings,
+                index=create_index(vectors, index_type, self.index_params),
+                docstore=self.docstore,
+                index_to_docstore_id={i: str(i) for i in range(self.count)},
+                distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+            )
+            partition.lexical_index = self.lexical_index
+            logger.info(f"Built {self.name} partition with {self.count} chunks "
+                        f"(text bytes: {self.docstore.text_bytes()})")
+            return partition
+
+        self.writer.close()
+        logger.info(f"Building {index_type} index for {len(vectors)} vectors in {self.directory}")
+        write_index(self.directory, create_index(vectors, index_type, self.index_params))
+        if self.lexical_index is not None:
+            save_bm25(self.lexical_index, self.directory, range(self.count))
+        write_meta(self.directory, {
+            "name": self.name,
+            "count": self.count,
+            "embedding_model": self.embedding_model,
+            "lexical_weight": self.lexical_weight,
+            "index_type": index_type,
+        })
+        return IndexPartition.open(self.directory, self.embeddings, self.embedding_model)
+
+
+def search_partitions(partitions: Dict[str, IndexPartition], queries: Sequence[str], query_vectors: np.ndarray,
+                      k: int, query_partitions: Optional[Sequence[Optional[Sequence[str]]]] = None,
+                      lexical_weight: float = 1.0) -> List[List[Candidate]]:
+    """
+    Searches several partitions and merges their hits into one ranking per query.
+
+    Partitions are not fused separately: that would score each partition's
+    best hit 1.0, so a partition holding a single chunk would win every
+    query. Instead the vector hits of all targeted partitions are merged on
+    their raw similarity, which is comparable because the partitions share
+    one embedding model, the BM25 hits on their score, and reciprocal rank
+    fusion runs once over the two merged rankings.
+
+    Args:
+        partitions (dict): Partitions by name
+        queries (list): Query strings
+        query_vectors (np.ndarray): One embedded vector per query
+        k (int): Candidates kept per query
+        query_partitions (list): Partition names per query, None for all
+        lexical_weight (float): Weight of the BM25 ranking in the fusion
+
+    Returns:
+        list: Candidates per query, best first. Ids are prefixed with the
+            partition name, since positional ids repeat across partitions.
+    """
+    query_partitions = query_partitions or [None] * len(queries)
+    vector_hits: List[Ranking] = [[] for _ in queries]
+    lexical_hits: List[Ranking] = [[] for _ in queries]
+    located: Dict[str, Tuple[str, str]] = {}  # qualified id -> (partition, doc_id)
+    for name, partition in partitions.items():
+        targeted = [i for i, names in enumerate(query_partitions) if names is None or name in names]
+        if not targeted:
+            continue
+        ranked = partition.rank([queries[i] for i in targeted], query_vectors[targeted], k)
+        for i, (vectors, lexical) in zip(targeted, ranked):
+            for hits, merged in ((vectors, vector_hits[i]), (lexical, lexical_hits[i])):
+                for doc_id, score in hits:
+                    located[f"{name}/{doc_id}"] = (name, doc_id)
+                    merged.append((f"{name}/{doc_id}", score))
+
+    results = []
+    for vectors, lexical in zip(vector_hits, lexical_hits):
+        vectors.sort(key=lambda hit: -hit[1])
+        ranked = vectors[:k]
+        if lexical:
+            lexical.sort(key=lambda hit: -hit[1])
+            ranked = reciprocal_rank_fusion(
+                [[key for key, _ in vectors], [key for key, _ in lexical]], weights=[1.0, lexical_weight]
+            )[:k]
+
+        candidates = []
+        for key, score in ranked:
+            name, doc_id = located[key]
+            candidates.extend(c._replace(doc_id=key) for c in partitions[name].candidates([(doc_id, score)]))
+        results.append(candidates)
+    return results
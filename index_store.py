@@ -0,0 +1,248 @@
+import os
+import json
+import mmap
+import logging
+from contextlib import contextmanager
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Iterable, Union, Optional
+import numpy as np
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain.schema.document import Document
+from chunk_store import ChunkSpan
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.bin"
+OFFSETS_FILE = "chunks.offsets.npy"
+META_FILE = "meta.json"
+SOURCES_FILE = "sources.bin"
+SOURCE_OFFSETS_FILE = "sources.offsets.npy"
+# Metadata replacing that of records written before it was final, by position
+METADATA_UPDATES_FILE = "chunks.metadata.json"
+
+# Read flags per index type. IO_FLAG_MMAP_IFC (faiss >= 1.11) maps the file and
+# uses flat and HNSW codes in place, so processes share their pages; it cannot
+# be combined with IO_FLAG_MMAP, which IVF indexes need to map their inverted
+# lists ("mmap only supported for File objects"). Older faiss versions read
+# flat and HNSW indexes into each process's heap.
+MMAP_IFC_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+MMAP_IVF_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+
+
+@contextmanager
+def replacing(path: str) -> Iterator[str]:
+    """
+    Yield a temporary path that replaces `path` once written.
+
+    The rename swaps the directory entry only, so processes that still have
+    the old file mapped keep reading valid pages instead of a truncated file.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_array(path: str, array: np.ndarray) -> None:
+    with replacing(path) as tmp, open(tmp, 'wb') as f:
+        np.save(f, array)
+
+
+class PositionIdMap(Mapping):
+    """
+    index_to_docstore_id for persisted partitions, where a chunk's docstore
+    id is its FAISS position; nothing is materialised per chunk.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < self.size:
+            raise KeyError(position)
+        return str(position)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.size))
+
+
+def _map_file(path: str):
+    """Read-only mapping of a file (mmap cannot map empty files)"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+
+class MmapDocstore(Docstore):
+    """
+    Read-only docstore over a chunk file mapped into memory.
+
+    Chunks are stored as consecutive JSON records located by an offsets
+    array, so only the records actually searched are paged in and decoded,
+    and every process mapping the same file shares its pages. A record
+    either holds its text or, for chunks of a stored source file, a
+    (file, start, end) span into the mapped sources file. Metadata updated
+    after a record was written comes from a small side table.
+    """
+
+    def __init__(self, directory: str):
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode='r')
+        self._buffer = _map_file(os.path.join(directory, CHUNKS_FILE))
+        self.source_offsets = None
+        if os.path.exists(os.path.join(directory, SOURCE_OFFSETS_FILE)):
+            self.source_offsets = np.load(os.path.join(directory, SOURCE_OFFSETS_FILE), mmap_mode='r')
+            self._sources = _map_file(os.path.join(directory, SOURCES_FILE))
+        self.metadata_updates: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(os.path.join(directory, METADATA_UPDATES_FILE)):
+            with open(os.path.join(directory, METADATA_UPDATES_FILE), encoding='utf-8') as f:
+                self.metadata_updates = {int(position): metadata for position, metadata in json.load(f).items()}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def search(self, search: str) -> Union[str, Document]:
+        try:
+            position = int(search)
+        except ValueError:
+            return f"ID {search} not found."
+        if not 0 <= position < len(self):
+            return f"ID {search} not found."
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        record = json.loads(self._buffer[start:end])
+        if "span" in record:
+            file_id, start, end = record["span"]
+            base = int(self.source_offsets[file_id])
+            text = self._sources[base + start:base + end].decode('utf-8')
+        else:
+            text = record["page_content"]
+        return Document(page_content=text, metadata=self.metadata_updates.get(position, record["metadata"]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        raise NotImplementedError("Memory-mapped docstores are read-only")
+
+    def delete(self, ids: List) -> None:
+        raise NotImplementedError("Memory-mapped docstores are read-only")
+
+
+class _AppendFile:
+    """Records appended to a temporary file, swapped in with their offsets on close()"""
+
+    def __init__(self, path: str, offsets_path: str):
+        self.path = path
+        self.offsets_path = offsets_path
+        self._tmp_path = f"{path}.tmp-{os.getpid()}"
+        self._file = open(self._tmp_path, 'wb')
+        self.offsets = [0]
+
+    def append(self, data: bytes) -> int:
+        self._file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        return len(self.offsets) - 2
+
+    def close(self) -> None:
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        save_array(self.offsets_path, np.asarray(self.offsets, dtype=np.int64))
+
+
+class ChunkWriter:
+    """
+    Appends documents to a chunk file one at a time; close() writes the offsets.
+
+    Source files added with add_source() are written once to a sources
+    file, and chunks written with their span only reference it. Metadata
+    that changes after its record was written is passed to
+    update_metadata() and stored in a side table on close().
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._chunks = _AppendFile(os.path.join(directory, CHUNKS_FILE), os.path.join(directory, OFFSETS_FILE))
+        self._sources: Optional[_AppendFile] = None
+        self._metadata_updates: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._chunks.offsets) - 1
+
+    def add_source(self, data: Union[str, bytes]) -> int:
+        """Store a source file's text and return its id"""
+        if self._sources is None:
+            self._sources = _AppendFile(os.path.join(self.directory, SOURCES_FILE),
+                                        os.path.join(self.directory, SOURCE_OFFSETS_FILE))
+        return self._sources.append(data.encode('utf-8') if isinstance(data, str) else data)
+
+    def write(self, doc: Document, span: Optional[ChunkSpan] = None) -> int:
+        """Store a document, as a view on its source when span is given, and return its position"""
+        return self.write_record(span if span is not None else doc.page_content, doc.metadata)
+
+    def write_record(self, content: Union[str, ChunkSpan], metadata: Dict[str, Any]) -> int:
+        record = {"span": list(content)} if isinstance(content, ChunkSpan) else {"page_content": content}
+        record["metadata"] = metadata
+        return self._chunks.append(json.dumps(record, ensure_ascii=False).encode('utf-8'))
+
+    def update_metadata(self, position: int, metadata: Dict[str, Any]) -> None:
+        """Replace the metadata of an already written record"""
+        self._metadata_updates[position] = metadata
+
+    def close(self) -> None:
+        updates_path = os.path.join(self.directory, METADATA_UPDATES_FILE)
+        if self._metadata_updates:
+            with replacing(updates_path) as tmp, open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({str(position): metadata for position, metadata in self._metadata_updates.items()},
+                          f, ensure_ascii=False)
+        elif os.path.exists(updates_path):
+            os.remove(updates_path)
+        if self._sources is not None:
+            self._sources.close()
+        else:
+            # A stale sources file from an earlier build must not outlive its chunks
+            for name in (SOURCES_FILE, SOURCE_OFFSETS_FILE):
+                if os.path.exists(os.path.join(self.directory, name)):
+                    os.remove(os.path.join(self.directory, name))
+        self._chunks.close()
+
+
+def write_chunks(directory: str, documents: Iterable[Document]) -> None:
+    """Write documents as JSON records plus an offsets array, in FAISS position order"""
+    writer = ChunkWriter(directory)
+    for doc in documents:
+        writer.write(doc)
+    writer.close()
+
+
+def write_index(directory: str, index: faiss.Index) -> None:
+    with replacing(os.path.join(directory, INDEX_FILE)) as tmp:
+        faiss.write_index(index, tmp)
+
+
+def mmap_read_flags(index_type: Optional[str]) -> int:
+    """faiss read flags mapping an index of the given type ("flat", "hnsw" or "ivfpq")"""
+    return MMAP_IFC_FLAGS if index_type in ("flat", "hnsw") else MMAP_IVF_FLAGS
+
+
+def read_index(directory: str, use_mmap: bool = True, index_type: Optional[str] = None) -> faiss.Index:
+    """
+    Open a persisted index, memory-mapped read-only unless use_mmap is False.
+    Without its index_type only IVF inverted lists are mapped, which is safe
+    for every type.
+    """
+    path = os.path.join(directory, INDEX_FILE)
+    return faiss.read_index(path, mmap_read_flags(index_type)) if use_mmap else faiss.read_index(path)
+
+
+def write_meta(directory: str, meta: Dict[str, Any]) -> None:
+    with replacing(os.path.join(directory, META_FILE)) as tmp, open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_meta(directory: str) -> Dict[str, Any]:
+    with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+        return json.load(f)
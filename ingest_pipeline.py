@@ -0,0 +1,163 @@
+import time
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 4  # items buffered between two stages before the producer blocks
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters of one pipeline stage"""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    starved_seconds: float = 0.0  # waiting on an empty upstream queue
+    blocked_seconds: float = 0.0  # waiting on a full downstream queue
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.name,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "starved_seconds": round(self.starved_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_second": round(self.items_out / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of up to size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Pipeline:
+    """
+    Generator stages connected by bounded queues, each running in its own thread.
+
+    Every stage is a function taking an iterator of input items and
+    returning an iterator of outputs, so a stage can map, filter, expand or
+    batch. A full queue blocks its producer, which bounds the number of
+    items in flight whatever the input size; the consumer iterating the
+    pipeline applies the last back-pressure. The first exception raised by
+    the source or any stage stops the pipeline and is re-raised to the
+    consumer.
+
+    Example:
+        pipeline = Pipeline(files, [("chunk", chunk_files), ("embed", embed_batches)])
+        for result in pipeline:
+            index(result)
+    """
+
+    def __init__(self, source: Iterable[Any], stages: List[Tuple[str, Callable[[Iterator[Any]], Iterable[Any]]]],
+                 maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.source = source
+        self.stages = stages
+        self.maxsize = maxsize
+        self.stats = [StageStats("source")] + [StageStats(name) for name, _ in stages]
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def _fail(self, error: BaseException) -> None:
+        """Record the first failure and stop every stage"""
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item: Any, stats: StageStats) -> bool:
+        """Blocking put that gives up once the pipeline is stopping"""
+        start = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked_seconds += time.perf_counter() - start
+
+    def _inputs(self, q: queue.Queue, stats: StageStats) -> Iterator[Any]:
+        """Iterate a stage's input queue until the upstream stage is done"""
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                stats.starved_seconds += time.perf_counter() - start
+                continue
+            stats.starved_seconds += time.perf_counter() - start
+            if item is _DONE:
+                return
+            stats.items_in += 1
+            yield item
+
+    def _run(self, produce: Callable[[], Iterable[Any]], stats: StageStats, out: queue.Queue) -> None:
+        start = time.perf_counter()
+        try:
+            for result in produce():
+                stats.items_out += 1
+                if not self._put(out, result, stats):
+                    return
+            self._put(out, _DONE, stats)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            stats.busy_seconds = time.perf_counter() - start - stats.starved_seconds - stats.blocked_seconds
+
+    def __iter__(self) -> Iterator[Any]:
+        queues = [queue.Queue(maxsize=self.maxsize) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._run, args=(lambda: self.source, self.stats[0], queues[0]),
+                                    daemon=True)]
+        for i, (_, func) in enumerate(self.stages):
+            stats, inp = self.stats[i + 1], queues[i]
+            produce = (lambda func=func, inp=inp, stats=stats: func(self._inputs(inp, stats)))
+            threads.append(threading.Thread(target=self._run, args=(produce, stats, queues[i + 1]), daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                if self._error is not None:
+                    raise self._error
+                try:
+                    item = queues[-1].get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # Unblock every producer if the consumer stopped early or failed
+            self._stop.set()
+            for q in queues:
+                while True:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+            for thread in threads:
+                thread.join(timeout=1.0)
+
+    def report(self) -> List[dict]:
+        return [stats.to_dict() for stats in self.stats]
+
+    def log_report(self, log: Optional[logging.Logger] = None) -> None:
+        for stats in self.report():
+            (log or logger).info(f"Pipeline stage: {stats}")
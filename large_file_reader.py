@@ -0,0 +1,192 @@
+import io
+import os
+import re
+import logging
+from typing import Iterator, List, Tuple
+from code_chunker import CodeChunker, Chunk
+
+logger = logging.getLogger(__name__)
+
+# Files larger than this are read and chunked segment by segment
+STREAM_MIN_BYTES = 64 * 1024
+# Bytes decoded and chunked at a time
+SEGMENT_BYTES = 32 * 1024
+# Per-file budgets: beyond MAX_FILE_BYTES only evenly spaced regions are read
+MAX_FILE_BYTES = 256 * 1024
+MAX_FILE_CHUNKS = 96
+SAMPLE_REGIONS = 4
+
+# A line starting at column 0 with a name: a top-level def, class or statement
+_TOP_LEVEL_RE = re.compile(rb"\n(?=[A-Za-z_])")
+
+
+def _cut_point(data: bytes, python: bool) -> int:
+    """
+    End of the last complete line in data; for Python, before the last
+    top-level line, moved up above the decorators of a decorated definition.
+    """
+    if python:
+        last = None
+        for last in _TOP_LEVEL_RE.finditer(data):
+            pass
+        if last is not None:
+            cut = last.start() + 1
+            while cut:
+                previous = data.rfind(b"\n", 0, cut - 1) + 1
+                if not data.startswith(b"@", previous):
+                    break
+                cut = previous
+            if cut:
+                return cut
+    return data.rfind(b"\n") + 1
+
+
+def _read_segments(f: io.BufferedReader, length: int, python: bool) -> Iterator[bytes]:
+    """
+    Read up to length bytes from f as segments ending on line boundaries.
+
+    Only one segment plus the carried-over partial line is held at a time.
+    A partial last line is dropped unless the file ends there.
+    """
+    buffer = b""
+    remaining = length
+    while remaining > 0:
+        block = f.read(min(SEGMENT_BYTES, remaining))
+        if not block:
+            break
+        remaining -= len(block)
+        buffer += block
+        if len(buffer) >= SEGMENT_BYTES:
+            cut = _cut_point(buffer, python) or len(buffer)
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    if buffer:
+        at_end = remaining > 0 or not f.peek(1)
+        cut = len(buffer) if at_end else buffer.rfind(b"\n") + 1
+        if cut:
+            yield buffer[:cut]
+
+
+def _skip_to(f: io.BufferedReader, offset: int, python: bool) -> int:
+    """
+    Move f to the first line starting at or after offset, for Python the
+    first top-level line, so the region parses on its own.
+
+    Returns:
+        int: Number of lines skipped (newlines are counted block by block)
+    """
+    lines = 0
+    remaining = offset - f.tell()
+    while remaining > 0:
+        block = f.read(min(1024 * 1024, remaining))
+        if not block:
+            return lines
+        remaining -= len(block)
+        lines += block.count(b"\n")
+    f.seek(offset - 1)
+    if f.read(1) != b"\n":
+        f.readline()
+        lines += 1
+    while python:
+        first = f.peek(1)[:1]
+        if not first or first.isalpha() or first == b"_" or not f.readline().endswith(b"\n"):
+            break
+        lines += 1
+    return lines
+
+
+def _shift_lines(chunks: List[Chunk], offset: int) -> List[Chunk]:
+    if offset:
+        for _, metadata in chunks:
+            if "start_line" in metadata:
+                metadata["start_line"] += offset
+                metadata["end_line"] += offset
+    return chunks
+
+
+def sample_regions(size: int, max_bytes: int = MAX_FILE_BYTES,
+                   regions: int = SAMPLE_REGIONS) -> List[Tuple[int, int]]:
+    """
+    Byte ranges to index from a file of the given size: the whole file when
+    it fits in max_bytes, otherwise evenly spaced windows from head to tail.
+
+    Returns:
+        list: (start, length) pairs in file order
+    """
+    if size <= max_bytes:
+        return [(0, size)]
+    window = max_bytes // regions
+    step = (size - window) / (regions - 1)
+    return [(round(i * step), window) for i in range(regions)]
+
+
+def stream_split(file_path: str, chunker: CodeChunker, size: int = None,
+                 max_bytes: int = MAX_FILE_BYTES, max_chunks: int = MAX_FILE_CHUNKS) -> Tuple[List[Chunk], str]:
+    """
+    Chunk a large file from its file handle without reading it whole.
+
+    Each segment is decoded and split on its own, with line ranges shifted
+    to the position of the segment in the file. The head segment is always
+    indexed; its chunks per byte tell how many bytes max_chunks covers, and
+    files over that (or over max_bytes) are represented by sample_regions()
+    windows, each stopping once its share of max_chunks is used.
+
+    Reading holds one segment at a time, but the chunks and the returned
+    text keep every indexed segment, so memory per file is bounded by
+    max_bytes rather than by the file size.
+
+    Args:
+        file_path (str): File to chunk
+        chunker (CodeChunker): Splitter applied to each segment
+        size (int): File size, looked up when None
+        max_bytes (int): Bytes indexed per file
+        max_chunks (int): Chunks kept per file
+
+    Returns:
+        tuple: (chunks in file order, the indexed text the chunks were cut from)
+    """
+    size = os.path.getsize(file_path) if size is None else size
+    python = file_path.endswith('.py')
+    chunks: List[Chunk] = []
+    texts: List[str] = []
+    line = 1
+
+    def add_segment(data: bytes, limit: int) -> int:
+        text = data.decode('utf-8', errors='ignore')
+        if not text.strip():
+            return 0
+        segment_chunks = _shift_lines(chunker.split(text, file_path), line - 1)[:limit]
+        chunks.extend(segment_chunks)
+        texts.append(text)
+        return len(segment_chunks)
+
+    with open(file_path, 'rb') as f:
+        head = next(_read_segments(f, SEGMENT_BYTES, python), b"")
+        head_chunks = add_segment(head, max_chunks)
+        line += head.count(b"\n")
+        position = len(head)  # end of the bytes already counted into line
+
+        bytes_per_chunk = len(head) / max(1, head_chunks)
+        regions = sample_regions(size, min(max_bytes, int(max_chunks * bytes_per_chunk)))
+        quota = max(1, max_chunks // len(regions))
+        if head_chunks > quota:
+            del chunks[quota:]
+
+        for number, (start, length) in enumerate(regions):
+            region_chunks = min(head_chunks, quota) if number == 0 else 0
+            if region_chunks >= quota:
+                continue
+            # Rewind over bytes read ahead of the last counted segment
+            f.seek(position)
+            if start > position:
+                line += _skip_to(f, start, python)
+                position = f.tell()
+            for data in _read_segments(f, start + length - position, python):
+                region_chunks += add_segment(data, quota - region_chunks)
+                line += data.count(b"\n")
+                position += len(data)
+                if region_chunks >= quota:
+                    break
+    if len(regions) > 1:
+        logger.debug(f"Sampled {len(regions)} regions of {file_path} ({size} bytes): {len(chunks)} chunks")
+    return chunks, "".join(texts)
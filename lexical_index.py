@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import math
+import logging
+from collections.abc import Mapping
+from typing import List, Dict, Tuple, Iterable, Sequence, Iterator
+import numpy as np
+from index_store import replacing, save_array
+
+logger = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"\w+")
+# Splits camelCase / PascalCase humps and digit runs: "parseHTTPResponse2" -> parse, HTTP, Response, 2
+_HUMP_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+RRF_K = 60  # reciprocal rank fusion constant, dampens the weight of the very top ranks
+
+LEXICAL_META_FILE = "lexical.json"
+LEXICAL_ARRAYS = ("postings", "tfs", "doc_lengths")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Code-aware tokenisation for lexical search.
+
+    Every word is kept whole (lowercased) and, when it is a compound
+    identifier, also split into its snake_case and camelCase parts, so
+    "get_user_by_id", "getUserById" and "user id" all share terms.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        lowered = word.lower()
+        tokens.append(lowered)
+        parts = [hump.lower() for piece in word.split("_") for hump in _HUMP_RE.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index of document ids.
+
+    Documents are identified by the same ids as the vector store docstore so
+    lexical and vector hits can be fused. Postings are kept as plain lists,
+    which makes incremental additions (e.g. the briefing) cheap.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_ids: List[str] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_ids: Sequence[str], texts: Iterable[str]) -> None:
+        """Index texts under the given document ids"""
+        for doc_id, text in zip(doc_ids, texts):
+            position = len(self.doc_ids)
+            tokens = tokenize(text)
+            self.doc_ids.append(doc_id)
+            self.doc_lengths.append(len(tokens))
+            self.total_length += len(tokens)
+
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                positions, freqs = self.postings.setdefault(token, ([], []))
+                positions.append(position)
+                freqs.append(tf)
+
+    def search(self, query: str, k: int = 8) -> List[Tuple[str, float]]:
+        """
+        Returns up to k (doc_id, score) pairs, best first. Documents sharing
+        no term with the query are never returned.
+        """
+        num_docs = len(self.doc_ids)
+        if not num_docs:
+            return []
+
+        lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * lengths / (self.total_length / num_docs or 1.0))
+        scores = np.zeros(num_docs, dtype=np.float32)
+        matched = np.zeros(num_docs, dtype=bool)
+
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            positions = np.asarray(posting[0])
+            tf = np.asarray(posting[1], dtype=np.float32)
+            df = len(positions)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            scores[positions] += idf * tf * (self.k1 + 1) / (tf + norm[positions])
+            matched[positions] = True
+
+        hits = np.flatnonzero(matched)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind="stable")[:k]]
+        return [(self.doc_ids[i], float(scores[i])) for i in top]
+
+
+class _ArrayPostings(Mapping):
+    """Postings of a persisted index: term -> slices of two (memory-mapped) arrays"""
+
+    def __init__(self, spans: Dict[str, List[int]], positions: np.ndarray, tfs: np.ndarray):
+        self.spans = spans
+        self.positions = positions
+        self.tfs = tfs
+
+    def __getitem__(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.spans[term]
+        return self.positions[start:end], self.tfs[start:end]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.spans)
+
+
+def save_bm25(index: BM25Index, directory: str, positions: Sequence[int]) -> None:
+    """
+    Persist an index as flat arrays (CSR layout) plus a term -> span table.
+
+    Args:
+        index (BM25Index): Index to save
+        directory (str): Target directory
+        positions (sequence): Persisted position of each indexed document, in
+            the order they were added; postings are renumbered accordingly
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    doc_lengths = np.zeros(len(index), dtype=np.int32)
+    doc_lengths[positions] = index.doc_lengths
+
+    spans, all_positions, all_tfs, offset = {}, [], [], 0
+    for term, (term_positions, tfs) in index.postings.items():
+        spans[term] = [offset, offset + len(tfs)]
+        all_positions.append(positions[np.asarray(term_positions, dtype=np.int64)])
+        all_tfs.append(np.asarray(tfs, dtype=np.int32))
+        offset += len(tfs)
+
+    arrays = {
+        "postings": np.concatenate(all_positions).astype(np.int32) if all_positions else np.zeros(0, np.int32),
+        "tfs": np.concatenate(all_tfs) if all_tfs else np.zeros(0, np.int32),
+        "doc_lengths": doc_lengths,
+    }
+    for name in LEXICAL_ARRAYS:
+        save_array(os.path.join(directory, f"lexical_{name}.npy"), arrays[name])
+    with replacing(os.path.join(directory, LEXICAL_META_FILE)) as tmp, open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"k1": index.k1, "b": index.b, "total_length": index.total_length, "terms": spans}, f)
+
+
+def load_bm25(directory: str, doc_ids: Sequence[str], use_mmap: bool = True) -> BM25Index:
+    """Open an index written by save_bm25; its arrays are memory-mapped and read-only"""
+    with open(os.path.join(directory, LEXICAL_META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+    mmap_mode = 'r' if use_mmap else None
+    arrays = {name: np.load(os.path.join(directory, f"lexical_{name}.npy"), mmap_mode=mmap_mode)
+              for name in LEXICAL_ARRAYS}
+
+    index = BM25Index(k1=meta["k1"], b=meta["b"])
+    index.doc_ids = doc_ids
+    index.doc_lengths = arrays["doc_lengths"]
+    index.total_length = meta["total_length"]
+    index.postings = _ArrayPostings(meta["terms"], arrays["postings"], arrays["tfs"])
+    return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], weights: Sequence[float] = None,
+                           rrf_k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuses several ranked id lists with reciprocal rank fusion.
+
+    Scores are divided by the best achievable score, so a document ranked
+    first in every list scores 1.0 and the result is comparable to a cosine
+    similarity.
+
+    Returns:
+        list: (doc_id, fused score) pairs, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (rrf_k + rank + 1)
+
+    best = sum(weight / (rrf_k + 1) for weight in weights)
+    return sorted(((doc_id, score / best) for doc_id, score in fused.items()), key=lambda item: -item[1])
@@ -0,0 +1,277 @@
+import os
+import re
+import json
+import logging
+from typing import List, Dict, Iterable, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree
+from repo_scanner import scan_repository
+
+try:
+    import tomllib
+
+    def _load_toml(content: str) -> dict:
+        return tomllib.loads(content)
+except ImportError:  # Python < 3.11
+    import toml
+
+    def _load_toml(content: str) -> dict:
+        return toml.loads(content)
+
+logger = logging.getLogger(__name__)
+
+# Dependency manifest file name -> ecosystem (category shown in the repository stats)
+MANIFEST_FILES = {
+    "requirements.txt": "Python",
+    "pyproject.toml": "Python",
+    "Pipfile": "Python",
+    "package.json": "JavaScript",
+    "pom.xml": "Java",
+    "build.gradle": "Java",
+    "go.mod": "Go",
+    "Cargo.toml": "Rust",
+    "Gemfile": "Ruby",
+}
+
+# package.json dependencies reported as frameworks in the technology summary
+JS_FRAMEWORKS = {
+    "react": "React",
+    "react-dom": "React",
+    "vue": "Vue.js",
+    "angular": "Angular",
+    "@angular/core": "Angular",
+}
+
+_REQUIREMENT_NAME_RE = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_GRADLE_RE = re.compile(r"^\s*(\w+)\s*\(?\s*['\"]([^:'\"\s]+):([^:'\"\s]+)[^'\"]*['\"]", re.MULTILINE)
+_GEM_RE = re.compile(r"^\s*gem\s+['\"]([^'\"]+)['\"]", re.MULTILINE)
+_GO_REQUIRE_RE = re.compile(r"^\s*(?:require\s+)?([\w.\-]+\.[\w.\-]+/[\w.\-/]+)\s+v\S+", re.MULTILINE)
+
+
+class Dependency(NamedTuple):
+    name: str
+    category: str
+    source: str  # manifest path, with " (dev)" for development dependencies
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "category": self.category, "source": self.source}
+
+
+def _requirement_name(spec: str) -> Optional[str]:
+    """Distribution name of a PEP 508 / pip requirement line"""
+    spec = spec.split('#')[0].strip()
+    if not spec or spec.startswith('-'):
+        return None
+    match = _REQUIREMENT_NAME_RE.match(spec)
+    return match.group(1) if match else None
+
+
+def _parse_requirements(content: str) -> Iterable[Tuple[str, bool]]:
+    for line in content.splitlines():
+        name = _requirement_name(line)
+        if name:
+            yield name, False
+
+
+def _parse_pyproject(content: str) -> Iterable[Tuple[str, bool]]:
+    data = _load_toml(content)
+    project = data.get("project", {})
+    for spec in project.get("dependencies", []):
+        yield _requirement_name(spec), False
+    for specs in project.get("optional-dependencies", {}).values():
+        for spec in specs:
+            yield _requirement_name(spec), True
+
+    poetry = data.get("tool", {}).get("poetry", {})
+    for name in poetry.get("dependencies", {}):
+        if name.lower() != "python":
+            yield name, False
+    for name in poetry.get("dev-dependencies", {}):
+        yield name, True
+    for group in poetry.get("group", {}).values():
+        for name in group.get("dependencies", {}):
+            yield name, True
+
+
+def _parse_pipfile(content: str) -> Iterable[Tuple[str, bool]]:
+    data = _load_toml(content)
+    for name in data.get("packages", {}):
+        yield name, False
+    for name in data.get("dev-packages", {}):
+        yield name, True
+
+
+def _parse_package_json(content: str) -> Iterable[Tuple[str, bool]]:
+    data = json.loads(content)
+    for name in data.get("dependencies", {}):
+        yield name, False
+    for name in data.get("devDependencies", {}):
+        yield name, True
+
+
+def _parse_pom(content: str) -> Iterable[Tuple[str, bool]]:
+    root = ElementTree.fromstring(content)
+    # Match tags whatever the POM namespace (or lack of one)
+    for dep in root.iter():
+        if not dep.tag.endswith("dependency"):
+            continue
+        fields = {child.tag.split('}')[-1]: (child.text or "").strip() for child in dep}
+        if fields.get("groupId") and fields.get("artifactId"):
+            yield f"{fields['groupId']}:{fields['artifactId']}", fields.get("scope") == "test"
+
+
+def _parse_gradle(content: str) -> Iterable[Tuple[str, bool]]:
+    for configuration, group, artifact in _GRADLE_RE.findall(content):
+        yield f"{group}:{artifact}", configuration.startswith("test")
+
+
+def _parse_go_mod(content: str) -> Iterable[Tuple[str, bool]]:
+    for module in _GO_REQUIRE_RE.findall(content):
+        yield module, False
+
+
+def _parse_cargo(content: str) -> Iterable[Tuple[str, bool]]:
+    data = _load_toml(content)
+    for name in data.get("dependencies", {}):
+        yield name, False
+    for section in ("dev-dependencies", "build-dependencies"):
+        for name in data.get(section, {}):
+            yield name, True
+
+
+def _parse_gemfile(content: str) -> Iterable[Tuple[str, bool]]:
+    for name in _GEM_RE.findall(content):
+        yield name, False
+
+
+PARSERS = {
+    "requirements.txt": _parse_requirements,
+    "pyproject.toml": _parse_pyproject,
+    "Pipfile": _parse_pipfile,
+    "package.json": _parse_package_json,
+    "pom.xml": _parse_pom,
+    "build.gradle": _parse_gradle,
+    "go.mod": _parse_go_mod,
+    "Cargo.toml": _parse_cargo,
+    "Gemfile": _parse_gemfile,
+}
+
+
+def parse_manifest(path: str, content: str) -> List[Dependency]:
+    """
+    Dependencies declared by one manifest, in file order without repeats.
+
+    Raises:
+        ValueError: the file name is not a known manifest
+        Exception: the content cannot be parsed (invalid JSON, TOML or XML)
+    """
+    filename = os.path.basename(path)
+    if filename not in PARSERS:
+        raise ValueError(f"Unknown dependency manifest: {path}")
+    category = MANIFEST_FILES[filename]
+    dependencies, seen = [], set()
+    for name, dev in PARSERS[filename](content):
+        source = f"{path} (dev)" if dev else path
+        if name and (name, source) not in seen:
+            seen.add((name, source))
+            dependencies.append(Dependency(name, category, source))
+    return dependencies
+
+
+class ManifestIndex:
+    """
+    Dependencies of one repository snapshot, parsed once from its manifests.
+
+    Built from a local checkout (from_directory) or over the GitHub API
+    (from_github) and served both as the repository stats list
+    (libraries()) and as the RAG technology summary (technologies()).
+    Manifests that cannot be parsed are logged and skipped.
+    """
+
+    def __init__(self, dependencies: Optional[List[Dependency]] = None, manifests: Optional[List[str]] = None):
+        self.dependencies = dependencies or []
+        self.manifests = manifests or []
+
+    @classmethod
+    def from_files(cls, files: Iterable[Tuple[str, str]], log: Optional[logging.Logger] = None) -> "ManifestIndex":
+        """Index (path, content) pairs of manifest files"""
+        index = cls()
+        for path, content in files:
+            index.manifests.append(path)
+            try:
+                index.dependencies.extend(parse_manifest(path, content))
+            except Exception as e:
+                (log or logger).debug(f"Error parsing {path}: {e}")
+        return index
+
+    @classmethod
+    def from_directory(cls, repo_path: str, entries: Optional[Iterable] = None) -> "ManifestIndex":
+        """
+        Index the manifests of a local checkout.
+
+        Args:
+            repo_path (str): Repository root
+            entries (list): FileEntry scan of the repository, so pruned
+                directories (vendored packages, node_modules) are skipped;
+                scanned here when None
+        """
+        if entries is None:
+            entries = scan_repository(repo_path)
+
+        def read():
+            for entry in entries:
+                if entry.name in MANIFEST_FILES:
+                    try:
+                        with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+                            yield os.path.relpath(entry.path, repo_path).replace(os.sep, '/'), f.read()
+                    except OSError as e:
+                        logger.warning(f"Error reading {entry.path}: {e}")
+
+        return cls.from_files(read())
+
+    @classmethod
+    def from_github(cls, repo, log: Optional[logging.Logger] = None) -> "ManifestIndex":
+        """
+        Index the manifests at the root of a GitHub repository.
+
+        The root listing is fetched once so only manifests that exist are
+        downloaded; if it is unavailable every manifest name is tried.
+
+        Raises:
+            Exception: every request failed for a reason other than a missing file
+        """
+        log = log or logger
+        try:
+            candidates = [item.path for item in repo.get_contents("") if item.path in MANIFEST_FILES]
+        except Exception as e:
+            log.debug(f"Cannot list repository root, trying every manifest: {e}")
+            candidates = list(MANIFEST_FILES)
+
+        files, errors = [], []
+        for path in candidates:
+            try:
+                files.append((path, repo.get_contents(path).decoded_content.decode('utf-8')))
+            except Exception as e:
+                if getattr(e, "status", None) != 404:
+                    errors.append(e)
+                log.debug(f"No {path} found or error: {e}")
+        if candidates and len(errors) == len(candidates):
+            raise errors[-1]
+
+        index = cls.from_files(files, log)
+        log.info(f"Found {len(index.dependencies)} libraries in {len(files)} dependency files")
+        return index
+
+    def libraries(self) -> List[dict]:
+        """Dependencies as {'name', 'category', 'source'} dicts"""
+        return [dep.to_dict() for dep in self.dependencies]
+
+    def technologies(self) -> Dict[str, List[str]]:
+        """Languages, frameworks and libraries declared by the manifests (unsorted, may repeat)"""
+        return {
+            "languages": [MANIFEST_FILES[os.path.basename(path)].lower() for path in self.manifests],
+            "frameworks": [JS_FRAMEWORKS[dep.name] for dep in self.dependencies
+                           if dep.category == "JavaScript" and not dep.source.endswith("(dev)")
+                           and dep.name in JS_FRAMEWORKS],
+            "libraries": [dep.name for dep in self.dependencies],
+            "tools": [],
+        }
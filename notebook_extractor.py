@@ -0,0 +1,140 @@
+import json
+import logging
+from typing import List, Iterator, NamedTuple, Dict, Any, Tuple, Callable
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+MAX_OUTPUT_CHARS = 200
+
+
+class NotebookCell(NamedTuple):
+    index: int
+    cell_type: str
+    source: str
+    output_summary: str
+
+    def render(self) -> str:
+        """Text used for embedding: a cell marker, the source and the output summary"""
+        parts = [f"# [cell {self.index}] {self.cell_type}", self.source.rstrip()]
+        if self.output_summary:
+            parts.append(self.output_summary)
+        return "\n".join(part for part in parts if part)
+
+
+def _join(value) -> str:
+    return "".join(value) if isinstance(value, list) else (value or "")
+
+
+def summarize_outputs(outputs: List[Dict[str, Any]], max_chars: int = MAX_OUTPUT_CHARS) -> str:
+    """
+    Replaces cell outputs by a short textual summary.
+
+    Text results keep their first `max_chars` characters; images, HTML and
+    other rich payloads are reduced to their MIME type. max_chars=0 drops
+    outputs entirely.
+    """
+    if max_chars <= 0 or not outputs:
+        return ""
+
+    lines = []
+    for output in outputs:
+        output_type = output.get("output_type")
+        if output_type == "stream":
+            text = _join(output.get("text"))
+        elif output_type == "error":
+            text = f"{output.get('ename', 'Error')}: {output.get('evalue', '')}"
+        else:
+            data = output.get("data", {})
+            text = _join(data.get("text/plain")) if "text/plain" in data else ""
+            rich = sorted(mime for mime in data if mime != "text/plain")
+            if rich:
+                text = (text + "\n" if text else "") + f"[{', '.join(rich)} output omitted]"
+        text = text.strip()
+        if not text:
+            continue
+        if len(text) > max_chars:
+            text = text[:max_chars] + "..."
+        lines.append(text)
+
+    if not lines:
+        return ""
+    return "\n".join("# output: " + line for text in lines for line in text.split("\n"))
+
+
+def _iter_raw_cells(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield cells one at a time, streaming the file when ijson is available"""
+    with open(path, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'cells.item')
+        else:
+            notebook = json.load(f)
+            yield from notebook.get("cells", [])
+
+
+def extract_cells(path: str, max_output_chars: int = MAX_OUTPUT_CHARS) -> List[NotebookCell]:
+    """
+    Extracts code and markdown cells from a Jupyter notebook.
+
+    Raw cells and empty cells are skipped, and outputs (including base64 plot
+    images) are summarised rather than kept.
+
+    Args:
+        path (str): Path to the .ipynb file
+        max_output_chars (int): Characters kept per text output (0 drops outputs)
+
+    Returns:
+        list: NotebookCell for every non-empty code or markdown cell
+    """
+    cells = []
+    for index, cell in enumerate(_iter_raw_cells(path)):
+        cell_type = cell.get("cell_type")
+        if cell_type not in ("code", "markdown"):
+            continue
+        source = _join(cell.get("source"))
+        if not source.strip():
+            continue
+        summary = summarize_outputs(cell.get("outputs", []), max_output_chars) if cell_type == "code" else ""
+        cells.append(NotebookCell(index, cell_type, source, summary))
+    return cells
+
+
+def split_notebook(cells: List[NotebookCell], splitter, max_chunk_size: int = 3000,
+                   length_function: Callable[[str], int] = len) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Groups consecutive cells into chunks of up to max_chunk_size (measured
+    with length_function, characters by default).
+
+    A cell larger than the limit is split on its own with `splitter`. Chunk
+    metadata records the first and last cell index it covers.
+    """
+    chunks = []
+    group: List[NotebookCell] = []
+    group_size = 0
+
+    def flush():
+        if group:
+            text = "\n\n".join(cell.render() for cell in group)
+            chunks.append((text, {"cell_start": group[0].index, "cell_end": group[-1].index}))
+
+    for cell in cells:
+        rendered = cell.render()
+        size = length_function(rendered)
+        if size > max_chunk_size:
+            flush()
+            group, group_size = [], 0
+            for text in splitter.split_text(rendered):
+                chunks.append((text, {"cell_start": cell.index, "cell_end": cell.index}))
+            continue
+        if group and group_size + size + 2 > max_chunk_size:
+            flush()
+            group, group_size = [], 0
+        group.append(cell)
+        group_size += size + 2
+
+    flush()
+    return chunks
@@ -0,0 +1,107 @@
+import os
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import fitz
+from langchain.schema.document import Document
+from worker_pool import get_pool_context
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages the worker start-up costs more than it saves
+PARALLEL_MIN_PAGES = 16
+# Pages handed to a worker at once; each worker opens the PDF once per range
+PAGES_PER_TASK = 8
+
+# Lines this much larger than the page's body text are marked as headings
+HEADING_RATIO = 1.2
+TITLE_RATIO = 1.5
+MAX_HEADING_CHARS = 120
+
+
+def _structured_text(page) -> str:
+    """
+    Page text with headings marked up as markdown ("## " / "### ").
+
+    The body size is the font size covering most characters on the page;
+    short lines set noticeably larger become headings, so the briefing
+    splitter can cut on section boundaries.
+    """
+    blocks = [b for b in page.get_text("dict")["blocks"] if b.get("type") == 0]
+    sizes = Counter()
+    for block in blocks:
+        for line in block["lines"]:
+            for span in line["spans"]:
+                sizes[round(span["size"], 1)] += len(span["text"].strip())
+    body_size = sizes.most_common(1)[0][0] if sizes else 0
+
+    paragraphs = []
+    for block in blocks:
+        lines = []
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if not text:
+                continue
+            size = max(span["size"] for span in line["spans"])
+            if body_size and size >= body_size * HEADING_RATIO and len(text) <= MAX_HEADING_CHARS:
+                marker = "## " if size >= body_size * TITLE_RATIO else "### "
+                lines.append(f"\n{marker}{text}")
+            else:
+                lines.append(text)
+        if lines:
+            paragraphs.append("\n".join(lines))
+    return "\n\n".join(paragraphs)
+
+
+def _page_text(page, structured: bool) -> str:
+    return _structured_text(page) if structured else page.get_text()
+
+
+def _extract_range(pdf_path: str, start: int, stop: int, structured: bool) -> List[Tuple[int, str]]:
+    """Worker task: open the PDF and extract pages [start, stop)"""
+    with fitz.open(pdf_path) as doc:
+        return [(number, _page_text(doc[number], structured)) for number in range(start, stop)]
+
+
+def extract_pdf_pages(pdf_path: str, structured: bool = True,
+                      max_workers: Optional[int] = None) -> List[Document]:
+    """
+    Extract a PDF with PyMuPDF, one Document per page.
+
+    Long PDFs are split into page ranges extracted by worker processes
+    (PyMuPDF documents cannot be shared between threads); short ones are
+    read in the calling process.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        structured (bool): Mark headings up as markdown for the splitter
+        max_workers (int): Worker processes for long PDFs, CPU count by default
+
+    Returns:
+        list: Documents with "source", "page" (0-based) and "total_pages" metadata
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        total = len(doc)
+        max_workers = max_workers or os.cpu_count() or 1
+        if total < PARALLEL_MIN_PAGES or max_workers < 2:
+            pages = [(number, _page_text(page, structured)) for number, page in enumerate(doc)]
+            total = len(pages)
+        else:
+            pages = None
+    finally:
+        doc.close()
+
+    if pages is None:
+        ranges = [(start, min(start + PAGES_PER_TASK, total)) for start in range(0, total, PAGES_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(ranges)), mp_context=get_pool_context()) as executor:
+            futures = [executor.submit(_extract_range, pdf_path, start, stop, structured)
+                       for start, stop in ranges]
+            pages = [page for future in futures for page in future.result()]
+        logger.info(f"Extracted {total} pages from {pdf_path} with {min(max_workers, len(ranges))} workers")
+
+    return [
+        Document(page_content=text, metadata={"source": pdf_path, "page": number, "total_pages": total})
+        for number, text in pages
+    ]
@@ -0,0 +1,101 @@
+import os
+import logging
+from typing import List, NamedTuple, Optional, Iterable
+from ignore_rules import IgnoreMatcher
+
+# Directories that are never worth descending into
+IGNORED_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', 'venv',
+    'dist', 'build', 'out', '.next', '.sass-cache'
+})
+
+logger = logging.getLogger(__name__)
+
+
+class FileEntry(NamedTuple):
+    """A single file found while scanning a repository"""
+    path: str
+    rel_path: str
+    size: int
+    ext: str
+    mtime: float
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+def scan_repository(repo_path: str, ignored_dirs: Iterable[str] = IGNORED_DIRS,
+                    matcher: Optional[IgnoreMatcher] = None) -> List[FileEntry]:
+    """
+    Walks a repository once and returns a manifest of every file in it.
+
+    Ignored directories are pruned before descending, so a committed
+    node_modules or .git costs one directory entry rather than a full walk.
+    When a matcher is given, its rules are evaluated during the walk and any
+    nested .gitignore is added to it as its directory is reached. Symlinks
+    are not followed. Entries are sorted by relative path so the manifest is
+    stable between runs.
+
+    Args:
+        repo_path (str): Root of the repository
+        ignored_dirs (iterable): Directory names to skip entirely
+        matcher (IgnoreMatcher): Optional path-based exclusion rules
+
+    Returns:
+        list: FileEntry for every regular file in the repository
+    """
+    ignored_dirs = frozenset(ignored_dirs)
+    manifest = []
+    excluded = 0
+    pending = [(repo_path, "")]
+
+    while pending:
+        current, rel_dir = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.warning(f"Cannot scan directory {current}: {e}")
+            continue
+
+        # The root .gitignore is loaded by IgnoreMatcher.for_repository
+        if matcher is not None and rel_dir and any(e.name == '.gitignore' for e in entries):
+            matcher.add_gitignore(os.path.join(current, '.gitignore'), base=rel_dir)
+
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in ignored_dirs or (matcher and matcher.is_ignored(rel_path, is_dir=True)):
+                        excluded += 1
+                        continue
+                    pending.append((entry.path, rel_path))
+                elif entry.is_file(follow_symlinks=False):
+                    if matcher and matcher.is_ignored(rel_path):
+                        excluded += 1
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    manifest.append(FileEntry(
+                        path=entry.path,
+                        rel_path=rel_path.replace('/', os.sep),
+                        size=stat.st_size,
+                        ext=os.path.splitext(entry.name)[1].lower(),
+                        mtime=stat.st_mtime
+                    ))
+            except OSError as e:
+                logger.debug(f"Skipping unreadable entry {entry.path}: {e}")
+
+    logger.info(f"Scanned {len(manifest)} files in {repo_path} ({excluded} paths excluded)")
+    manifest.sort(key=lambda f: f.rel_path)
+    return manifest
+
+
+def filter_by_extension(manifest: List[FileEntry], extensions: Iterable[str],
+                        max_size: Optional[int] = None) -> List[FileEntry]:
+    """Return the manifest entries with one of the given extensions (and under max_size, if set)"""
+    extensions = {ext.lower() for ext in extensions}
+    return [
+        f for f in manifest
+        if f.ext in extensions and (max_size is None or f.size <= max_size)
+    ]
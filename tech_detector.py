@@ -0,0 +1,96 @@
+import re
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from App.repo_analyzer.constants import MAIN_LIBRARIES
+except ImportError:
+    MAIN_LIBRARIES = set()
+
+# Imports reported under their display name, as (category, name)
+FRAMEWORK_IMPORTS = {
+    'flask': ('libraries', 'Flask'),
+    'django': ('libraries', 'Django'),
+    'fastapi': ('libraries', 'FastAPI'),
+    'tensorflow': ('frameworks', 'TensorFlow'),
+    'torch': ('frameworks', 'PyTorch'),
+    'sklearn': ('frameworks', 'scikit-learn'),
+    'pandas': ('libraries', 'Pandas'),
+    'numpy': ('libraries', 'NumPy'),
+}
+
+# Package names whose import name differs from the distribution name
+IMPORT_NAMES = {
+    'scikit-learn': 'sklearn',
+    'pytorch': 'torch',
+    'opencv-python': 'cv2',
+    'pillow': 'PIL',
+    'scikit-image': 'skimage',
+    'imbalanced-learn': 'imblearn',
+    'beautifulsoup4': 'bs4',
+    'psycopg2-binary': 'psycopg2',
+    'pyyaml': 'yaml',
+    'python-dotenv': 'dotenv',
+    'pygithub': 'github',
+    'gitpython': 'git',
+    'python-jose': 'jose',
+    'pymupdf': 'fitz',
+    'kafka-python': 'kafka',
+    'confluent-kafka': 'confluent_kafka',
+    'faust-streaming': 'faust',
+    'neptune-client': 'neptune',
+    'ydata-profiling': 'ydata_profiling',
+    'great-expectations': 'great_expectations',
+    'apache-airflow': 'airflow',
+    'apache-beam': 'apache_beam',
+    'dbt-core': 'dbt',
+    'pre-commit': 'pre_commit',
+}
+
+# One pass over the text: only import statements at the start of a line match,
+# and the imported top-level module is looked up in a dict, so the cost does
+# not grow with the number of libraries recognised
+_IMPORT_RE = re.compile(r"^[ \t]*(?:from[ \t]+(\w+)|import[ \t]+([\w.]+(?:[ \t]+as[ \t]+\w+)?"
+                        r"(?:[ \t]*,[ \t]*[\w.]+(?:[ \t]+as[ \t]+\w+)?)*))", re.MULTILINE)
+
+
+class TechDetector:
+    """
+    Maps the top-level modules imported by Python sources to technologies.
+
+    Built once from FRAMEWORK_IMPORTS plus a set of distribution names
+    (MAIN_LIBRARIES by default), then applied to already-decoded file
+    contents while the repository is read.
+    """
+
+    def __init__(self, libraries: Optional[Iterable[str]] = None,
+                 frameworks: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.technologies: Dict[str, Tuple[str, str]] = {}
+        for name in (MAIN_LIBRARIES if libraries is None else libraries):
+            module = IMPORT_NAMES.get(name, name.replace('-', '_'))
+            self.technologies[module] = ('libraries', name)
+        self.technologies.update(FRAMEWORK_IMPORTS if frameworks is None else frameworks)
+
+    def detect(self, content: str) -> Set[Tuple[str, str]]:
+        """(category, name) of every known technology imported by content"""
+        found = set()
+        for from_module, imported in _IMPORT_RE.findall(content):
+            modules = [from_module] if from_module else [part.split()[0] for part in imported.split(',')]
+            for module in modules:
+                technology = self.technologies.get(module.split('.')[0])
+                if technology:
+                    found.add(technology)
+        return found
+
+
+_default_detector: Optional[TechDetector] = None
+
+
+def detect_imports(content: str) -> Set[Tuple[str, str]]:
+    """Detect technologies with the default detector, compiled once per process"""
+    global _default_detector
+    if _default_detector is None:
+        _default_detector = TechDetector()
+    return _default_detector.detect(content)
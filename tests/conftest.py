@@ -0,0 +1,26 @@
+import pytest
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class KeywordEmbeddings(Embeddings):
+    """Deterministic embeddings for tests: normalised bag of hashed words"""
+    dim = 64
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[sum(map(ord, word)) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def keyword_embeddings():
+    return KeywordEmbeddings()
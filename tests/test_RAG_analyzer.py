@@ -234,7 +234,7 @@ class TestGitHubRAGAnalyzer:
             analyzer.rag_processor.technologies = {"python": 80, "javascript": 20}
             
             # Mock RAG context retrieval
-            analyzer.rag_processor.get_formatted_context.return_value = "Formatted context"
+            analyzer.rag_processor.get_assembled_context.return_value = "Formatted context"
             
             # Mock LLM response
             analyzer.llm_client.invoke.return_value = (
@@ -269,7 +269,7 @@ class TestGitHubRAGAnalyzer:
             analyzer.rag_processor.technologies = {"python": 80, "javascript": 20}
             
             # Mock RAG context retrieval
-            analyzer.rag_processor.get_formatted_context.return_value = "Formatted context"
+            analyzer.rag_processor.get_assembled_context.return_value = "Formatted context"
             
             # Mock LLM response with missing sections
             analyzer.llm_client.invoke.return_value = (
@@ -370,7 +370,7 @@ class TestGitHubRAGAnalyzer:
             analyzer.rag_processor.technologies = {"python": 80, "javascript": 20}
             
             # Mock RAG context retrieval
-            analyzer.rag_processor.get_formatted_context.return_value = "Formatted context"
+            analyzer.rag_processor.get_assembled_context.return_value = "Formatted context"
             
             # Mock LLM error
             analyzer.llm_client.invoke.side_effect = Exception("LLM error")
@@ -1,10 +1,17 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, patch, ANY
 from langchain.schema.document import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 import sys
 import os
+import json
+import numpy as np
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from large_file_reader import MAX_FILE_CHUNKS
 from RAG_process import RepoRAGProcessor
+from code_chunker import CodeChunker
+from context_assembler import Candidate
+from embedding_registry import clear_registry
 
 @pytest.fixture
 def processor():
@@ -15,14 +22,38 @@ def processor():
         
     # Set up the object state directly
     processor.logger = MagicMock()
+    processor.embedding_model_name = "test-model"
     processor.embeddings = MagicMock()
-    processor.vector_store = None
+    processor.index_params = None
+    processor.partitions = {}
+    processor.lexical_weight = 1.0
+    processor.index_dir = None
+    processor.briefing_cache = None
+    processor.sampled_files = set()
+    processor.max_workers = 1
+    processor.token_counter = None
+    processor.code_splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=0)
+    processor.code_chunker = CodeChunker(processor.code_splitter, max_chunk_size=200, min_chunk_size=50)
     
+    # Query embeddings are cached per model name; keep tests independent
+    clear_registry()
     yield processor
+    clear_registry()
+
+def _candidates(*docs):
+    return [Candidate(str(i), doc, np.zeros(2, dtype=np.float32), 1.0 - i / 10) for i, doc in enumerate(docs)]
+
+def _partition(*docs):
+    """Mock partition whose vector search returns docs, best first"""
+    candidates = {c.doc_id: c for c in _candidates(*docs)}
+    partition = MagicMock()
+    partition.rank.return_value = [([(c.doc_id, c.score) for c in candidates.values()], [])]
+    partition.candidates.side_effect = lambda ranked: [candidates[doc_id] for doc_id, _ in ranked]
+    return partition
 
 def test_retrieve_relevant_content_no_vector_store(processor):
     """Test retrieve_relevant_content when vector_store is not initialized"""
-    # Setup - vector_store is already None from fixture
+    # Setup - the fixture builds no partitions
     
     # Execute
     result = processor.retrieve_relevant_content("test query")
@@ -38,41 +69,417 @@ def test_retrieve_relevant_content_success(processor):
     mock_doc2 = Document(page_content="Test content 2", metadata={"source": "test2.py", "type": "code"})
     mock_docs = [mock_doc1, mock_doc2]
     
-    processor.vector_store = MagicMock()
-    processor.vector_store.similarity_search.return_value = mock_docs
+    processor.partitions = {"code": _partition(*mock_docs)}
     
     # Execute
-    result = processor.retrieve_relevant_content("test query")
+    with patch('RAG_process.embed_queries', return_value=[[0.0, 1.0]]):
+        result = processor.retrieve_relevant_content("test query")
     
     # Verify
     assert result == mock_docs
-    processor.vector_store.similarity_search.assert_called_once_with("test query", k=8)
+    processor.partitions["code"].rank.assert_called_once_with(["test query"], ANY, 8)
 
 def test_retrieve_relevant_content_k_parameter(processor):
     """Test retrieve_relevant_content handles k parameter correctly"""
     # Setup
-    processor.vector_store = MagicMock()
-    processor.vector_store.similarity_search.return_value = []
+    processor.partitions = {"code": _partition()}
     
     # Execute
-    result = processor.retrieve_relevant_content("test query", k=5)
+    with patch('RAG_process.embed_queries', return_value=[[0.0, 1.0]]):
+        result = processor.retrieve_relevant_content("test query", k=5)
     
     # Verify
     assert result == []
-    processor.vector_store.similarity_search.assert_called_once_with("test query", k=5)
+    processor.partitions["code"].rank.assert_called_once_with(["test query"], ANY, 5)
 
 def test_retrieve_relevant_content_exception(processor):
-    """Test retrieve_relevant_content when similarity_search raises an exception"""
+    """Test retrieve_relevant_content when the partition search raises an exception"""
     # Setup
-    processor.vector_store = MagicMock()
-    processor.vector_store.similarity_search.side_effect = Exception("Test error")
+    processor.partitions = {"code": MagicMock()}
+    processor.partitions["code"].rank.side_effect = Exception("Test error")
     
     # Execute
-    result = processor.retrieve_relevant_content("test query")
+    with patch('RAG_process.embed_queries', return_value=[[0.0, 1.0]]):
+        result = processor.retrieve_relevant_content("test query")
     
     # Verify
     assert result == []
     processor.logger.error.assert_called_once()
     error_call_args = processor.logger.error.call_args[0][0]
     assert "Failed to retrieve content" in error_call_args
-    assert "Test error" in error_call_args
\ No newline at end of file
+    assert "Test error" in error_call_args
+
+def _write_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"module_{i:02d}.txt"
+        path.write_text("\n".join(f"value_{i}_{j} = {j}" for j in range(40)))
+        paths.append(str(path))
+    return paths
+
+def test_read_and_split_files_serial(processor, tmp_path):
+    """Files are split in input order when running in a single process"""
+    paths = _write_files(tmp_path, 3)
+
+    result = list(processor._read_and_split_files(paths, str(tmp_path)))
+
+    assert [source for source, _, _ in result] == ["module_00.txt", "module_01.txt", "module_02.txt"]
+    assert all(len(chunks) > 1 for _, chunks, _ in result)
+    assert all(content.startswith("value_") for _, _, content in result)
+
+def test_read_and_split_files_streams_large_files(processor, tmp_path):
+    """Large files are represented past the old 50KB cut-off, within the per-file chunk budget"""
+    path = tmp_path / "big.py"
+    path.write_text("".join(f"def function_{i}():\n    return {i}\n\n" for i in range(5000)))
+
+    [(_, chunks, content)] = list(processor._read_and_split_files([str(path)], str(tmp_path)))
+
+    assert os.path.getsize(path) > 100_000
+    assert "truncated" not in content
+    assert len(chunks) <= MAX_FILE_CHUNKS
+    assert chunks[-1][1]["start_line"] > 5000 * 3 * 0.9
+    lines = path.read_text().split("\n")
+    text, metadata = chunks[-1]
+    assert text.strip() == "\n".join(lines[metadata["start_line"] - 1:metadata["end_line"]]).strip()
+    assert metadata["symbols"].startswith("function_")
+
+def test_read_and_split_files_parallel_matches_serial(processor, tmp_path):
+    """The worker pool returns the same chunks, in the same order, as the serial path"""
+    paths = _write_files(tmp_path, 20)
+    serial = list(processor._read_and_split_files(paths, str(tmp_path)))
+
+    processor.max_workers = 2
+    parallel = list(processor._read_and_split_files(paths, str(tmp_path)))
+
+    assert parallel == serial
+    processor.logger.warning.assert_not_called()
+
+def test_read_and_split_files_skips_unreadable(processor, tmp_path):
+    """Files that cannot be read are logged and skipped"""
+    paths = _write_files(tmp_path, 1) + [str(tmp_path / "missing.py")]
+
+    result = list(processor._read_and_split_files(paths, str(tmp_path)))
+
+    assert [source for source, _, _ in result] == ["module_00.txt"]
+    processor.logger.warning.assert_called_once()
+
+def test_detect_technologies_ignores_vendored_manifests(processor, tmp_path):
+    """Dependency files inside pruned directories are not reported"""
+    (tmp_path / "requirements.txt").write_text("flask==2.0\n# comment\n")
+    (tmp_path / "app.py").write_text("import flask\nimport numpy as np\n")
+    (tmp_path / "node_modules" / "left-pad").mkdir(parents=True)
+    (tmp_path / "node_modules" / "left-pad" / "package.json").write_text('{"dependencies": {"react": "1"}}')
+
+    result = processor._detect_technologies(str(tmp_path))
+
+    assert result["languages"] == ["python"]
+    assert result["libraries"] == ["Flask", "NumPy", "flask"]
+    assert result["frameworks"] == []
+
+def test_get_formatted_context_includes_line_ranges(processor):
+    """Code chunks are labelled with their source line range"""
+    processor.partitions = {"code": _partition(
+        Document(page_content="def f(): pass", metadata={"source": "a.py", "type": "code", "start_line": 3, "end_line": 4}),
+        Document(page_content="Requirement", metadata={"source": "brief.pdf", "type": "briefing"}),
+    )}
+
+    with patch('RAG_process.embed_queries', return_value=[[0.0, 1.0]]):
+        result = processor.get_formatted_context("query")
+
+    assert "--- FROM CODE FILE: a.py (lines 3-4) ---" in result
+    assert "--- FROM BRIEFING ---\nRequirement" in result
+
+def test_filter_relevant_files_sniffs_content(processor, tmp_path):
+    """Binary and minified files are skipped and data dumps are only sampled"""
+    (tmp_path / "app.py").write_text("def main():\n    return 1\n")
+    (tmp_path / "bundle.js").write_text("var a=1;" * 2000)
+    (tmp_path / "blob.txt").write_bytes(b"\x00\x01" * 2000)
+    (tmp_path / "users.json").write_text(json.dumps([{"id": i, "name": f"user {i}"} for i in range(3000)], indent=2))
+
+    relevant = processor._filter_relevant_files(str(tmp_path))
+
+    assert sorted(os.path.basename(path) for path in relevant) == ["app.py", "users.json"]
+    assert processor.sampled_files == {str(tmp_path / "users.json")}
+    assert processor.sniff_report == {"text": 1, "minified": 1, "binary": 1, "data": 1}
+
+    result = {source: chunks for source, chunks, _ in processor._read_and_split_files(relevant, str(tmp_path))}
+    sample = "".join(text for text, _ in result["users.json"])
+    assert len(sample) < 5000
+    assert "[data file sampled" in sample
+
+def test_read_and_split_files_notebook(processor, tmp_path):
+    """Notebooks are split by cell and their outputs dropped"""
+    notebook = {"cells": [{"cell_type": "code", "source": "print(1)",
+                           "outputs": [{"output_type": "display_data", "data": {"image/png": "A" * 1000}}]}]}
+    (tmp_path / "nb.ipynb").write_text(json.dumps(notebook))
+
+    result = list(processor._read_and_split_files([str(tmp_path / "nb.ipynb")], str(tmp_path)))
+
+    assert result == [("nb.ipynb", [("# [cell 0] code\nprint(1)\n# output: [image/png output omitted]",
+                                     {"cell_start": 0, "cell_end": 0})], None)]
+
+class _WordTokenizer:
+    def encode(self, text, add_special_tokens=True):
+        return text.split()
+
+@patch('RAG_process.get_embeddings')
+def test_init_sizes_chunks_by_model_tokens(mock_get_embeddings):
+    """Token mode targets the embedding model's sequence limit"""
+    from types import SimpleNamespace
+    from langchain_huggingface import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings.model_construct(model_name="test-model")
+    embeddings._client = SimpleNamespace(tokenizer=_WordTokenizer(), max_seq_length=256)
+    mock_get_embeddings.return_value = embeddings
+
+    processor = RepoRAGProcessor()
+
+    assert processor.chunk_length == "tokens"
+    assert processor.code_splitter._chunk_size == 254
+    assert processor.code_chunker.max_chunk_size == 254
+    assert processor.code_chunker.length_function("a b c") == 3
+
+@patch('RAG_process.get_embeddings')
+def test_init_falls_back_to_characters(mock_get_embeddings):
+    """Without a tokenizer the character-based sizes are used"""
+    mock_get_embeddings.return_value = object()
+
+    processor = RepoRAGProcessor()
+
+    assert processor.chunk_length == "chars"
+    assert processor.code_chunker.max_chunk_size == 3000
+    assert processor.token_counter is None
+
+def test_process_repository_end_to_end(processor, tmp_path, keyword_embeddings):
+    """A small repository is scanned, chunked, deduplicated and indexed"""
+    from ignore_rules import DEFAULT_EXCLUDE_PATTERNS
+    from vector_index import IndexParams
+    processor.embeddings = keyword_embeddings
+    processor.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    processor.file_budget_bytes = 1024 * 1024
+    processor.max_files = 200
+    processor.index_params = IndexParams()
+    (tmp_path / "app.py").write_text("import flask\n\ndef serve():\n    return 'flask routes'\n")
+    (tmp_path / "copy_of_app.py").write_text("import flask\n\ndef serve():\n    return 'flask routes'\n")
+    (tmp_path / "README.md").write_text("# Pandas dataframe cleaning project\n")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "lib.py").write_text("vendored = True\n")
+
+    assert processor.process_repository(str(tmp_path)) is True
+
+    assert processor.dedup_report.exact_duplicates == 1
+    code = processor.partitions["code"].vector_store
+    sources = {code.docstore.search(doc_id).metadata["source"] for doc_id in code.index_to_docstore_id.values()}
+    assert sources == {"app.py", "README.md"}
+    assert len(processor.partitions["metadata"]) == 1
+    assert processor.retrieve_relevant_content("pandas dataframe", k=1)[0].metadata["source"] == "README.md"
+    assert processor.technologies["libraries"] == ["Flask"]
+
+def test_process_repository_detects_imports_without_rereading(processor, tmp_path, keyword_embeddings):
+    """Imports are detected on the text the pipeline already read"""
+    from ignore_rules import DEFAULT_EXCLUDE_PATTERNS
+    processor.embeddings = keyword_embeddings
+    processor.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    processor.file_budget_bytes = 1024 * 1024
+    processor.max_files = 200
+    (tmp_path / "model.py").write_text("import torch\nfrom pandas import DataFrame\n\ndef train():\n    pass\n")
+
+    with patch.object(processor, '_filter_files_by_extension') as mock_filter:
+        assert processor.process_repository(str(tmp_path)) is True
+
+    mock_filter.assert_not_called()
+    assert processor.technologies["frameworks"] == ["PyTorch"]
+    assert processor.technologies["libraries"] == ["Pandas"]
+
+def test_retrieve_relevant_content_batch_matches_single(processor, keyword_embeddings):
+    """Batched retrieval returns the same documents as one query at a time"""
+    docs = [
+        Document(page_content="flask routes and views", metadata={"source": "app.py", "type": "code"}),
+        Document(page_content="docker compose services", metadata={"source": "docker-compose.yml", "type": "code"}),
+        Document(page_content="pytest fixtures for the api", metadata={"source": "tests/conftest.py", "type": "code"}),
+    ]
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions(docs)
+    queries = ["flask routes", "docker services"]
+
+    batch = processor.retrieve_relevant_content_batch(queries, k=2)
+    single = [processor.retrieve_relevant_content(q, k=2) for q in queries]
+
+    assert [[d.metadata["source"] for d in r] for r in batch] == \
+        [[d.metadata["source"] for d in r] for r in single]
+    assert batch[0][0].metadata["source"] == "app.py"
+    assert len(processor.get_formatted_context_batch(queries, k=1)) == 2
+
+def test_retrieve_relevant_content_batch_no_vector_store(processor):
+    """Every query gets an empty result when the vector store is missing"""
+    assert processor.retrieve_relevant_content_batch(["a", "b"]) == [[], []]
+
+def test_get_assembled_context_deduplicates_across_queries(processor, keyword_embeddings):
+    """Chunks matching several queries are included once, grouped under their file"""
+    docs = [
+        Document(page_content="flask api routes", metadata={"source": "app.py", "type": "code"}),
+        Document(page_content="flask api docker deployment", metadata={"source": "README.md", "type": "code"}),
+        Document(page_content="docker compose services", metadata={"source": "docker-compose.yml", "type": "code"}),
+    ]
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions(docs)
+
+    context = processor.get_assembled_context(["flask api", "docker deployment"], k=2)
+
+    assert context.count("--- FROM CODE FILE: README.md ---") == 1
+    assert processor.context_stats["selected"] == 3
+
+def test_hybrid_retrieval_finds_identifiers(processor, keyword_embeddings):
+    """BM25 recovers chunks whose identifiers the embeddings do not split"""
+    docs = [
+        Document(page_content="def getUserById(user_id): return db.get(user_id)", metadata={"source": "users.py", "type": "code"}),
+        Document(page_content="user interface colours and id badges", metadata={"source": "ui.md", "type": "code"}),
+        Document(page_content="docker compose services", metadata={"source": "docker-compose.yml", "type": "code"}),
+    ]
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions(docs)
+
+    result = processor.retrieve_relevant_content("getUserById", k=3)
+
+    assert result[0].metadata["source"] == "users.py"
+    assert len(processor.partitions["code"].lexical_index) == 3
+
+def test_partitions_separate_briefing_from_code(processor, keyword_embeddings):
+    """Chunks are indexed by type and searches can target a single partition"""
+    docs = [
+        Document(page_content="flask api routes", metadata={"source": "app.py", "type": "code"}),
+        Document(page_content="build a flask api with tests", metadata={"source": "brief.pdf", "type": "briefing"}),
+        Document(page_content="Repository Technologies: flask", metadata={"source": "technology_analysis", "type": "metadata"}),
+    ]
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions(docs)
+
+    briefing_only = processor.retrieve_relevant_content("flask api", k=3, partitions=["briefing"])
+    everything = processor.retrieve_relevant_content("flask api", k=3)
+
+    assert set(processor.partitions) == {"code", "briefing", "metadata"}
+    assert [d.metadata["source"] for d in briefing_only] == ["brief.pdf"]
+    assert {d.metadata["source"] for d in everything} == {"app.py", "brief.pdf", "technology_analysis"}
+
+def test_reprocessing_keeps_briefing_partition(processor, keyword_embeddings):
+    """Replacing the repository partitions leaves the briefing partition intact"""
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions([Document(page_content="requirements", metadata={"type": "briefing"})])
+    briefing = processor.partitions["briefing"]
+
+    processor._build_partitions([Document(page_content="code", metadata={"source": "a.py", "type": "code"})],
+                                replace=("code", "metadata"))
+
+    assert processor.partitions["briefing"] is briefing
+
+def test_process_briefing_reuses_cached_partition(processor, keyword_embeddings, tmp_path):
+    """The same PDF uploaded again attaches its cached chunks and embeddings without parsing"""
+    from briefing_cache import BriefingCache
+    processor.embeddings = keyword_embeddings
+    processor.doc_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=0)
+    processor.briefing_cache = BriefingCache(str(tmp_path / "cache"))
+    pages = [Document(page_content="build a flask api with tests", metadata={"source": "brief.pdf", "page": 0})]
+
+    uploads = []
+    for name in ("first.pdf", "second.pdf"):
+        path = tmp_path / name
+        path.write_bytes(b"%PDF same briefing")
+        uploads.append(str(path))
+
+    with patch('RAG_process.extract_pdf_pages', return_value=pages) as mock_extract:
+        assert processor.process_briefing(uploads[0]) is True
+        first = processor.partitions["briefing"]
+        assert processor.process_briefing(uploads[1]) is True
+
+    mock_extract.assert_called_once_with(uploads[0])
+    assert processor.partitions["briefing"] is first
+    assert not any(os.path.exists(path) for path in uploads)
+
+def test_save_and_open_indexes(processor, keyword_embeddings, tmp_path):
+    """Saved partitions are served memory-mapped by a fresh processor"""
+    docs = [
+        Document(page_content="flask api routes", metadata={"source": "app.py", "type": "code"}),
+        Document(page_content="build a flask api", metadata={"source": "brief.pdf", "type": "briefing"}),
+    ]
+    processor.embeddings = keyword_embeddings
+    processor._build_partitions(docs)
+    processor.save_indexes(str(tmp_path))
+    processor.partitions = {}
+
+    assert processor.open_indexes(str(tmp_path)) is True
+
+    assert set(processor.partitions) == {"code", "briefing"}
+    result = processor.retrieve_relevant_content("flask api", k=1, partitions=["briefing"])
+    assert result[0].metadata["source"] == "brief.pdf"
+    assert processor.open_indexes(str(tmp_path / "missing")) is False
+
+def test_process_repository_streams_to_disk(processor, tmp_path, keyword_embeddings):
+    """With index_dir set, repository partitions are written to disk and served memory-mapped"""
+    from ignore_rules import DEFAULT_EXCLUDE_PATTERNS
+    from vector_index import IndexParams
+    from index_store import MmapDocstore
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for i in range(20):
+        (repo / f"module_{i}.py").write_text(f"def handler_{i}():\n    return 'value {i}'\n")
+    processor.embeddings = keyword_embeddings
+    processor.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    processor.file_budget_bytes = 1024 * 1024
+    processor.max_files = 200
+    processor.index_params = IndexParams()
+    processor.index_dir = str(tmp_path / "indexes")
+
+    assert processor.process_repository(str(repo)) is True
+
+    code = processor.partitions["code"]
+    assert isinstance(code.vector_store.docstore, MmapDocstore)
+    assert len(code) == 20
+    doc_id, _ = code.lexical_index.search("handler_7", k=1)[0]
+    assert code.vector_store.docstore.search(doc_id).metadata["source"] == "module_7.py"
+    assert len(processor.retrieve_relevant_content("handler", k=3)) == 3
+    stages = {stats["stage"]: stats for stats in processor.pipeline_stats}
+    assert stages["chunk"]["items_in"] == 20 and stages["embed"]["items_out"] == 1
+
+def test_process_repository_records_late_duplicates_on_disk(processor, tmp_path, keyword_embeddings, monkeypatch):
+    """Copies found after a chunk was written to disk still reach its duplicate_sources"""
+    import threading
+    from ignore_rules import DEFAULT_EXCLUDE_PATTERNS
+    from vector_index import IndexParams
+    from index_partitions import PartitionBuilder
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    shared = "def shared_helper():\n    return 'same body everywhere'\n"
+    (repo / "a_orig.py").write_text(shared)
+    (repo / "b_unique.py").write_text("def unique():\n    return 2\n")
+    (repo / "c_copy.py").write_text(shared)
+
+    # One chunk per embedding window, and the copy held back until the original was written
+    import RAG_process
+    monkeypatch.setattr(RAG_process, "SCHEDULE_WINDOW", 1)
+    written = threading.Event()
+    add = PartitionBuilder.add
+    def add_and_signal(self, *args, **kwargs):
+        add(self, *args, **kwargs)
+        written.set()
+    monkeypatch.setattr(PartitionBuilder, "add", add_and_signal)
+    read_and_split_files = RepoRAGProcessor._read_and_split_files
+    def read_copy_last(self, file_paths, repo_path):
+        for result in read_and_split_files(self, file_paths, repo_path):
+            if result[0] == "c_copy.py":
+                assert written.wait(5)
+            yield result
+    monkeypatch.setattr(RepoRAGProcessor, "_read_and_split_files", read_copy_last)
+
+    processor.embeddings = keyword_embeddings
+    processor.exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+    processor.file_budget_bytes = 1024 * 1024
+    processor.max_files = 200
+    processor.index_params = IndexParams()
+    processor.index_dir = str(tmp_path / "indexes")
+
+    assert processor.process_repository(str(repo)) is True
+
+    docstore = processor.partitions["code"].vector_store.docstore
+    metadata = {docstore.search(str(i)).metadata["source"]: docstore.search(str(i)).metadata
+                for i in range(len(docstore))}
+    assert set(metadata) == {"a_orig.py", "b_unique.py"}
+    assert metadata["a_orig.py"]["duplicate_sources"] == "c_copy.py"
@@ -0,0 +1,68 @@
+import numpy as np
+from langchain.schema.document import Document
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from briefing_cache import BriefingCache, get_briefing_cache, file_digest, config_key
+from index_partitions import IndexPartition
+
+def test_file_digest_depends_on_content_only(tmp_path):
+    a, b, c = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    a.write_bytes(b"%PDF same")
+    b.write_bytes(b"%PDF same")
+    c.write_bytes(b"%PDF other")
+
+    assert file_digest(str(a)) == file_digest(str(b))
+    assert file_digest(str(a)) != file_digest(str(c))
+
+def test_config_key_changes_with_settings():
+    assert config_key("model", 1000, 150) == config_key("model", 1000, 150)
+    assert config_key("model", 1000, 150) != config_key("other-model", 1000, 150)
+
+def test_text_round_trip(tmp_path):
+    cache = BriefingCache(str(tmp_path))
+
+    assert cache.get_text("abc") is None
+    cache.put_text("abc", "Requisitos: API REST")
+    assert cache.get_text("abc") == "Requisitos: API REST"
+
+def test_partition_is_reopened_from_disk(tmp_path, keyword_embeddings):
+    docs = [Document(page_content="level one rest api", metadata={"type": "briefing"}),
+            Document(page_content="level two docker deployment", metadata={"type": "briefing"})]
+    partition = IndexPartition("briefing", keyword_embeddings).build(docs)
+    BriefingCache(str(tmp_path)).put_partition("abc", "key", partition, "test-model")
+
+    # A fresh cache (e.g. another worker) only has the files on disk
+    reopened = BriefingCache(str(tmp_path)).get_partition("abc", "key", keyword_embeddings, "test-model")
+
+    query = "docker deployment"
+    vectors = np.asarray([keyword_embeddings.embed_query(query)], dtype=np.float32)
+    assert len(reopened) == 2
+    assert reopened.search([query], vectors, k=1)[0][0].document.page_content == "level two docker deployment"
+
+def test_partition_miss_for_other_configuration(tmp_path, keyword_embeddings):
+    cache = BriefingCache(str(tmp_path))
+    partition = IndexPartition("briefing", keyword_embeddings).build([Document(page_content="rest api")])
+    cache.put_partition("abc", "key", partition, "test-model")
+
+    assert cache.get_partition("abc", "key", keyword_embeddings) is partition
+    assert cache.get_partition("abc", "other-key", keyword_embeddings) is None
+    assert cache.get_partition("def", "key", keyword_embeddings) is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = BriefingCache(str(tmp_path), max_entries=2)
+    cache.put_text("first", "1")
+    cache.put_text("second", "2")
+    os.utime(tmp_path / "first", (1, 1))
+    os.utime(tmp_path / "second", (2, 2))
+    cache.put_text("third", "3")
+
+    assert cache.get_text("first") is None
+    assert cache.get_text("second") == "2"
+    assert cache.get_text("third") == "3"
+
+def test_get_briefing_cache_is_shared_per_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRIEFING_CACHE_DIR", str(tmp_path))
+
+    assert get_briefing_cache() is get_briefing_cache(str(tmp_path))
+    assert get_briefing_cache().directory == str(tmp_path)
@@ -0,0 +1,80 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.schema.document import Document
+from chunk_dedup import deduplicate_chunks, MinHasher
+
+def _doc(text, source):
+    return Document(page_content=text, metadata={"source": source, "type": "code"})
+
+BASE = " ".join(f"token{i} value{i * 7}" for i in range(200))
+
+def test_exact_duplicates_collapsed():
+    """Identical chunks (up to whitespace) are kept once with every source recorded"""
+    docs = [_doc(BASE, "v1.py"), _doc(BASE.replace(" ", "\n  "), "v2.py"), _doc(BASE, "final.py")]
+
+    kept, report = deduplicate_chunks(docs)
+
+    assert len(kept) == 1
+    assert kept[0].metadata["source"] == "v1.py"
+    assert kept[0].metadata["duplicate_sources"] == "v2.py, final.py"
+    assert report.exact_duplicates == 2
+    assert report.near_duplicates == 0
+    assert report.kept_chunks == 1
+
+def test_near_duplicates_collapsed():
+    """A copy with a small edit is detected as a near duplicate"""
+    edited = BASE.replace("token100 value700", "token100 value701")
+    docs = [_doc(BASE, "script.py"), _doc(edited, "script_final.py")]
+
+    kept, report = deduplicate_chunks(docs)
+
+    assert len(kept) == 1
+    assert report.near_duplicates == 1
+    assert report.chars_removed == len(edited)
+    assert kept[0].metadata["duplicate_sources"] == "script_final.py"
+
+def test_distinct_chunks_kept():
+    """Unrelated chunks are all kept and get no duplicate metadata"""
+    docs = [_doc(f"def f{i}(): return {' '.join(str(j * i) for j in range(50))}", f"m{i}.py") for i in range(1, 6)]
+
+    kept, report = deduplicate_chunks(docs)
+
+    assert kept == docs
+    assert report.to_dict() == {
+        "total_chunks": 5, "kept_chunks": 5, "exact_duplicates": 0,
+        "near_duplicates": 0, "chars_removed": 0,
+    }
+    assert all("duplicate_sources" not in d.metadata for d in kept)
+
+def test_duplicate_within_same_source_not_listed():
+    """Repeated chunks inside one file do not list the file as its own duplicate"""
+    kept, report = deduplicate_chunks([_doc(BASE, "a.py"), _doc(BASE, "a.py")])
+
+    assert len(kept) == 1
+    assert "duplicate_sources" not in kept[0].metadata
+    assert report.exact_duplicates == 1
+
+def test_minhash_signature_similarity():
+    """Signature agreement approximates Jaccard similarity"""
+    hasher = MinHasher(num_perm=128)
+
+    same = hasher.signature(BASE)
+    assert (same == hasher.signature(BASE)).all()
+    assert (same == hasher.signature("completely different text about other things")).mean() < 0.2
+
+def test_chunk_deduplicator_streams():
+    """The incremental deduplicator agrees with the batch function"""
+    from chunk_dedup import ChunkDeduplicator
+    docs = [
+        Document(page_content="def a():\n    return 1", metadata={"source": "a.py"}),
+        Document(page_content="def a():\n    return 1", metadata={"source": "copy/a.py"}),
+        Document(page_content="def b():\n    return 2", metadata={"source": "b.py"}),
+    ]
+    deduplicator = ChunkDeduplicator()
+
+    kept = [doc for doc in docs if deduplicator.add(doc)]
+
+    assert [doc.metadata["source"] for doc in kept] == ["a.py", "b.py"]
+    assert kept[0].metadata["duplicate_sources"] == "copy/a.py"
+    assert deduplicator.report.exact_duplicates == 1 and deduplicator.report.total_chunks == 3
@@ -0,0 +1,83 @@
+import numpy as np
+from langchain.schema.document import Document
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chunk_store import ChunkSpan, SourceBuffer, ViewDocstore, locate_chunks
+from index_partitions import IndexPartition, PartitionBuilder
+from index_store import MmapDocstore
+
+def test_locate_chunks_overlap_and_byte_offsets():
+    content = "héllo wörld\nsecond line\nthird line\n"
+    chunks = ["héllo wörld\nsecond", "second line\nthird", "not in file", "third line\n"]
+
+    located = locate_chunks(content, chunks)
+
+    data = content.encode('utf-8')
+    assert located[2] is None
+    for text, position in zip(chunks, located):
+        if position is not None:
+            start, end, _ = position
+            assert data[start:end].decode('utf-8') == text
+    assert [position[2] for position in located if position] == [1, 2, 3]
+
+def test_view_docstore_materialises_text_on_lookup():
+    content = "".join(f"line {i}\n" for i in range(100))
+    store = ViewDocstore()
+    file_id = store.sources.add(content)
+    chunks = [content[i:i + 200] for i in range(0, len(content) - 200, 100)]
+    for i, (text, position) in enumerate(zip(chunks, locate_chunks(content, chunks))):
+        store.add_chunk(str(i), Document(page_content=text, metadata={"n": i}),
+                        ChunkSpan(file_id, position[0], position[1]))
+    store.add({"inline": Document(page_content="stored inline")})
+
+    assert store.search("1").page_content == chunks[1]
+    assert store.search("1").metadata == {"n": 1}
+    assert store.search("inline").page_content == "stored inline"
+    assert store.search("missing") == "ID missing not found."
+    sizes = store.text_bytes()
+    # Overlapping chunks share the one copy of the file
+    assert sizes["sources"] == len(content) < sum(len(text) for text in chunks)
+    assert sizes["inline"] == len("stored inline")
+
+def test_source_buffer_ids():
+    sources = SourceBuffer()
+    assert sources.add("first") == 0
+    assert sources.add("zweite ä") == 1
+    assert len(sources) == 2
+    assert sources.file_bytes(1) == "zweite ä".encode('utf-8')
+    assert sources.text(ChunkSpan(1, 7, 9)) == "ä"
+
+def test_partition_builder_writes_spans_to_disk(tmp_path, keyword_embeddings):
+    content = "def deploy():\n    docker()\n\ndef serve():\n    rest_api()\n"
+    texts = ["def deploy():\n    docker()\n", "def serve():\n    rest_api()\n"]
+    builder = PartitionBuilder("code", keyword_embeddings, directory=str(tmp_path))
+    file_id = builder.add_source(content)
+    spans = [ChunkSpan(file_id, start, end) for start, end, _ in locate_chunks(content, texts)]
+    docs = [Document(page_content=t, metadata={"source": "app.py"}) for t in texts + ["inline chunk"]]
+    builder.add(docs, np.asarray(keyword_embeddings.embed_documents([d.page_content for d in docs])),
+                spans + [None])
+    builder.finish()
+
+    docstore = MmapDocstore(str(tmp_path))
+    assert [docstore.search(str(i)).page_content for i in range(3)] == texts + ["inline chunk"]
+    assert docstore.search("1").metadata == {"source": "app.py"}
+
+def test_in_memory_views_survive_save_and_open(tmp_path, keyword_embeddings):
+    content = "level one rest api\nlevel two docker deployment\n"
+    texts = ["level one rest api\n", "level two docker deployment\n"]
+    builder = PartitionBuilder("code", keyword_embeddings)
+    file_id = builder.add_source(content)
+    spans = [ChunkSpan(file_id, start, end) for start, end, _ in locate_chunks(content, texts)]
+    docs = [Document(page_content=t) for t in texts]
+    builder.add(docs, np.asarray(keyword_embeddings.embed_documents(texts)), spans)
+    partition = builder.finish()
+    assert isinstance(partition.vector_store.docstore, ViewDocstore)
+
+    partition.save(str(tmp_path))
+    reopened = IndexPartition.open(str(tmp_path), keyword_embeddings)
+
+    query = "docker deployment"
+    vectors = np.asarray([keyword_embeddings.embed_query(query)], dtype=np.float32)
+    results = reopened.search([query], vectors, k=1)
+    assert results[0][0].document.page_content == texts[1]
@@ -0,0 +1,105 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from code_chunker import CodeChunker
+
+SOURCE = '''"""Module docstring"""
+import os
+
+CONSTANT = 1
+
+
+@decorator
+def small():
+    return 1
+
+
+class Model:
+    """A model"""
+
+    def fit(self):
+{fit_body}
+
+    def predict(self):
+        return 2
+
+
+def tail():
+    pass
+'''
+
+@pytest.fixture
+def chunker():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=400, chunk_overlap=0)
+    return CodeChunker(splitter, max_chunk_size=400, min_chunk_size=100)
+
+def _source(body_lines):
+    return SOURCE.format(fit_body="\n".join(f"        x{i} = {i}" for i in range(body_lines)))
+
+def test_split_python_small_file_merges_definitions(chunker):
+    """Small definitions are merged into a single chunk covering the whole file"""
+    source = _source(2)
+
+    chunks = chunker.split(source, "model.py")
+
+    assert len(chunks) == 1
+    text, metadata = chunks[0]
+    assert text == source.rstrip("\n")
+    assert metadata["start_line"] == 1
+    assert metadata["end_line"] == source.count("\n")
+    assert metadata["symbols"] == "small, Model, tail"
+
+def test_split_python_large_class_split_per_method(chunker):
+    """Oversized classes are split on method boundaries with qualified names"""
+    source = _source(60)
+    lines = source.split("\n")
+
+    chunks = chunker.split(source, "model.py")
+
+    symbols = [m.get("symbols", "") for _, m in chunks]
+    assert any("Model.fit" in s for s in symbols)
+    assert any("Model.predict" in s for s in symbols)
+    # Chunks tile the file without overlap and line ranges match the text
+    assert chunks[0][1]["start_line"] == 1
+    for (_, prev), (_, nxt) in zip(chunks, chunks[1:]):
+        assert nxt["start_line"] > prev["end_line"]
+    for text, metadata in chunks:
+        assert text.strip() == "\n".join(lines[metadata["start_line"] - 1:metadata["end_line"]]).strip()
+
+def test_split_python_respects_max_chunk_size(chunker):
+    """Oversized functions fall back to character splitting"""
+    chunks = chunker.split(_source(200), "model.py")
+
+    assert all(len(text) <= 400 for text, _ in chunks)
+    assert all("Model.fit" in m["symbols"] for text, m in chunks if "x150 = 150" in text)
+
+def test_split_invalid_python_falls_back(chunker):
+    """Files that do not parse use the fallback splitter"""
+    chunks = chunker.split("def broken(:\n    pass\n", "broken.py")
+
+    assert chunks == [("def broken(:\n    pass", {"start_line": 1, "end_line": 2})]
+
+def test_split_non_python_uses_fallback_with_line_ranges(chunker):
+    """Other file types are character-split and keep their line ranges"""
+    content = "\n".join(f"line {i} " + "x" * 40 for i in range(30))
+
+    chunks = chunker.split(content, "notes.md")
+
+    assert len(chunks) > 1
+    for text, metadata in chunks:
+        first = int(text.split()[1])
+        assert metadata["start_line"] == first + 1
+        assert "symbols" not in metadata
+
+def test_split_python_with_token_length_function():
+    """Sizes can be measured with a custom length function such as a token counter"""
+    words = lambda text: len(text.split())
+    splitter = RecursiveCharacterTextSplitter(chunk_size=40, chunk_overlap=0, length_function=words)
+    token_chunker = CodeChunker(splitter, max_chunk_size=40, min_chunk_size=10, length_function=words)
+
+    chunks = token_chunker.split(_source(60), "model.py")
+
+    assert len(chunks) > 1
+    assert all(words(text) <= 40 for text, _ in chunks)
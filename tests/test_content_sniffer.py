@@ -0,0 +1,71 @@
+import os
+import json
+import zlib
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from content_sniffer import (classify_content, sniff_file, byte_entropy, TEXT, BINARY, MINIFIED, DATA,
+                             SNIFF_BYTES, DATA_MIN_BYTES)
+
+SOURCE = b"".join(f"def handler_{i}(request):\n    return render(request, 'page_{i}.html')\n\n".encode()
+                  for i in range(60))
+
+def test_source_code_is_text():
+    assert classify_content(SOURCE[:SNIFF_BYTES], '.py', len(SOURCE)) == TEXT
+
+def test_null_bytes_mean_binary():
+    head = b"PK\x03\x04" + b"\x00" * 200 + SOURCE[:1000]
+
+    assert classify_content(head, '.txt', 100000) == BINARY
+
+def test_compressed_content_is_binary():
+    rng = random.Random(0)
+    head = zlib.compress(bytes(rng.getrandbits(8) for _ in range(8000)))[:SNIFF_BYTES].replace(b"\x00", b"\x01")
+
+    assert byte_entropy(head) > 7.2
+    assert classify_content(head, '.json', 100000) == BINARY
+
+def test_non_latin_text_is_not_binary():
+    head = ("数据处理模块：读取文件并生成报告。" * 100).encode('utf-8')[:SNIFF_BYTES]
+
+    assert classify_content(head, '.md', 50000) == TEXT
+
+def test_minified_bundle():
+    head = (b"!function(e){var t={};function n(r){if(t[r])return t[r].exports;" * 80)[:SNIFF_BYTES]
+
+    assert classify_content(head, '.js', 400000) == MINIFIED
+
+def test_long_prose_lines_are_not_minified():
+    head = (b"This paragraph of documentation is written on a single very long line. " * 60)[:SNIFF_BYTES]
+
+    assert classify_content(head, '.md', 20000) == TEXT
+
+def test_json_records_dump():
+    rows = [{"id": i, "name": f"user {i}", "score": i * 0.5} for i in range(2000)]
+    one_line = json.dumps(rows).encode()
+    indented = json.dumps(rows, indent=2).encode()
+
+    assert classify_content(one_line[:SNIFF_BYTES], '.json', len(one_line)) == DATA
+    assert classify_content(indented[:SNIFF_BYTES], '.json', len(indented)) == DATA
+    # Small record files are indexed whole
+    assert classify_content(indented[:SNIFF_BYTES], '.json', DATA_MIN_BYTES - 1) == TEXT
+
+def test_json_lines_and_csv_renamed_to_txt():
+    jsonl = b"".join(json.dumps({"id": i, "text": "hello"}).encode() + b"\n" for i in range(200))
+    csv = b"".join(f"{i},user {i},{i * 3}\n".encode() for i in range(2000))
+
+    assert classify_content(jsonl[:SNIFF_BYTES], '.txt', DATA_MIN_BYTES) == DATA
+    assert classify_content(csv[:SNIFF_BYTES], '.txt', len(csv)) == DATA
+
+def test_config_json_is_text():
+    config = json.dumps({"name": "app", "scripts": {"test": "jest"}, "dependencies": {"react": "18"}},
+                        indent=2).encode()
+
+    assert classify_content(config, '.json', DATA_MIN_BYTES * 2) == TEXT
+
+def test_sniff_file_reads_only_the_head(tmp_path):
+    path = tmp_path / "bundle.min.js"
+    path.write_bytes(b"var a=1;" * 100000)
+
+    assert sniff_file(str(path), '.js', path.stat().st_size) == MINIFIED
+    assert sniff_file(str(tmp_path / "missing.js"), '.js', 0) == TEXT
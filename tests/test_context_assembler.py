@@ -0,0 +1,87 @@
+import numpy as np
+from langchain.schema.document import Document
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from context_assembler import Candidate, mmr_select, assemble_documents, group_by_source, format_grouped_context
+
+def unit(*values):
+    v = np.asarray(values, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+def candidate(doc_id, vector, source="a.py", query=None, **metadata):
+    doc = Document(page_content=f"content {doc_id}", metadata={"source": source, "type": "code", **metadata})
+    score = float(vector @ query) if query is not None else 0.0
+    return Candidate(doc_id, doc, vector, score)
+
+def test_mmr_prefers_novel_candidates():
+    """A near copy of the top hit loses to a slightly less relevant but different chunk"""
+    query = unit(1, 0, 0)
+    candidates = [
+        candidate("top", unit(1, 0.1, 0), query=query),
+        candidate("copy", unit(1, 0.11, 0), query=query),
+        candidate("other", unit(0.7, 0, 0.7), query=query),
+    ]
+
+    chosen = mmr_select(candidates, k=2, lambda_mult=0.5)
+
+    assert [candidates[i].doc_id for i in chosen] == ["top", "other"]
+
+def test_mmr_lambda_one_is_plain_ranking():
+    """Without a diversity weight candidates come back in relevance order"""
+    query = unit(1, 0, 0)
+    candidates = [candidate("b", unit(0.5, 0.5, 0), query=query), candidate("a", unit(1, 0, 0), query=query)]
+
+    chosen = mmr_select(candidates, k=2, lambda_mult=1.0)
+
+    assert [candidates[i].doc_id for i in chosen] == ["a", "b"]
+
+def test_assemble_never_repeats_chunks_across_queries():
+    """A chunk returned for every query appears once in the assembled context"""
+    first, second = unit(1, 0.5, 0), unit(0.5, 1, 0)
+    readme = unit(1, 1, 0)
+    per_query = [
+        [candidate("readme", readme, source="README.md", query=first), candidate("x", unit(1, 0, 0), query=first)],
+        [candidate("readme", readme, source="README.md", query=second), candidate("y", unit(0, 1, 0), query=second)],
+    ]
+
+    documents, stats = assemble_documents(per_query, k=2)
+
+    ids = [doc.page_content for doc in documents]
+    assert len(ids) == len(set(ids)) == 3
+    assert stats == {"queries": 2, "retrieved": 4, "unique_retrieved": 3, "selected": 3}
+
+def test_assemble_respects_max_chunks():
+    """The total number of chunks is capped"""
+    per_query = [[candidate(str(i), unit(1, i, 0)) for i in range(5)]]
+
+    documents, _ = assemble_documents(per_query, k=5, max_chunks=2)
+
+    assert len(documents) == 2
+
+def test_group_by_source_orders_chunks_by_line():
+    """Sources keep selection order, chunks inside a source keep file order"""
+    docs = [
+        Document(page_content="late", metadata={"source": "a.py", "type": "code", "start_line": 50, "end_line": 60}),
+        Document(page_content="other", metadata={"source": "b.py", "type": "code"}),
+        Document(page_content="early", metadata={"source": "a.py", "type": "code", "start_line": 1, "end_line": 10}),
+    ]
+
+    groups = group_by_source(docs)
+
+    assert [key for key, _ in groups] == [("code", "a.py"), ("code", "b.py")]
+    assert [d.page_content for d in groups[0][1]] == ["early", "late"]
+
+def test_format_grouped_context_single_header_per_source():
+    """Each file is labelled once, with line ranges per chunk"""
+    docs = [
+        Document(page_content="def f(): pass", metadata={"source": "a.py", "type": "code", "start_line": 1, "end_line": 1}),
+        Document(page_content="def g(): pass", metadata={"source": "a.py", "type": "code", "start_line": 5, "end_line": 5}),
+        Document(page_content="Level 1: REST API", metadata={"source": "brief.pdf", "type": "briefing", "page": 0}),
+    ]
+
+    context = format_grouped_context(docs)
+
+    assert context.count("--- FROM CODE FILE: a.py ---") == 1
+    assert "(lines 5-5)\ndef g(): pass" in context
+    assert "--- FROM BRIEFING ---\nLevel 1: REST API" in context
@@ -0,0 +1,89 @@
+import pytest
+import threading
+from unittest.mock import MagicMock, patch
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import embedding_registry
+from embedding_registry import get_embeddings, preload_embeddings, loaded_models, clear_registry
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    clear_registry()
+    yield
+    clear_registry()
+
+@patch('embedding_registry.HuggingFaceEmbeddings')
+def test_get_embeddings_loads_once(mock_hf):
+    """The same instance is returned for repeated requests of a model"""
+    first = get_embeddings("model-a")
+    second = get_embeddings("model-a")
+
+    assert first is second
+    mock_hf.assert_called_once_with(
+        model_name="model-a",
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': 32}
+    )
+
+@patch('embedding_registry.HuggingFaceEmbeddings')
+def test_get_embeddings_separate_models(mock_hf):
+    """Different models and devices get their own instances"""
+    mock_hf.side_effect = lambda **kwargs: MagicMock()
+
+    a = get_embeddings("model-a")
+    b = get_embeddings("model-b")
+    c = get_embeddings("model-a", device="cuda")
+
+    assert a is not b and a is not c
+    assert set(loaded_models()) == {("model-a", "cpu"), ("model-b", "cpu"), ("model-a", "cuda")}
+
+@patch('embedding_registry.HuggingFaceEmbeddings')
+def test_get_embeddings_thread_safe(mock_hf):
+    """Concurrent first use loads the model only once"""
+    mock_hf.side_effect = lambda **kwargs: MagicMock()
+    results = []
+
+    def worker():
+        results.append(get_embeddings("model-a"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert mock_hf.call_count == 1
+    assert all(r is results[0] for r in results)
+
+@patch('embedding_registry.HuggingFaceEmbeddings')
+def test_preload_embeddings_logs_failures(mock_hf):
+    """Preloading does not raise when a model cannot be loaded"""
+    mock_hf.side_effect = Exception("download failed")
+
+    preload_embeddings(["model-a"])
+
+    assert loaded_models() == ()
+
+def test_embed_queries_batches_and_caches():
+    """Unseen queries are embedded in one batch, repeated ones come from the cache"""
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+
+    first = embedding_registry.embed_queries(["a", "bb", "a"], "model-a", embeddings=embeddings)
+    second = embedding_registry.embed_queries(["bb", "a"], "model-a", embeddings=embeddings)
+
+    assert first == [[1.0], [2.0], [1.0]]
+    assert second == [[2.0], [1.0]]
+    embeddings.embed_documents.assert_called_once_with(["a", "bb"])
+
+def test_embed_queries_cache_is_bounded():
+    """Queries beyond the cache size are still returned but not stored"""
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[0.0] for _ in texts]
+
+    with patch.object(embedding_registry, 'QUERY_CACHE_SIZE', 2):
+        result = embedding_registry.embed_queries(["a", "b", "c"], "model-a", embeddings=embeddings)
+
+    assert len(result) == 3
+    assert len(embedding_registry.get_query_cache("model-a")) == 2
@@ -0,0 +1,71 @@
+import numpy as np
+from unittest.mock import MagicMock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pydantic import BaseModel, PrivateAttr
+from embedding_scheduler import EmbeddingScheduler, plan_batches, padded_tokens
+
+def _lengths():
+    # Short config chunks interleaved with full-length code chunks, as in file order
+    return [8, 250, 12, 256, 5, 240, 9, 16] * 16
+
+def test_plan_batches_respects_budget_and_covers_all():
+    lengths = _lengths()
+
+    batches = plan_batches(lengths, token_budget=1024, max_batch_size=64)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert all(len(batch) * max(lengths[i] for i in batch) <= 1024 for batch in batches)
+    assert all(len(batch) <= 64 for batch in batches)
+
+def test_plan_batches_reduces_padding():
+    lengths = _lengths()
+    fixed = [list(range(i, min(i + 32, len(lengths)))) for i in range(0, len(lengths), 32)]
+
+    bucketed = plan_batches(lengths, token_budget=32 * 256)
+
+    assert padded_tokens(lengths, bucketed) < padded_tokens(lengths, fixed) * 0.7
+
+def test_plan_batches_oversized_sequence_gets_own_batch():
+    assert plan_batches([10, 5000, 10], token_budget=100) == [[0, 2], [1]]
+
+def test_embed_restores_input_order():
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    texts = ["x" * n for n in (40, 4, 400, 8, 80)]
+
+    vectors = EmbeddingScheduler(embeddings, length_function=len, token_budget=100).embed(texts)
+
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [40.0, 4.0, 400.0, 8.0, 80.0]
+    # Sorted by length: the shortest texts go to the model first
+    assert embeddings.embed_documents.call_args_list[0].args[0][0] == "x" * 4
+
+def test_embed_clips_lengths_to_model_limit():
+    embeddings = MagicMock()
+    embeddings.embed_documents.side_effect = lambda texts: [[0.0] for _ in texts]
+    scheduler = EmbeddingScheduler(embeddings, max_length=100, token_budget=400)
+
+    scheduler.embed(["a"] * 4, lengths=[1000] * 4)
+
+    # Truncated to 100 tokens each, all four fit one batch
+    embeddings.embed_documents.assert_called_once()
+
+class _EncodingEmbeddings(BaseModel):
+    """Stands in for HuggingFaceEmbeddings: encode_kwargs plus a private model"""
+    encode_kwargs: dict
+    _model_calls: list = PrivateAttr(default_factory=list)
+
+    def embed_documents(self, texts):
+        self._model_calls.append(self.encode_kwargs["batch_size"])
+        return [[1.0, 0.0] for _ in texts]
+
+def test_scheduler_raises_batch_size_on_its_own_copy():
+    """Scheduled batches use max_batch_size; the shared embeddings keep their default"""
+    shared = _EncodingEmbeddings(encode_kwargs={"normalize_embeddings": True, "batch_size": 32})
+
+    EmbeddingScheduler(shared, max_batch_size=128).embed(["x" * 40] * 3)
+
+    assert shared.encode_kwargs == {"normalize_embeddings": True, "batch_size": 32}
+    assert shared._model_calls == [128]  # the copy shares the underlying model
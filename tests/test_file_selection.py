@@ -0,0 +1,88 @@
+import pytest
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from repo_scanner import scan_repository
+from file_selection import select_files, score_files, is_test_file, git_last_commit_times
+
+@pytest.fixture
+def repo(tmp_path):
+    files = {
+        "README.md": "# Project\n",
+        "main.py": "from pkg import core\nimport pkg.utils\n",
+        "pkg/__init__.py": "",
+        "pkg/core.py": "from pkg.utils import helper\n" + "x = 1\n" * 50,
+        "pkg/utils.py": "def helper(): pass\n" + "y = 2\n" * 50,
+        "pkg/unused.py": "z = 3\n" * 50,
+        "tests/test_core.py": "from pkg import core\n" + "t = 1\n" * 50,
+        "docs/notes.md": "notes\n" * 50,
+        "web/index.js": "const api = require('./api')\n",
+        "web/api.js": "module.exports = {}\n" + "// pad\n" * 50,
+    }
+    for rel, content in files.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return tmp_path
+
+def test_is_test_file():
+    assert is_test_file(os.path.join("tests", "test_core.py"))
+    assert is_test_file("test_models.py")
+    assert is_test_file("src/app.spec.js")
+    assert is_test_file("pkg/core_test.go")
+    assert not is_test_file("pkg/contest.py")
+    assert not is_test_file("latest/app.py")
+
+def test_score_files_signals(repo):
+    """Entry points, imported modules and sources outrank unused, test and doc files"""
+    scores = score_files(scan_repository(str(repo)))
+
+    assert scores["README.md"] > scores[os.path.join("pkg", "core.py")]
+    assert scores[os.path.join("pkg", "utils.py")] > scores[os.path.join("pkg", "unused.py")]
+    assert scores[os.path.join("pkg", "core.py")] > scores[os.path.join("tests", "test_core.py")]
+    assert scores[os.path.join("web", "api.js")] > scores[os.path.join("docs", "notes.md")]
+    assert scores["main.py"] > scores[os.path.join("pkg", "unused.py")]
+
+def test_select_files_everything_fits(repo):
+    """When the repository fits the budget every file is kept in manifest order"""
+    manifest = scan_repository(str(repo))
+
+    assert select_files(manifest, str(repo)) == manifest
+
+def test_select_files_respects_budget(repo):
+    """Selection stays under the byte budget and favours important files"""
+    manifest = scan_repository(str(repo))
+
+    selected = select_files(manifest, str(repo), budget_bytes=400, max_files=None)
+    names = [e.rel_path for e in selected]
+
+    assert sum(e.size for e in selected) <= 400
+    assert names[0] == "README.md"
+    assert "main.py" in names
+    assert os.path.join("tests", "test_core.py") not in names
+
+def test_select_files_max_files_and_tokens(repo):
+    manifest = scan_repository(str(repo))
+
+    assert len(select_files(manifest, str(repo), max_files=3)) == 3
+    assert sum(e.size for e in select_files(manifest, str(repo), budget_tokens=50, max_files=None)) <= 200
+
+def test_git_last_commit_times(repo):
+    """Recency comes from the latest commit touching each file"""
+    env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@t", GIT_COMMITTER_NAME="t",
+               GIT_COMMITTER_EMAIL="t@t")
+    def git(*args, date):
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+        subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, env=env)
+
+    git("init", date="2024-01-01T00:00:00")
+    git("add", ".", date="2024-01-01T00:00:00")
+    git("commit", "-m", "first", date="2024-01-01T00:00:00")
+    (repo / "pkg" / "unused.py").write_text("changed\n")
+    git("commit", "-am", "second", date="2024-06-01T00:00:00")
+
+    times = git_last_commit_times(str(repo))
+
+    assert times[os.path.join("pkg", "unused.py")] > times["main.py"]
+    assert git_last_commit_times(str(repo / "pkg")) == {}
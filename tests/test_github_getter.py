@@ -103,18 +103,13 @@ class TestGitHubAnalyzer:
         
         mock_repo.get_contents.side_effect = mock_get_contents
         
-        # Import ElementTree directly in the test to create real XML objects
-        from xml.etree import ElementTree
-        
-        # Create a real XML element tree that the function would use
-        root = ElementTree.fromstring(pom_content)
-        
-        # Execute with patching ElementTree.fromstring to return our prepared root
-        with patch('xml.etree.ElementTree.fromstring', return_value=root):
-            result = analyzer.detect_libraries(mock_repo)
+        # Execute
+        result = analyzer.detect_libraries(mock_repo)
         
         # Verify
-        assert len(result) == 0
+        assert len(result) == 2
+        assert {'name': 'org.springframework:spring-core', 'category': 'Java', 'source': 'pom.xml'} in result
+        assert {'name': 'junit:junit', 'category': 'Java', 'source': 'pom.xml'} in result
 
     def test_detect_libraries_multiple_files(self, analyzer):
         """Test detecting libraries from multiple dependency files"""
@@ -194,4 +189,15 @@ class TestGitHubAnalyzer:
         
         # Verify
         assert result == []
-        analyzer.logger.debug.assert_called()
\ No newline at end of file
+        analyzer.logger.debug.assert_called()
+
+    def test_detect_libraries_reuses_manifest_index(self, analyzer):
+        """An index already built from the clone is served without API calls"""
+        from manifest_index import ManifestIndex
+        mock_repo = MagicMock()
+        manifests = ManifestIndex.from_files([("requirements.txt", "flask==2.0\n")])
+
+        result = analyzer.detect_libraries(mock_repo, manifests)
+
+        assert result == [{'name': 'flask', 'category': 'Python', 'source': 'requirements.txt'}]
+        mock_repo.get_contents.assert_not_called()
@@ -0,0 +1,93 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ignore_rules import IgnoreMatcher, compile_pattern, DEFAULT_EXCLUDE_PATTERNS
+from repo_scanner import scan_repository
+
+@pytest.mark.parametrize("pattern,path,is_dir,expected", [
+    ("*.log", "debug.log", False, True),
+    ("*.log", "logs/app/debug.log", False, True),
+    ("/build", "build", True, True),
+    ("/build", "src/build", True, False),
+    ("docs/*.md", "docs/intro.md", False, True),
+    ("docs/*.md", "docs/api/intro.md", False, False),
+    ("docs/**/*.md", "docs/api/intro.md", False, True),
+    ("**/migrations/[0-9]*.py", "app/migrations/0001_initial.py", False, True),
+    ("**/migrations/[0-9]*.py", "app/migrations/__init__.py", False, False),
+    ("tmp/", "tmp", False, False),
+    ("tmp/", "tmp", True, True),
+    ("data?.csv", "data1.csv", False, True),
+])
+def test_patterns(pattern, path, is_dir, expected):
+    """gitignore glob semantics are translated correctly"""
+    matcher = IgnoreMatcher([pattern])
+    assert matcher.is_ignored(path, is_dir=is_dir) is expected
+
+def test_comments_and_blank_lines_are_skipped():
+    assert compile_pattern("# comment") is None
+    assert compile_pattern("   ") is None
+
+def test_negation_last_rule_wins():
+    """A later negated rule re-includes a path"""
+    matcher = IgnoreMatcher(["*.json", "!package.json"])
+
+    assert matcher.is_ignored("data.json")
+    assert not matcher.is_ignored("package.json")
+
+def test_rules_scoped_to_base_directory():
+    """Patterns from a nested .gitignore only apply below that directory"""
+    matcher = IgnoreMatcher()
+    matcher.add_patterns(["*.txt"], base="sub")
+
+    assert matcher.is_ignored("sub/notes.txt")
+    assert not matcher.is_ignored("notes.txt")
+
+def test_default_exclusions():
+    """The global list catches common student junk"""
+    matcher = IgnoreMatcher(DEFAULT_EXCLUDE_PATTERNS)
+
+    assert matcher.is_ignored(".venv", is_dir=True)
+    assert matcher.is_ignored("backend/env", is_dir=True)
+    assert matcher.is_ignored("lib/python3.11/site-packages", is_dir=True)
+    assert matcher.is_ignored("static/js/app.min.js")
+    assert matcher.is_ignored("data", is_dir=True)
+    assert not matcher.is_ignored("src/data", is_dir=True)
+    assert not matcher.is_ignored("src/app.js")
+
+def test_gitattributes_linguist_markers(tmp_path):
+    """linguist-vendored and linguist-generated paths are excluded, unset markers re-include"""
+    (tmp_path / ".gitattributes").write_text(
+        "# attributes\n"
+        "third_party/** linguist-vendored\n"
+        "*.pb.py linguist-generated=true\n"
+        "third_party/ours/** -linguist-vendored\n"
+        "*.py text eol=lf\n"
+    )
+    matcher = IgnoreMatcher.for_repository(str(tmp_path), exclude_patterns=[])
+
+    assert matcher.is_ignored("third_party/lib/x.py")
+    assert matcher.is_ignored("proto/api.pb.py")
+    assert not matcher.is_ignored("third_party/ours/x.py")
+    assert not matcher.is_ignored("src/main.py")
+
+def test_scan_repository_applies_gitignore(tmp_path):
+    """Root and nested .gitignore files are honoured during the scan"""
+    (tmp_path / ".gitignore").write_text("secrets/\n*.log\n")
+    (tmp_path / "secrets").mkdir()
+    (tmp_path / "secrets" / "key.txt").write_text("x")
+    (tmp_path / "app.log").write_text("x")
+    (tmp_path / "main.py").write_text("x")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".gitignore").write_text("generated.py\n")
+    (tmp_path / "pkg" / "generated.py").write_text("x")
+    (tmp_path / "pkg" / "module.py").write_text("x")
+    (tmp_path / "generated.py").write_text("x")
+
+    matcher = IgnoreMatcher.for_repository(str(tmp_path), exclude_patterns=[])
+    manifest = scan_repository(str(tmp_path), matcher=matcher)
+
+    assert sorted(f.rel_path for f in manifest) == sorted([
+        ".gitignore", "generated.py", "main.py",
+        os.path.join("pkg", ".gitignore"), os.path.join("pkg", "module.py"),
+    ])
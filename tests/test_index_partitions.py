@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+from langchain.schema.document import Document
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index_partitions import IndexPartition, partition_for, search_partitions
+from vector_index import IndexParams
+from index_store import read_meta
+
+def test_partition_for_types():
+    assert partition_for(Document(page_content="x", metadata={"type": "code"})) == "code"
+    assert partition_for(Document(page_content="x", metadata={"type": "briefing"})) == "briefing"
+    assert partition_for(Document(page_content="x", metadata={"type": "metadata"})) == "metadata"
+    assert partition_for(Document(page_content="x")) == "metadata"
+
+def _query_vectors(embeddings, queries):
+    return np.asarray([embeddings.embed_query(q) for q in queries], dtype=np.float32)
+
+def test_search_partitions_ranks_across_partitions(keyword_embeddings):
+    """A single-chunk partition's best hit does not outrank a better match elsewhere"""
+    metadata = IndexPartition("metadata", keyword_embeddings).build(
+        [Document(page_content="technologies: docker flask pandas", metadata={"type": "metadata"})]
+    )
+    code = IndexPartition("code", keyword_embeddings).build([
+        Document(page_content="flask api routes", metadata={"type": "code"}),
+        Document(page_content="pandas dataframe cleaning", metadata={"type": "code"}),
+    ])
+    queries = ["flask api routes"]
+
+    for lexical_weight in (1.0, 0.0):
+        merged = search_partitions({"metadata": metadata, "code": code}, queries,
+                                   _query_vectors(keyword_embeddings, queries), k=1, lexical_weight=lexical_weight)
+        assert [c.document.page_content for c in merged[0]] == ["flask api routes"]
+
+def test_search_partitions_qualifies_ids_and_targets_partitions(keyword_embeddings):
+    code = IndexPartition("code", keyword_embeddings).build([Document(page_content="docker services")])
+    briefing = IndexPartition("briefing", keyword_embeddings).build([Document(page_content="docker deployment")])
+    queries = ["docker", "docker"]
+
+    merged = search_partitions({"code": code, "briefing": briefing}, queries,
+                               _query_vectors(keyword_embeddings, queries), k=5,
+                               query_partitions=[None, ["briefing"]])
+
+    ids = code.vector_store.index_to_docstore_id[0], briefing.vector_store.index_to_docstore_id[0]
+    assert sorted(c.doc_id for c in merged[0]) == sorted([f"code/{ids[0]}", f"briefing/{ids[1]}"])
+    assert [c.doc_id for c in merged[1]] == [f"briefing/{ids[1]}"]
+
+def test_partition_add_extends_both_indexes(keyword_embeddings):
+    partition = IndexPartition("briefing", keyword_embeddings)
+    partition.build([Document(page_content="level one rest api")])
+    partition.add([Document(page_content="level two docker deployment")])
+
+    query = "docker deployment"
+    vectors = np.asarray([keyword_embeddings.embed_query(query)], dtype=np.float32)
+    results = partition.search([query], vectors, k=1)
+
+    assert len(partition) == 2
+    assert len(partition.lexical_index) == 2
+    assert results[0][0].document.page_content == "level two docker deployment"
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_saved_partition_opens_with_same_results(tmp_path, keyword_embeddings, use_mmap):
+    """A reopened partition answers vector and lexical queries like the original"""
+    docs = [
+        Document(page_content="def getUserById(user_id): pass", metadata={"source": "users.py", "type": "code"}),
+        Document(page_content="flask api routes", metadata={"source": "app.py", "type": "code"}),
+        Document(page_content="docker compose services", metadata={"source": "compose.yml", "type": "code"}),
+    ]
+    original = IndexPartition("code", keyword_embeddings).build(docs)
+    original.add([Document(page_content="pandas dataframe cleaning", metadata={"source": "clean.py", "type": "code"})])
+    original.save(str(tmp_path), embedding_model="test-model")
+
+    opened = IndexPartition.open(str(tmp_path), keyword_embeddings, "test-model", use_mmap=use_mmap)
+
+    for query in ["getUserById", "pandas dataframe", "docker services"]:
+        vectors = np.asarray([keyword_embeddings.embed_query(query)], dtype=np.float32)
+        # Chunks are renumbered on save, so compare contents rather than ids
+        expected = [(c.document.page_content, c.document.metadata) for c in original.search([query], vectors, 3)[0]]
+        found = opened.search([query], vectors, 3)[0]
+        assert [(c.document.page_content, c.document.metadata) for c in found] == expected
+    assert len(opened) == 4
+
+@pytest.mark.parametrize("rerank_factor", [0, 4])
+def test_saved_ivfpq_partition_opens_memory_mapped(tmp_path, keyword_embeddings, rerank_factor):
+    """IVF indexes cannot take the zero-copy read flags flat indexes are opened with"""
+    docs = [Document(page_content=f"module handler_{i} route_{i % 7}", metadata={"source": f"m{i}.py"})
+            for i in range(400)]
+    params = IndexParams(index_type="ivfpq", pq_m=8, pq_nbits=4, rerank_factor=rerank_factor)
+    original = IndexPartition("code", keyword_embeddings, params).build(docs)
+    original.save(str(tmp_path))
+
+    assert read_meta(str(tmp_path))["index_type"] == "ivfpq"
+    opened = IndexPartition.open(str(tmp_path), keyword_embeddings, use_mmap=True)
+
+    vectors = np.asarray([keyword_embeddings.embed_query("module handler_42")], dtype=np.float32)
+    expected = [c.document.metadata["source"] for c in original.search(["module handler_42"], vectors, 5)[0]]
+    assert [c.document.metadata["source"] for c in opened.search(["module handler_42"], vectors, 5)[0]] == expected
+
+def test_opened_partition_is_read_only(tmp_path, keyword_embeddings):
+    IndexPartition("code", keyword_embeddings).build([Document(page_content="a")]).save(str(tmp_path))
+    opened = IndexPartition.open(str(tmp_path), keyword_embeddings)
+
+    with pytest.raises(ValueError):
+        opened.add([Document(page_content="b")])
+
+def test_open_rejects_other_embedding_model(tmp_path, keyword_embeddings):
+    IndexPartition("code", keyword_embeddings).build([Document(page_content="a")]).save(str(tmp_path), "model-a")
+
+    with pytest.raises(ValueError):
+        IndexPartition.open(str(tmp_path), keyword_embeddings, "model-b")
@@ -0,0 +1,44 @@
+import pytest
+from langchain.schema.document import Document
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index_store import PositionIdMap, MmapDocstore, ChunkWriter, write_chunks
+
+def test_position_id_map():
+    ids = PositionIdMap(3)
+
+    assert ids[2] == "2"
+    assert list(ids.items()) == [(0, "0"), (1, "1"), (2, "2")]
+    with pytest.raises(KeyError):
+        ids[3]
+
+def test_mmap_docstore_round_trip(tmp_path):
+    """Chunks come back with their text and metadata, unicode included"""
+    docs = [
+        Document(page_content="def f():\n    return 'ñ'", metadata={"source": "a.py", "start_line": 1}),
+        Document(page_content="", metadata={"source": "empty.py"}),
+        Document(page_content="Requisitos técnicos", metadata={"type": "briefing"}),
+    ]
+    write_chunks(str(tmp_path), docs)
+
+    store = MmapDocstore(str(tmp_path))
+
+    assert len(store) == 3
+    assert [store.search(str(i)) for i in range(3)] == docs
+    assert store.search("7") == "ID 7 not found."
+    with pytest.raises(NotImplementedError):
+        store.add({"3": docs[0]})
+
+def test_chunk_writer_metadata_updates(tmp_path):
+    """Metadata updated after a record was written replaces the stored one"""
+    writer = ChunkWriter(str(tmp_path))
+    writer.write(Document(page_content="a", metadata={"source": "a.py"}))
+    writer.write(Document(page_content="b", metadata={"source": "b.py"}))
+    writer.update_metadata(0, {"source": "a.py", "duplicate_sources": "copy.py"})
+    writer.close()
+
+    store = MmapDocstore(str(tmp_path))
+
+    assert store.search("0").metadata == {"source": "a.py", "duplicate_sources": "copy.py"}
+    assert store.search("1").metadata == {"source": "b.py"}
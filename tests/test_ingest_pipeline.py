@@ -0,0 +1,64 @@
+import pytest
+import time
+import threading
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest_pipeline import Pipeline, batched
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 3)) == []
+
+def test_pipeline_preserves_order_and_counts():
+    def double(items):
+        for item in items:
+            yield item * 2
+
+    def pairs(items):
+        return batched(items, 2)
+
+    pipeline = Pipeline(range(5), [("double", double), ("pairs", pairs)])
+
+    assert list(pipeline) == [[0, 2], [4, 6], [8]]
+    report = {stats["stage"]: stats for stats in pipeline.report()}
+    assert report["source"]["items_out"] == 5
+    assert report["double"]["items_in"] == 5
+    assert report["pairs"]["items_out"] == 3
+
+def test_pipeline_bounds_items_in_flight():
+    """A slow consumer stops the source from running ahead of the queue bounds"""
+    produced = []
+
+    def source():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    pipeline = Pipeline(source(), [("identity", lambda items: items)], maxsize=2)
+    iterator = iter(pipeline)
+    next(iterator)
+    time.sleep(0.3)
+
+    # two queues of two items, one item held by each thread, one consumed
+    assert len(produced) <= 8
+    assert list(iterator) == list(range(1, 100))
+
+def test_pipeline_propagates_stage_errors():
+    def failing(items):
+        for item in items:
+            if item == 3:
+                raise RuntimeError("embedding failed")
+            yield item
+
+    with pytest.raises(RuntimeError, match="embedding failed"):
+        list(Pipeline(range(10), [("failing", failing)]))
+
+def test_pipeline_stops_threads_when_consumer_breaks():
+    before = threading.active_count()
+    for item in Pipeline(range(1000), [("identity", lambda items: items)], maxsize=1):
+        if item == 2:
+            break
+    time.sleep(0.3)
+
+    assert threading.active_count() <= before
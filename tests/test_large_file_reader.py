@@ -0,0 +1,86 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from code_chunker import CodeChunker
+import ast
+from large_file_reader import stream_split, sample_regions, _read_segments, SEGMENT_BYTES
+
+@pytest.fixture
+def chunker():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=2000, chunk_overlap=0)
+    return CodeChunker(splitter, max_chunk_size=2000, min_chunk_size=500)
+
+def _write_lines(path, count):
+    lines = [f"line {i:06d} ünïcode value {i * 7}\n" for i in range(1, count + 1)]
+    path.write_text("".join(lines), encoding='utf-8')
+    return lines
+
+def _assert_line_ranges(chunks, lines):
+    for text, metadata in chunks:
+        expected = "".join(lines[metadata["start_line"] - 1:metadata["end_line"]])
+        assert text.strip() == expected.strip()
+
+def test_sample_regions():
+    assert sample_regions(1000, max_bytes=4000) == [(0, 1000)]
+    regions = sample_regions(100_000, max_bytes=4000, regions=4)
+    assert regions[0] == (0, 1000)
+    assert regions[-1] == (99_000, 1000)
+    assert len(regions) == 4
+
+def test_stream_split_covers_whole_file_under_budget(tmp_path, chunker):
+    path = tmp_path / "big.txt"
+    lines = _write_lines(path, 4000)
+
+    chunks, content = stream_split(str(path), chunker, max_chunks=1000)
+
+    assert os.path.getsize(path) > 2 * SEGMENT_BYTES
+    assert content == "".join(lines)
+    assert chunks[-1][1]["end_line"] == len(lines)
+    _assert_line_ranges(chunks, lines)
+
+def test_stream_split_samples_head_to_tail(tmp_path, chunker):
+    path = tmp_path / "huge.txt"
+    lines = _write_lines(path, 100_000)
+
+    chunks, content = stream_split(str(path), chunker, max_bytes=64 * 1024, max_chunks=20)
+
+    assert len(chunks) <= 20
+    assert len(content) < 64 * 1024
+    starts = [metadata["start_line"] for _, metadata in chunks]
+    assert starts[0] == 1
+    assert starts == sorted(starts)
+    # Each region stops at its share of the chunk budget; the last one starts near the end
+    assert starts[-1] > len(lines) - 1000
+    assert {start * 4 // len(lines) for start in starts} == {0, 1, 2, 3}
+    _assert_line_ranges(chunks, lines)
+
+def test_stream_split_cuts_python_between_definitions(tmp_path, chunker):
+    path = tmp_path / "module.py"
+    functions = [f"def function_{i}():\n    return {i}\n\n" for i in range(3000)]
+    path.write_text("import numpy\n\n" + "".join(functions))
+
+    chunks, content = stream_split(str(path), chunker, max_chunks=1000)
+
+    symbols = [name for _, metadata in chunks for name in metadata.get("symbols", "").split(", ") if name]
+    assert symbols == [f"function_{i}" for i in range(3000)]
+    lines = content.splitlines(keepends=True)
+    _assert_line_ranges(chunks, lines)
+
+def test_stream_split_keeps_decorators_with_their_definitions(tmp_path, chunker):
+    """Segments never end between a decorator and the function it decorates"""
+    path = tmp_path / "routes.py"
+    handlers = [f"@app.route('/r{i}')\n@login_required\ndef handler_{i}():\n    return 'ok {i}'\n\n"
+                for i in range(800)]
+    path.write_text("from flask import Flask\napp = Flask(__name__)\n\n" + "".join(handlers))
+
+    with open(path, 'rb') as f:
+        segments = list(_read_segments(f, os.path.getsize(path), python=True))
+    assert len(segments) > 1
+    for segment in segments:
+        ast.parse(segment)
+
+    chunks, _ = stream_split(str(path), chunker, max_chunks=1000)
+    symbols = [name for _, metadata in chunks for name in metadata.get("symbols", "").split(", ") if name]
+    assert symbols == [f"handler_{i}" for i in range(800)]
@@ -0,0 +1,44 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexical_index import tokenize, BM25Index, reciprocal_rank_fusion
+
+def test_tokenize_splits_identifiers():
+    """Compound identifiers are kept whole and split into their parts"""
+    tokens = tokenize("getUserById(user_id) parseHTTPResponse")
+
+    assert "getuserbyid" in tokens
+    assert {"get", "user", "by", "id"} <= set(tokens)
+    assert {"parse", "http", "response"} <= set(tokens)
+
+def test_tokenize_keeps_file_names_searchable():
+    assert {"requirements", "txt", "package", "json"} <= set(tokenize("requirements.txt package.json"))
+
+def test_bm25_ranks_rare_terms_higher():
+    index = BM25Index()
+    index.add(["a", "b", "c"], [
+        "import flask app",
+        "import numpy as np",
+        "import pandas and flask",
+    ])
+
+    hits = index.search("numpy", k=3)
+
+    assert [doc_id for doc_id, _ in hits] == ["b"]
+
+def test_bm25_incremental_add_and_no_match():
+    index = BM25Index()
+    index.add(["a"], ["docker compose"])
+    index.add(["b"], ["Dockerfile FROM python"])
+
+    assert [doc_id for doc_id, _ in index.search("python", k=5)] == ["b"]
+    assert index.search("kubernetes") == []
+    assert len(index) == 2
+
+def test_reciprocal_rank_fusion_normalised():
+    """Agreement between rankings wins and a unanimous first place scores 1.0"""
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["a", "c"]])
+
+    assert fused[0] == ("a", pytest.approx(1.0))
+    assert [doc_id for doc_id, _ in fused] == ["a", "c", "b"]
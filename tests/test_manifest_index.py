@@ -0,0 +1,134 @@
+import pytest
+import json
+from unittest.mock import MagicMock
+from github import GithubException
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from manifest_index import ManifestIndex, Dependency, parse_manifest
+
+def _names(dependencies):
+    return [dep.name for dep in dependencies]
+
+def test_requirements_txt():
+    content = "requests==2.26.0\nnumpy>=1.20  # arrays\n# comment\n-r base.txt\nuvicorn[standard]~=0.20\npandas\n"
+
+    assert _names(parse_manifest("requirements.txt", content)) == ["requests", "numpy", "uvicorn", "pandas"]
+
+def test_pyproject_pep621_and_poetry():
+    content = """
+[project]
+dependencies = ["fastapi>=0.100", "pydantic"]
+[project.optional-dependencies]
+test = ["pytest"]
+[tool.poetry.dependencies]
+python = "^3.11"
+httpx = "*"
+[tool.poetry.group.dev.dependencies]
+black = "*"
+"""
+    deps = parse_manifest("pyproject.toml", content)
+
+    assert _names(deps) == ["fastapi", "pydantic", "pytest", "httpx", "black"]
+    assert Dependency("pytest", "Python", "pyproject.toml (dev)") in deps
+
+def test_pipfile():
+    content = '[packages]\nflask = "*"\n[dev-packages]\npytest = "*"\n'
+
+    assert parse_manifest("Pipfile", content) == [Dependency("flask", "Python", "Pipfile"),
+                                                   Dependency("pytest", "Python", "Pipfile (dev)")]
+
+def test_package_json():
+    content = json.dumps({"dependencies": {"react": "^18"}, "devDependencies": {"jest": "^29"}})
+
+    assert parse_manifest("web/package.json", content) == [
+        Dependency("react", "JavaScript", "web/package.json"),
+        Dependency("jest", "JavaScript", "web/package.json (dev)"),
+    ]
+
+@pytest.mark.parametrize("xmlns", ['', ' xmlns="http://maven.apache.org/POM/4.0.0"'])
+def test_pom_xml_with_or_without_namespace(xmlns):
+    content = f"""<project{xmlns}><dependencies>
+        <dependency><groupId>org.springframework</groupId><artifactId>spring-core</artifactId></dependency>
+        <dependency><groupId>junit</groupId><artifactId>junit</artifactId><scope>test</scope></dependency>
+    </dependencies></project>"""
+
+    assert parse_manifest("pom.xml", content) == [
+        Dependency("org.springframework:spring-core", "Java", "pom.xml"),
+        Dependency("junit:junit", "Java", "pom.xml (dev)"),
+    ]
+
+def test_build_gradle():
+    content = ("dependencies {\n    implementation 'com.google.guava:guava:32.0'\n"
+               "    testImplementation(\"junit:junit:4.13\")\n}\n")
+
+    assert _names(parse_manifest("build.gradle", content)) == ["com.google.guava:guava", "junit:junit"]
+
+def test_go_mod():
+    content = ("module example.com/app\n\ngo 1.21\n\nrequire github.com/gin-gonic/gin v1.9.1\n"
+               "require (\n\tgolang.org/x/sync v0.5.0\n\tgithub.com/stretchr/testify v1.8.4 // indirect\n)\n")
+
+    assert _names(parse_manifest("go.mod", content)) == [
+        "github.com/gin-gonic/gin", "golang.org/x/sync", "github.com/stretchr/testify"
+    ]
+
+def test_cargo_toml():
+    content = '[package]\nname = "app"\n[dependencies]\nserde = "1"\n[dev-dependencies]\nproptest = "1"\n'
+
+    assert _names(parse_manifest("Cargo.toml", content)) == ["serde", "proptest"]
+
+def test_gemfile():
+    content = "source 'https://rubygems.org'\ngem 'rails', '~> 7.0'\ngem \"puma\"\n"
+
+    assert _names(parse_manifest("Gemfile", content)) == ["rails", "puma"]
+
+def test_unknown_manifest_raises():
+    with pytest.raises(ValueError):
+        parse_manifest("setup.cfg", "")
+
+def test_from_directory_skips_pruned_dirs_and_bad_files(tmp_path):
+    (tmp_path / "requirements.txt").write_text("flask==2.0\n")
+    (tmp_path / "package.json").write_text("{ not json }")
+    (tmp_path / "node_modules" / "left-pad").mkdir(parents=True)
+    (tmp_path / "node_modules" / "left-pad" / "package.json").write_text('{"dependencies": {"react": "1"}}')
+
+    index = ManifestIndex.from_directory(str(tmp_path))
+
+    assert index.libraries() == [{"name": "flask", "category": "Python", "source": "requirements.txt"}]
+    assert sorted(index.manifests) == ["package.json", "requirements.txt"]
+
+def test_technologies_summary():
+    index = ManifestIndex.from_files([
+        ("requirements.txt", "flask\n"),
+        ("package.json", json.dumps({"dependencies": {"react": "1", "axios": "1"}, "devDependencies": {"vue": "3"}})),
+    ])
+
+    technologies = index.technologies()
+
+    assert technologies["languages"] == ["python", "javascript"]
+    assert technologies["frameworks"] == ["React"]
+    assert technologies["libraries"] == ["flask", "react", "axios", "vue"]
+
+def test_from_github_fetches_only_listed_manifests():
+    repo = MagicMock()
+    listing = [MagicMock(path="README.md"), MagicMock(path="requirements.txt")]
+    requirements = MagicMock(decoded_content=b"requests\n")
+    repo.get_contents.side_effect = lambda path: listing if path == "" else requirements
+
+    index = ManifestIndex.from_github(repo)
+
+    assert [call.args[0] for call in repo.get_contents.call_args_list] == ["", "requirements.txt"]
+    assert _names(index.dependencies) == ["requests"]
+
+def test_from_github_missing_files_are_not_errors():
+    repo = MagicMock()
+    repo.get_contents.side_effect = GithubException(404, "Not found")
+
+    assert ManifestIndex.from_github(repo).dependencies == []
+
+def test_from_github_raises_when_every_request_fails():
+    repo = MagicMock()
+    repo.get_contents.side_effect = Exception("API Error")
+
+    with pytest.raises(Exception, match="API Error"):
+        ManifestIndex.from_github(repo)
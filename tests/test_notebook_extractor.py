@@ -0,0 +1,74 @@
+import pytest
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+import notebook_extractor
+from notebook_extractor import extract_cells, split_notebook, summarize_outputs
+
+PNG = "iVBORw0KGgo" + "A" * 50000
+
+@pytest.fixture
+def notebook(tmp_path):
+    nb = {
+        "cells": [
+            {"cell_type": "markdown", "source": ["# Analysis\n", "Load the data"]},
+            {"cell_type": "code", "source": "import pandas as pd\ndf = pd.read_csv('x.csv')",
+             "outputs": [{"output_type": "stream", "text": ["loaded\n"]}]},
+            {"cell_type": "code", "source": "df.plot()",
+             "outputs": [{"output_type": "display_data",
+                          "data": {"image/png": PNG, "text/plain": ["<Figure>"]}}]},
+            {"cell_type": "code", "source": "", "outputs": []},
+            {"cell_type": "raw", "source": "raw text"},
+            {"cell_type": "code", "source": "1/0",
+             "outputs": [{"output_type": "error", "ename": "ZeroDivisionError", "evalue": "division by zero"}]},
+        ],
+        "metadata": {}, "nbformat": 4, "nbformat_minor": 5
+    }
+    path = tmp_path / "analysis.ipynb"
+    path.write_text(json.dumps(nb))
+    return str(path)
+
+def test_extract_cells_keeps_code_and_markdown(notebook):
+    """Empty and raw cells are dropped and cell indices preserved"""
+    cells = extract_cells(notebook)
+
+    assert [(c.index, c.cell_type) for c in cells] == [(0, "markdown"), (1, "code"), (2, "code"), (5, "code")]
+    assert cells[0].source == "# Analysis\nLoad the data"
+
+def test_extract_cells_summarises_outputs(notebook):
+    """Image payloads never reach the extracted text"""
+    cells = extract_cells(notebook)
+
+    assert cells[1].output_summary == "# output: loaded"
+    assert cells[2].output_summary == "# output: <Figure>\n# output: [image/png output omitted]"
+    assert cells[3].output_summary == "# output: ZeroDivisionError: division by zero"
+    assert all(PNG[:20] not in c.render() for c in cells)
+
+def test_extract_cells_without_ijson(notebook, monkeypatch):
+    """The json module is used when ijson is not installed"""
+    monkeypatch.setattr(notebook_extractor, "ijson", None)
+
+    assert len(extract_cells(notebook)) == 4
+
+def test_summarize_outputs_truncates_and_drops():
+    outputs = [{"output_type": "stream", "text": "x" * 500}]
+
+    assert summarize_outputs(outputs, max_chars=10) == "# output: " + "x" * 10 + "..."
+    assert summarize_outputs(outputs, max_chars=0) == ""
+
+def test_split_notebook_groups_cells(notebook):
+    """Cells are grouped up to the size limit with cell ranges in metadata"""
+    cells = extract_cells(notebook)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+
+    single = split_notebook(cells, splitter, max_chunk_size=3000)
+    assert len(single) == 1
+    assert single[0][1] == {"cell_start": 0, "cell_end": 5}
+    assert single[0][0].startswith("# [cell 0] markdown\n# Analysis")
+
+    grouped = split_notebook(cells, splitter, max_chunk_size=120)
+    assert len(grouped) > 1
+    assert grouped[0][1]["cell_start"] == 0
+    assert grouped[-1][1]["cell_end"] == 5
@@ -0,0 +1,68 @@
+import pytest
+import fitz
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pdf_extractor
+from pdf_extractor import extract_pdf_pages
+
+def _write_pdf(path, pages):
+    """pages: list of [(text, font size), ...] lines"""
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        y = 72
+        for text, size in lines:
+            page.insert_text((72, y), text, fontsize=size)
+            y += size * 2
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+def test_pages_keep_numbers_and_source(tmp_path):
+    path = _write_pdf(tmp_path / "brief.pdf", [[("First page", 11)], [("Second page", 11)]])
+
+    docs = extract_pdf_pages(path)
+
+    assert [d.metadata["page"] for d in docs] == [0, 1]
+    assert all(d.metadata["source"] == path and d.metadata["total_pages"] == 2 for d in docs)
+    assert "First page" in docs[0].page_content
+    assert "Second page" in docs[1].page_content
+
+def test_headings_are_marked_up(tmp_path):
+    path = _write_pdf(tmp_path / "brief.pdf", [[
+        ("Project Briefing", 24),
+        ("Requirements", 14),
+        ("The API must expose a REST endpoint for users.", 11),
+        ("Tests must cover the main flows.", 11),
+    ]])
+
+    text = extract_pdf_pages(path)[0].page_content
+
+    assert "\n## Project Briefing" in text
+    assert "\n### Requirements" in text
+    assert "## The API" not in text and "### The API" not in text
+
+def test_unstructured_text_has_no_markup(tmp_path):
+    path = _write_pdf(tmp_path / "brief.pdf", [[("Project Briefing", 24), ("Body text", 11)]])
+
+    text = extract_pdf_pages(path, structured=False)[0].page_content
+
+    assert "#" not in text
+    assert "Project Briefing" in text and "Body text" in text
+
+def test_parallel_extraction_matches_serial(tmp_path, monkeypatch):
+    pages = [[(f"Annex {i}", 16), (f"Content of page {i}", 11)] for i in range(12)]
+    path = _write_pdf(tmp_path / "long.pdf", pages)
+    serial = extract_pdf_pages(path, max_workers=1)
+
+    monkeypatch.setattr(pdf_extractor, "PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(pdf_extractor, "PAGES_PER_TASK", 3)
+    parallel = extract_pdf_pages(path, max_workers=2)
+
+    assert [d.page_content for d in parallel] == [d.page_content for d in serial]
+    assert [d.metadata["page"] for d in parallel] == list(range(12))
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(Exception):
+        extract_pdf_pages(str(tmp_path / "missing.pdf"))
@@ -0,0 +1,58 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from repo_scanner import scan_repository, filter_by_extension, FileEntry
+
+@pytest.fixture
+def repo(tmp_path):
+    """Small repository with ignored directories and nested sources"""
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / "layout").mkdir()
+    (tmp_path / "README.md").write_text("# Readme")
+    (tmp_path / "src" / "main.py").write_text("print('hi')")
+    (tmp_path / "src" / "pkg" / "util.PY").write_text("x = 1")
+    (tmp_path / "node_modules" / "lib" / "index.js").write_text("module.exports = {}")
+    (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main")
+    (tmp_path / "layout" / "page.html").write_text("<html></html>")
+    return tmp_path
+
+def test_scan_repository_prunes_ignored_dirs(repo):
+    """Files under ignored directories never appear in the manifest"""
+    manifest = scan_repository(str(repo))
+
+    paths = [f.rel_path for f in manifest]
+    assert paths == sorted(paths)
+    assert set(paths) == {
+        "README.md",
+        os.path.join("layout", "page.html"),
+        os.path.join("src", "main.py"),
+        os.path.join("src", "pkg", "util.PY"),
+    }
+
+def test_scan_repository_entry_fields(repo):
+    """Entries carry size, lowercased extension and mtime"""
+    manifest = {f.rel_path: f for f in scan_repository(str(repo))}
+
+    entry = manifest[os.path.join("src", "pkg", "util.PY")]
+    assert isinstance(entry, FileEntry)
+    assert entry.size == 5
+    assert entry.ext == ".py"
+    assert entry.name == "util.PY"
+    assert entry.mtime > 0
+
+def test_scan_repository_custom_ignored_dirs(repo):
+    """The ignore set can be overridden"""
+    manifest = scan_repository(str(repo), ignored_dirs={"src"})
+
+    assert os.path.join("node_modules", "lib", "index.js") in [f.rel_path for f in manifest]
+    assert not any(f.rel_path.startswith("src") for f in manifest)
+
+def test_filter_by_extension(repo):
+    """Filtering keeps matching extensions under the size limit"""
+    manifest = scan_repository(str(repo))
+
+    assert [f.name for f in filter_by_extension(manifest, [".py"])] == ["main.py", "util.PY"]
+    assert [f.name for f in filter_by_extension(manifest, [".py"], max_size=5)] == ["util.PY"]
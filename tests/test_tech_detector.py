@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tech_detector import TechDetector, detect_imports, IMPORT_NAMES
+
+def test_detects_import_and_from_statements():
+    content = "import numpy as np\nfrom flask import Flask\nimport os, torch.nn as nn\n"
+
+    assert detect_imports(content) == {
+        ("libraries", "NumPy"), ("libraries", "Flask"), ("frameworks", "PyTorch")
+    }
+
+def test_only_import_lines_match():
+    content = '"""Explains why we do not import django here"""\nx = "from pandas"\n    import sklearn\n'
+
+    assert detect_imports(content) == {("frameworks", "scikit-learn")}
+
+def test_prefixes_of_other_modules_do_not_match():
+    assert detect_imports("import flask_cors\nimport numpyro\n") == set()
+
+def test_library_names_map_to_import_names():
+    detector = TechDetector(libraries=["scikit-image", "pyyaml", "python-dotenv", "rich"], frameworks={})
+
+    found = detector.detect("import skimage.io\nimport yaml\nfrom dotenv import load_dotenv\nfrom rich.console import Console\n")
+
+    assert found == {("libraries", "scikit-image"), ("libraries", "pyyaml"),
+                     ("libraries", "python-dotenv"), ("libraries", "rich")}
+
+def test_frameworks_take_precedence_over_library_names():
+    detector = TechDetector(libraries=["scikit-learn", "numpy"])
+
+    assert detector.detect("import sklearn\nimport numpy\n") == {("frameworks", "scikit-learn"), ("libraries", "NumPy")}
+
+def test_many_libraries_use_one_lookup_table():
+    libraries = [f"lib-{i}" for i in range(2000)]
+    detector = TechDetector(libraries=libraries, frameworks={})
+
+    assert detector.detect("import lib_1999\n") == {("libraries", "lib-1999")}
+    assert "scikit-learn" in IMPORT_NAMES
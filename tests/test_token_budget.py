@@ -0,0 +1,56 @@
+import os
+import sys
+from types import SimpleNamespace
+from langchain_huggingface import HuggingFaceEmbeddings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from token_budget import TokenCounter, get_tokenizer_info, truncation_report
+
+class WordTokenizer:
+    """Minimal tokenizer: one token per whitespace-separated word"""
+    def encode(self, text, add_special_tokens=True):
+        tokens = text.split()
+        return (["[CLS]"] + tokens + ["[SEP]"]) if add_special_tokens else tokens
+
+def test_token_counter_excludes_special_tokens():
+    assert TokenCounter(WordTokenizer())("one two three") == 3
+
+def test_get_tokenizer_info():
+    """The registry's langchain_huggingface embeddings hold the model in a private _client"""
+    embeddings = HuggingFaceEmbeddings.model_construct(model_name="test-model")
+    embeddings._client = SimpleNamespace(tokenizer=WordTokenizer(), max_seq_length=256)
+
+    tokenizer, max_seq_length = get_tokenizer_info(embeddings)
+
+    assert isinstance(tokenizer, WordTokenizer)
+    assert max_seq_length == 256
+
+def test_get_tokenizer_info_public_client():
+    embeddings = SimpleNamespace(client=SimpleNamespace(tokenizer=WordTokenizer(), max_seq_length=128))
+
+    assert get_tokenizer_info(embeddings)[1] == 128
+
+def test_get_tokenizer_info_unavailable():
+    assert get_tokenizer_info(object()) == (None, None)
+
+def test_truncation_report():
+    """Tokens beyond the limit (minus special tokens) are reported as dropped"""
+    texts = ["a " * 5, "b " * 10, "c " * 20]
+
+    report = truncation_report(texts, TokenCounter(WordTokenizer()), max_seq_length=12)
+
+    assert report == {
+        "chunks": 3,
+        "truncated_chunks": 1,
+        "total_tokens": 35,
+        "dropped_tokens": 10,
+        "dropped_ratio": round(10 / 35, 4),
+        "mean_tokens_per_chunk": round(35 / 3, 1),
+        "max_tokens_per_chunk": 20,
+        "token_limit": 10,
+    }
+
+def test_truncation_report_empty():
+    report = truncation_report([], TokenCounter(WordTokenizer()), max_seq_length=12)
+
+    assert report["chunks"] == 0
+    assert report["dropped_ratio"] == 0.0
@@ -0,0 +1,101 @@
+import pytest
+import os
+import sys
+import numpy as np
+import faiss
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langchain.schema.document import Document
+from vector_index import IndexParams, choose_index_type, create_index, build_vector_store, set_search_params, index_memory_bytes
+
+def _random_vectors(n, dim=32, seed=0):
+    vectors = np.random.RandomState(seed).randn(n, dim).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def test_choose_index_type_by_size():
+    params = IndexParams(flat_max_vectors=100, hnsw_max_vectors=1000)
+
+    assert choose_index_type(50, params) == "flat"
+    assert choose_index_type(500, params) == "hnsw"
+    assert choose_index_type(5000, params) == "ivfpq"
+    assert choose_index_type(5000, IndexParams(index_type="flat")) == "flat"
+
+@pytest.mark.parametrize("index_type,expected_class", [
+    ("flat", faiss.IndexFlatIP),
+    ("hnsw", faiss.IndexHNSWFlat),
+    ("ivfpq", faiss.IndexIVFPQ),
+])
+def test_create_index_types(index_type, expected_class):
+    """Each index type is built, trained and finds an exact copy of a stored vector"""
+    vectors = _random_vectors(2000)
+    params = IndexParams(hnsw_ef_search=32, ivf_nprobe=8)
+
+    index = create_index(vectors, index_type, params)
+
+    assert isinstance(index, expected_class)
+    assert index.ntotal == 2000
+    _, ids = index.search(vectors[:10], 5)
+    assert (ids[:, :5] == np.arange(10)[:, None]).any(axis=1).mean() >= 0.9
+
+def test_create_index_unknown_type():
+    with pytest.raises(ValueError):
+        create_index(_random_vectors(10), "lsh")
+
+def test_set_search_params():
+    vectors = _random_vectors(2000)
+    hnsw = create_index(vectors, "hnsw")
+    ivf = create_index(vectors, "ivfpq")
+
+    set_search_params(hnsw, IndexParams(hnsw_ef_search=128))
+    set_search_params(ivf, IndexParams(ivf_nprobe=4))
+
+    assert hnsw.hnsw.efSearch == 128
+    assert ivf.nprobe == 4
+
+def test_build_vector_store_search(keyword_embeddings):
+    """The langchain wrapper searches the custom index and supports adding documents"""
+    docs = [Document(page_content=text, metadata={"source": f"{i}.py"}) for i, text in enumerate([
+        "flask web server routes", "pandas dataframe cleaning", "pytorch neural network training",
+    ])]
+
+    store = build_vector_store(docs, keyword_embeddings)
+    store.add_documents([Document(page_content="docker compose deployment", metadata={"source": "3.yml"})])
+
+    assert store.similarity_search("pandas dataframe", k=1)[0].metadata["source"] == "1.py"
+    assert store.similarity_search("docker deployment", k=1)[0].metadata["source"] == "3.yml"
+    assert store.index.ntotal == 4
+
+# HNSW keeps its neighbour graph uncompressed, so it saves proportionally less
+@pytest.mark.parametrize("index_type,max_ratio", [("flat", 0.6), ("hnsw", 0.9)])
+def test_fp16_storage_shrinks_memory(index_type, max_ratio):
+    """fp16 storage halves the vector payload while keeping exact matches"""
+    vectors = _random_vectors(2000, dim=64)
+
+    full = create_index(vectors, index_type)
+    half = create_index(vectors, index_type, IndexParams(compression="fp16"))
+
+    assert index_memory_bytes(half) < max_ratio * index_memory_bytes(full)
+    _, ids = half.search(vectors[:20], 1)
+    assert (ids[:, 0] == np.arange(20)).all()
+
+def test_pq_storage_with_rerank_recovers_exact_order():
+    """Re-ranking PQ candidates against full vectors restores the exact top hit"""
+    vectors = _random_vectors(2000, dim=64)
+
+    pq = create_index(vectors, "flat", IndexParams(compression="pq"))
+    reranked = create_index(vectors, "flat", IndexParams(compression="pq", rerank_factor=8))
+
+    assert index_memory_bytes(pq) < 0.25 * vectors.nbytes
+    assert isinstance(reranked, faiss.IndexRefine)
+    _, ids = reranked.search(vectors[:20], 1)
+    assert (ids[:, 0] == np.arange(20)).all()
+    np.testing.assert_allclose(reranked.reconstruct(3), vectors[3], atol=1e-6)
+
+def test_pq_trains_on_tiny_corpora():
+    """Bits per code shrink so a few dozen vectors can still train PQ"""
+    index = create_index(_random_vectors(40), "flat", IndexParams(compression="pq"))
+
+    assert index.ntotal == 40
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        create_index(_random_vectors(10), "flat", IndexParams(compression="int4"))
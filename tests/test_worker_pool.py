@@ -0,0 +1,20 @@
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from worker_pool import get_pool_context
+
+def _loaded_modules(names):
+    return [name for name in names if name in sys.modules]
+
+def test_pool_context_does_not_fork():
+    assert get_pool_context().get_start_method() != "fork"
+
+def test_workers_do_not_import_the_embedding_stack():
+    """Workers start from a clean process, not a copy of the caller"""
+    import RAG_process  # noqa: F401  loaded in the caller only
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_pool_context()) as executor:
+        loaded = executor.submit(_loaded_modules, ["file_splitter", "RAG_process", "embedding_registry"]).result()
+
+    assert loaded == ["file_splitter"]
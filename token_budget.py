@@ -0,0 +1,93 @@
+import logging
+from typing import Iterable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# [CLS] and [SEP] take two positions of the model's sequence limit
+SPECIAL_TOKENS = 2
+
+
+class TokenCounter:
+    """
+    Length function measuring text in the embedding model's word pieces.
+
+    Plain class rather than a closure so it pickles into worker processes
+    together with the tokenizer.
+    """
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def __call__(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+
+def get_tokenizer_info(embeddings) -> Tuple[Optional[Any], Optional[int]]:
+    """
+    Returns the tokenizer and maximum sequence length behind an embeddings object.
+
+    Args:
+        embeddings: HuggingFaceEmbeddings wrapping a SentenceTransformer
+
+    Returns:
+        tuple: (tokenizer, max_seq_length), or (None, None) if unavailable
+    """
+    # langchain_huggingface keeps the model in a private _client; langchain_community in client
+    client = getattr(embeddings, '_client', None)
+    if client is None:
+        client = getattr(embeddings, 'client', None)
+    tokenizer = getattr(client, 'tokenizer', None)
+    max_seq_length = getattr(client, 'max_seq_length', None)
+    if tokenizer is None or not isinstance(max_seq_length, int):
+        return None, None
+    return tokenizer, max_seq_length
+
+
+class TruncationStats:
+    """Running totals behind truncation_report, fed one chunk at a time"""
+
+    def __init__(self, counter: TokenCounter, max_seq_length: int):
+        self.counter = counter
+        self.limit = max_seq_length - SPECIAL_TOKENS
+        self.chunks = self.truncated_chunks = self.total_tokens = self.dropped_tokens = self.max_tokens = 0
+
+    def add(self, text: str) -> int:
+        """Count a chunk and return its token length"""
+        tokens = self.counter(text)
+        self.chunks += 1
+        self.total_tokens += tokens
+        self.max_tokens = max(self.max_tokens, tokens)
+        if tokens > self.limit:
+            self.truncated_chunks += 1
+            self.dropped_tokens += tokens - self.limit
+        return tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.chunks,
+            "truncated_chunks": self.truncated_chunks,
+            "total_tokens": self.total_tokens,
+            "dropped_tokens": self.dropped_tokens,
+            "dropped_ratio": round(self.dropped_tokens / self.total_tokens, 4) if self.total_tokens else 0.0,
+            "mean_tokens_per_chunk": round(self.total_tokens / self.chunks, 1) if self.chunks else 0.0,
+            "max_tokens_per_chunk": self.max_tokens,
+            "token_limit": self.limit,
+        }
+
+
+def truncation_report(texts: Iterable[str], counter: TokenCounter, max_seq_length: int) -> Dict[str, Any]:
+    """
+    Measures how much of each chunk the embedding model actually sees.
+
+    Args:
+        texts (iterable): Chunk texts
+        counter (TokenCounter): Token length function of the embedding model
+        max_seq_length (int): Model sequence limit, special tokens included
+
+    Returns:
+        dict: chunk and token totals, number of truncated chunks and tokens dropped
+    """
+    stats = TruncationStats(counter, max_seq_length)
+    for text in texts:
+        stats.add(text)
+    return stats.to_dict()
@@ -0,0 +1,199 @@
+import math
+import uuid
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+import faiss
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain.schema.document import Document
+from embedding_scheduler import EmbeddingScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IndexParams:
+    """
+    Index selection thresholds and recall/latency knobs.
+
+    Vectors are assumed to be L2-normalised, so every index uses inner
+    product, which ranks like cosine similarity.
+    """
+    # Corpus size thresholds
+    flat_max_vectors: int = 20000
+    hnsw_max_vectors: int = 500000
+    # HNSW: more neighbours / wider search = better recall, slower queries
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 200
+    hnsw_ef_search: int = 128
+    # IVF-PQ: more probed lists = better recall, slower queries
+    ivf_nlist: Optional[int] = None  # defaults to 4 * sqrt(n)
+    ivf_nprobe: int = 16
+    pq_m: Optional[int] = None  # sub-quantisers, defaults to dim / 8
+    pq_nbits: int = 8
+    # Vector storage for flat and HNSW indexes: None (float32), "fp16" (half
+    # the memory, near-lossless) or "pq" (dim / pq_m times smaller, lossy)
+    compression: Optional[str] = None
+    # Re-rank rerank_factor * k compressed hits against the full float32
+    # vectors (kept alongside); 0 disables re-ranking and keeps only codes
+    rerank_factor: int = 0
+    # Forces an index type ("flat", "hnsw" or "ivfpq") regardless of size
+    index_type: Optional[str] = None
+
+
+def choose_index_type(num_vectors: int, params: Optional[IndexParams] = None) -> str:
+    """Pick flat for small corpora, HNSW for medium ones and IVF-PQ for large ones"""
+    params = params or IndexParams()
+    if params.index_type:
+        return params.index_type
+    if num_vectors <= params.flat_max_vectors:
+        return "flat"
+    if num_vectors <= params.hnsw_max_vectors:
+        return "hnsw"
+    return "ivfpq"
+
+
+def _pq_shape(dim: int, num_vectors: int, params: IndexParams) -> Tuple[int, int]:
+    """Sub-quantiser count dividing dim, and bits per code trainable from num_vectors"""
+    pq_m = params.pq_m or max(1, dim // 8)
+    while dim % pq_m:
+        pq_m -= 1
+    # Each sub-quantiser learns 2**nbits centroids, which needs at least as many points
+    nbits = max(1, min(params.pq_nbits, int(math.log2(max(2, num_vectors)))))
+    return pq_m, nbits
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """Index type name ("flat", "hnsw" or "ivfpq") of a built index, compressed or re-ranked"""
+    if faiss.try_extract_index_ivf(index) is not None:
+        return "ivfpq"
+    if isinstance(index, faiss.IndexRefine):
+        index = faiss.downcast_index(index.base_index)
+    return "hnsw" if isinstance(index, faiss.IndexHNSW) else "flat"
+
+
+def create_index(vectors: np.ndarray, index_type: str, params: Optional[IndexParams] = None) -> faiss.Index:
+    """
+    Creates, trains (when needed) and fills a FAISS index, optionally with
+    compressed vector storage and full-precision re-ranking.
+
+    Args:
+        vectors (np.ndarray): float32 matrix of shape (n, dim)
+        index_type (str): "flat", "hnsw" or "ivfpq"
+        params (IndexParams): Index parameters
+
+    Returns:
+        faiss.Index: Index containing every vector
+    """
+    params = params or IndexParams()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    num_vectors, dim = vectors.shape
+
+    if params.compression not in (None, "fp16", "pq"):
+        raise ValueError(f"Unknown compression: {params.compression}")
+    metric = faiss.METRIC_INNER_PRODUCT
+    pq_m, pq_nbits = _pq_shape(dim, num_vectors, params)
+
+    if index_type == "flat":
+        if params.compression == "fp16":
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, metric)
+        elif params.compression == "pq":
+            index = faiss.IndexPQ(dim, pq_m, pq_nbits, metric)
+        else:
+            index = faiss.IndexFlatIP(dim)
+    elif index_type == "hnsw":
+        if params.compression == "fp16":
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, params.hnsw_m, metric)
+        elif params.compression == "pq":
+            index = faiss.IndexHNSWPQ(dim, pq_m, params.hnsw_m, pq_nbits, metric)
+        else:
+            index = faiss.IndexHNSWFlat(dim, params.hnsw_m, metric)
+        index.hnsw.efConstruction = params.hnsw_ef_construction
+    elif index_type == "ivfpq":
+        nlist = params.ivf_nlist or max(1, int(4 * math.sqrt(num_vectors)))
+        # k-means needs a few dozen points per centroid
+        nlist = max(1, min(nlist, num_vectors // 39))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, params.pq_nbits, metric)
+        index.train(vectors)
+        # Lets stored vectors be reconstructed by id (needed for MMR)
+        index.make_direct_map()
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    if not index.is_trained:
+        index.train(vectors)
+
+    # Compressed codes find the candidates, the full vectors order them
+    lossy = params.compression is not None or index_type == "ivfpq"
+    if lossy and params.rerank_factor > 0:
+        set_search_params(index, params)
+        index = faiss.IndexRefineFlat(index)
+        index.k_factor = params.rerank_factor
+
+    index.add(vectors)
+    set_search_params(index, params)
+    return index
+
+
+def set_search_params(index: faiss.Index, params: IndexParams) -> None:
+    """Apply query-time recall/latency parameters to an existing index"""
+    if isinstance(index, faiss.IndexRefine):
+        index.k_factor = params.rerank_factor or index.k_factor
+        set_search_params(faiss.downcast_index(index.base_index), params)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = params.hnsw_ef_search
+    elif isinstance(index, faiss.IndexIVF):
+        index.nprobe = params.ivf_nprobe
+
+
+def index_memory_bytes(index: faiss.Index) -> int:
+    """Serialized size of an index, a close proxy for its resident memory"""
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def embed_documents(documents: List[Document], embeddings) -> np.ndarray:
+    """Embed document contents in length-bucketed batches, in document order"""
+    logger.info(f"Embedding {len(documents)} documents")
+    return EmbeddingScheduler(embeddings).embed([doc.page_content for doc in documents])
+
+
+def build_vector_store(documents: List[Document], embeddings, params: Optional[IndexParams] = None,
+                       vectors: Optional[np.ndarray] = None) -> FAISS:
+    """
+    Embeds documents and wraps an automatically chosen FAISS index in a
+    langchain FAISS vector store.
+
+    Args:
+        documents (list): Documents to index
+        embeddings: Embeddings used for documents and later queries
+        params (IndexParams): Index selection and search parameters
+        vectors (np.ndarray): Precomputed embeddings, skips the embedding step
+
+    Returns:
+        FAISS: Vector store backed by the chosen index
+    """
+    params = params or IndexParams()
+    if vectors is None:
+        vectors = embed_documents(documents, embeddings)
+
+    index_type = choose_index_type(len(documents), params)
+    logger.info(f"Building {index_type} index for {len(documents)} vectors")
+    index = create_index(vectors, index_type, params)
+    if params.compression:
+        logger.info(
+            f"{params.compression} storage: {index_memory_bytes(index)} bytes "
+            f"(float32 vectors alone: {vectors.nbytes} bytes)"
+        )
+
+    ids = [str(uuid.uuid4()) for _ in documents]
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore(dict(zip(ids, documents))),
+        index_to_docstore_id=dict(enumerate(ids)),
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+    )
@@ -0,0 +1,22 @@
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+# Modules whose functions run in worker processes; kept free of torch and the
+# embedding stack so that starting a worker stays cheap
+WORKER_MODULES = ["file_splitter", "pdf_extractor"]
+
+# Workers are never forked from the caller: the pools are started from
+# threaded processes (gunicorn workers, ingestion pipeline threads) with torch
+# and tokenizers loaded, and forking those can deadlock on locks held by other
+# threads. The fork server is a clean single-threaded process that has only
+# imported WORKER_MODULES; platforms without it fall back to spawn.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def get_pool_context() -> BaseContext:
+    """Multiprocessing context to pass as mp_context to every ProcessPoolExecutor"""
+    context = multiprocessing.get_context(START_METHOD)
+    if START_METHOD == "forkserver":
+        # Only takes effect before the fork server starts, i.e. on first use
+        context.set_forkserver_preload(WORKER_MODULES)
+    return context